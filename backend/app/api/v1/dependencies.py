@@ -1,29 +1,93 @@
 """
 FastAPI dependencies for the v1 API endpoints.
+
+Every component is a singleton owned by the application's ServiceContainer;
+these functions only look them up.
 """
-from functools import lru_cache
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import Depends
 
+from app.core.container import ServiceContainer, ServiceNotReadyError, StorageProvider
+from app.core.dependencies import get_container, service_unavailable
+from app.repositories.base import BaseGenerationRepository
+from app.services.cache import PromptResultCache
+from app.services.events import GenerationEventBus
 from app.services.generator import GeneratorService
-from app.storage_providers.minio import MinioStorageProvider
-from app.storage_providers.base import BaseStorageProvider
+from app.services.idempotency import IdempotencyStore
+from app.services.transforms import DerivedImageCache, ImageTransformService
+from app.services.worker_pool import GenerationWorkerPool
+
+Container = Annotated[ServiceContainer, Depends(get_container)]
+
+
+def get_storage_provider(container: Container) -> StorageProvider:
+    """
+    Return the shared storage provider, or 503 while it is still connecting.
+    """
+    try:
+        return container.storage_provider
+    except ServiceNotReadyError as e:
+        raise service_unavailable(str(e))
+
+
+def get_generation_repository(container: Container) -> BaseGenerationRepository:
+    """
+    Return the shared generation metadata store.
+    """
+    return container.repository
+
+
+def get_prompt_cache(container: Container) -> Optional[PromptResultCache]:
+    """
+    Return the shared prompt result cache, or None when disabled.
+    """
+    return container.result_cache
+
+
+def get_variant_cache(container: Container) -> DerivedImageCache:
+    """
+    Return the shared cache of on-demand image renditions.
+    """
+    return container.variant_cache
+
+
+def get_event_bus(container: Container) -> GenerationEventBus:
+    """
+    Return the bus that streams generation status transitions.
+    """
+    return container.event_bus
+
+
+def get_generator_service(container: Container) -> GeneratorService:
+    """
+    Return the shared generator service, or 503 until warm-up has finished.
+    """
+    try:
+        return container.generator_service
+    except ServiceNotReadyError as e:
+        raise service_unavailable(str(e))
+
+
+def get_transform_service(container: Container) -> ImageTransformService:
+    """
+    Return the on-demand rendition service, or 503 until warm-up has finished.
+    """
+    try:
+        return container.transform_service
+    except ServiceNotReadyError as e:
+        raise service_unavailable(str(e))
 
 
-@lru_cache()
-def get_storage_provider() -> BaseStorageProvider:
+def get_worker_pool(container: Container) -> GenerationWorkerPool:
     """
-    Create and cache a storage provider instance.
-    Using LRU cache to ensure we get the same instance across requests.
+    Return the application-wide background generation pool.
     """
-    return MinioStorageProvider()
+    return container.worker_pool
 
 
-def get_generator_service(
-    storage_provider: Annotated[BaseStorageProvider, Depends(get_storage_provider)]
-) -> GeneratorService:
+def get_idempotency_store(container: Container) -> IdempotencyStore:
     """
-    Create a generator service with injected storage provider.
+    Return the record of requests made with an Idempotency-Key.
     """
-    return GeneratorService(storage_provider)
+    return container.idempotency_store
@@ -0,0 +1,29 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from app.services.cache import PromptResultCache
+from app.services.transforms import DerivedImageCache
+from app.api.v1.dependencies import get_prompt_cache, get_variant_cache
+
+router = APIRouter()
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    result_cache: Optional[PromptResultCache] = Depends(get_prompt_cache)
+):
+    """
+    Report hit/miss/eviction counters for the prompt result cache.
+    """
+    if result_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **result_cache.stats()}
+
+
+@router.get("/cache/variants/stats")
+async def get_variant_cache_stats(
+    variant_cache: DerivedImageCache = Depends(get_variant_cache)
+):
+    """
+    Report hit/miss/eviction counters for the on-demand rendition cache.
+    """
+    return variant_cache.stats()
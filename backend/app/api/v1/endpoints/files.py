@@ -0,0 +1,128 @@
+from email.utils import formatdate
+from typing import Iterator, Optional, Tuple
+import mimetypes
+import mmap
+import os
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from app.schemas.common import ErrorResponse
+from app.storage_providers.local import LocalFilesystemStorageProvider
+from app.api.v1.dependencies import get_storage_provider
+
+router = APIRouter()
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_CHUNK_SIZE = 256 * 1024
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range` header into an inclusive (start, end).
+    Returns None for unsupported forms (e.g. multiple ranges), which are
+    answered with the full object.
+
+    Raises:
+        HTTPException: 416 if the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def _iter_mmap(path: str, start: int, end: int) -> Iterator[bytes]:
+    """
+    Yield the inclusive byte range [start, end] of a file in chunks read
+    straight from the page cache through a memory map.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for offset in range(start, end + 1, _CHUNK_SIZE):
+            yield mapped[offset:min(offset + _CHUNK_SIZE, end + 1)]
+
+
+@router.api_route(
+    "/files/{bucket}/{object_name:path}",
+    methods=["GET", "HEAD"],
+    response_class=Response,
+    responses={
+        206: {"description": "Partial content"},
+        304: {"description": "Not modified"},
+        404: {"model": ErrorResponse, "description": "Object not found"},
+        416: {"model": ErrorResponse, "description": "Range not satisfiable"}
+    }
+)
+async def serve_file(
+    bucket: str,
+    object_name: str,
+    request: Request,
+    storage_provider=Depends(get_storage_provider)
+):
+    """
+    Serve an object stored by the local filesystem storage provider.
+
+    Supports conditional requests (ETag / If-None-Match) and single byte
+    ranges. Full responses are sent as a FileResponse, which uses the
+    server's zero-copy path-send support where available; ranges are read
+    through a memory map.
+    """
+    if not isinstance(storage_provider, LocalFilesystemStorageProvider):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    try:
+        path = storage_provider.resolve_path(bucket, object_name)
+        stat = os.stat(path)
+    except (ValueError, FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
+
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    media_type = mimetypes.guess_type(object_name)[0] or "application/octet-stream"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and stat.st_size > 0 and (not if_range or if_range.strip() == etag):
+        byte_range = _parse_range(range_header, stat.st_size)
+
+    if byte_range is None:
+        if request.method == "HEAD":
+            return Response(headers={**headers, "Content-Length": str(stat.st_size)}, media_type=media_type)
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+
+    start, end = byte_range
+    headers.update({
+        "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+        "Content-Length": str(end - start + 1),
+    })
+    if request.method == "HEAD":
+        return Response(status_code=status.HTTP_206_PARTIAL_CONTENT, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        _iter_mmap(path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        headers=headers,
+        media_type=media_type
+    )
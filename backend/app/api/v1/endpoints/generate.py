@@ -1,40 +1,188 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.schemas.generate import GenerateRequest, GenerateResponse
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.schemas.generate import (
+    BatchGenerateRequest,
+    BatchGenerateResponse,
+    BatchItemResult,
+    GenerateRequest,
+    GenerateResponse,
+    GenerationAcceptedResponse,
+)
 from app.schemas.common import ErrorResponse
+from app.schemas.generation import ImageVariantResponse
 from app.services.generator import GeneratorService
-from app.api.v1.dependencies import get_generator_service
-from app.models.generation import GenerationStatus
+from app.services.idempotency import IdempotencyKeyReusedError, IdempotencyStore, StoredResponse, request_fingerprint
+from app.services.limiter import LimitExceededError
+from app.services.rate_limiter import Priority, RateLimitedError, priority_lane
+from app.services.renderer import is_format_supported
+from app.services.worker_pool import GenerationWorkerPool, QueueFullError
+from app.api.v1.dependencies import get_generator_service, get_idempotency_store, get_worker_pool
+from app.models.generation import GenerationStatus, ImageGeneration, OutputFormat, OutputOptions
 
 
 router = APIRouter()
 
+
+def _output_options(request: GenerateRequest) -> OutputOptions:
+    """
+    Map the requested output settings onto the service model.
+
+    Raises:
+        HTTPException: 422 if this server cannot encode the requested format.
+    """
+    if not is_format_supported(request.output_format.value):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Output format '{request.output_format.value}' is not supported by this server"
+        )
+    return OutputOptions(
+        output_format=OutputFormat(request.output_format.value),
+        quality=request.quality,
+        sizes=request.sizes
+    )
+
+def _accepted(generation: ImageGeneration, *, final: bool = True) -> StoredResponse:
+    """202 response pointing at the status of a queued generation."""
+    accepted = GenerationAcceptedResponse(
+        generation_id=generation.generation_id,
+        status=generation.status.value
+    )
+    return StoredResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=accepted.model_dump(mode="json"),
+        headers={"Location": f"/api/v1/generation/{generation.generation_id}"},
+        final=final
+    )
+
 @router.post(
     "/generate",
     response_model=GenerateResponse,
     responses={
-        422: {"model": ErrorResponse, "description": "Validation Error"},
-        500: {"model": ErrorResponse, "description": "Image generation failed"}
+        202: {"model": GenerationAcceptedResponse, "description": "Generation queued (async mode, or still running on a worker)"},
+        422: {"model": ErrorResponse, "description": "Validation Error, or Idempotency-Key reused for a different request"},
+        429: {"model": ErrorResponse, "description": "Model quota exhausted"},
+        500: {"model": ErrorResponse, "description": "Image generation failed"},
+        503: {"model": ErrorResponse, "description": "Generation queue is full or the service is overloaded"}
     }
 )
 async def generate_image(
     request: GenerateRequest,
-    service: GeneratorService = Depends(get_generator_service)
+    async_mode: bool = Query(
+        False,
+        alias="async",
+        description="Queue the generation and return 202 immediately instead of waiting for the image."
+    ),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=255,
+        description="Client-chosen key; retries with the same key and body get the original response."
+    ),
+    service: GeneratorService = Depends(get_generator_service),
+    worker_pool: GenerationWorkerPool = Depends(get_worker_pool),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store)
 ):
     """
     Generate an image from a text prompt.
+
+    When jobs run in standalone workers (WORKER_MODE=external), a
+    synchronous request is queued too and waits for the worker; if it
+    has not finished within GENERATION_WAIT_TIMEOUT_SECONDS the response
+    is a 202, as in async mode.
+
+    With an Idempotency-Key, the generation runs once: retries that
+    arrive while it is running wait for it, and later ones get its
+    response replayed with an `Idempotent-Replayed: true` header, for
+    IDEMPOTENCY_TTL_SECONDS. Failed, shed and rate-limited requests are
+    not recorded, so retrying them runs the generation again.
     
     Args:
-        request: Contains the prompt for image generation
+        request: Contains the prompt, output format, quality and thumbnail sizes
+        async_mode: If true, enqueue the work and return 202 with the generation_id
+        idempotency_key: Optional key making retries of this request safe
         service: Injected generator service
+        worker_pool: Injected background generation pool
+        idempotency_store: Injected record of idempotent requests
         
     Returns:
-        GenerateResponse with generation_id, image_url, and status
+        GenerateResponse with generation_id, image_url, and status, or a
+        202 GenerationAcceptedResponse in async mode
         
     Raises:
-        HTTPException: If image generation fails
+        HTTPException: If image generation fails, the queue is full, the
+            request was shed by the concurrency limiter (503 with
+            Retry-After), or the idempotency key was used for another request
+    """
+    output = _output_options(request)
+
+    fingerprint = None
+    if idempotency_key is not None:
+        fingerprint = request_fingerprint({"request": request.model_dump(mode="json"), "async": async_mode})
+
+    async def run() -> StoredResponse:
+        return await _generate(
+            request.prompt, output, async_mode, idempotency_key, fingerprint, service, worker_pool
+        )
+
+    replayed = False
+    if idempotency_key is None:
+        response = await run()
+    else:
+        try:
+            response, replayed = await idempotency_store.run(idempotency_key, fingerprint, run)
+        except IdempotencyKeyReusedError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=str(e)
+            )
+    headers = dict(response.headers)
+    if replayed:
+        headers["Idempotent-Replayed"] = "true"
+    return JSONResponse(status_code=response.status_code, content=response.content, headers=headers)
+
+
+async def _generate(
+    prompt: str,
+    output: OutputOptions,
+    async_mode: bool,
+    idempotency_key: Optional[str],
+    fingerprint: Optional[str],
+    service: GeneratorService,
+    worker_pool: GenerationWorkerPool
+) -> StoredResponse:
+    """
+    Run one /generate request and return its response.
+
+    Raises:
+        HTTPException: For every error response
     """
+    generation_result = None
+    if async_mode or not worker_pool.consume:
+        try:
+            # The queue's own idempotency key dedupes retries sent to other API processes
+            generation = await worker_pool.submit(
+                prompt, output, idempotency_key=idempotency_key, fingerprint=fingerprint
+            )
+        except QueueFullError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e)
+            )
+        if not async_mode:
+            generation_result = await worker_pool.wait_for(
+                generation.generation_id, settings.GENERATION_WAIT_TIMEOUT_SECONDS
+            )
+        if generation_result is None or not generation_result.status.is_terminal:
+            # A synchronous retry should wait for the result again rather than replay this
+            return _accepted(generation, final=async_mode)
+
     try:
-        generation_result = await service.generate_and_store_image(request.prompt)
+        if generation_result is None:
+            generation_result = await service.generate_and_store_image(prompt, output)
         
         if not generation_result or generation_result.status == GenerationStatus.FAILED:
             raise HTTPException(
@@ -50,15 +198,106 @@ async def generate_image(
             )
         
         # Convert the internal model to the public-facing response schema
-        return GenerateResponse(
+        generated = GenerateResponse(
             generation_id=generation_result.generation_id,
             image_url=generation_result.image_url,
-            status="success"
+            status="success",
+            variants=[ImageVariantResponse.model_validate(v) for v in generation_result.variants]
         )
+        return StoredResponse(status_code=status.HTTP_200_OK, content=generated.model_dump(mode="json"))
     except HTTPException:
         raise
+    except RateLimitedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except LimitExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error during image generation: {str(e)}"
         )
+
+
+@router.post(
+    "/generate/batch",
+    response_model=BatchGenerateResponse,
+    responses={
+        422: {"model": ErrorResponse, "description": "Validation Error"}
+    }
+)
+async def generate_image_batch(
+    request: BatchGenerateRequest,
+    service: GeneratorService = Depends(get_generator_service),
+    worker_pool: GenerationWorkerPool = Depends(get_worker_pool)
+):
+    """
+    Generate images for a list of prompts in a single round trip.
+    
+    Items are processed concurrently (bounded by BATCH_MAX_CONCURRENCY) and
+    identical prompts are rendered only once. Model calls are scheduled in
+    the batch lane, behind interactive requests. Each item reports its own
+    outcome, so a failed item does not fail the batch.
+
+    With standalone workers the items are queued instead; an item still
+    running after GENERATION_WAIT_TIMEOUT_SECONDS is reported as an
+    error carrying its generation_id, to be polled.
+    """
+    outputs = [_output_options(item) for item in request.items]
+    prompts = [item.prompt for item in request.items]
+    if worker_pool.consume:
+        with priority_lane(Priority.BATCH):
+            outcomes = await service.generate_batch(
+                prompts,
+                concurrency=settings.BATCH_MAX_CONCURRENCY,
+                outputs=outputs
+            )
+    else:
+        outcomes = await worker_pool.run_batch(
+            prompts, outputs, timeout=settings.GENERATION_WAIT_TIMEOUT_SECONDS
+        )
+
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            results.append(BatchItemResult(
+                index=index,
+                status="error",
+                error=f"Unexpected error during image generation: {str(outcome)}"
+            ))
+        elif not outcome.status.is_terminal:
+            results.append(BatchItemResult(
+                index=index,
+                status="error",
+                generation_id=outcome.generation_id,
+                error="Generation is still in progress, poll GET /generation/{id}"
+            ))
+        elif outcome.status == GenerationStatus.COMPLETED and outcome.image_url:
+            results.append(BatchItemResult(
+                index=index,
+                status="success",
+                generation_id=outcome.generation_id,
+                image_url=outcome.image_url,
+                variants=[ImageVariantResponse.model_validate(v) for v in outcome.variants]
+            ))
+        else:
+            results.append(BatchItemResult(
+                index=index,
+                status="error",
+                generation_id=outcome.generation_id,
+                error=outcome.failure_reason or "Image generation failed"
+            ))
+
+    succeeded = sum(1 for r in results if r.status == "success")
+    return BatchGenerateResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded
+    )
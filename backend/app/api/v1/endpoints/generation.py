@@ -1,11 +1,64 @@
-from fastapi import APIRouter, HTTPException, status
-from app.schemas.generation import GenerationDetailResponse
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from app.core.config import settings
+from app.schemas.generation import (
+    GenerationDetailResponse,
+    GenerationListResponse,
+    GenerationStatus,
+    OutputFormat,
+)
 from app.schemas.common import ErrorResponse
+from app.models.generation import GenerationStatus as ModelGenerationStatus
+from app.models.generation import ImageGeneration as ModelImageGeneration
+from app.models.generation import OutputFormat as ModelOutputFormat
+from app.repositories.base import BaseGenerationRepository
+from app.services.events import GenerationEventBus, iter_generation_events
+from app.services.generator import RENDER_PARAMS
+from app.services.resilience import CircuitOpenError
+from app.services.renderer import is_format_supported
+from app.services.transforms import ImageNotAvailableError, ImageTransformService
+from app.services.worker_pool import GenerationWorkerPool
+from app.api.v1.dependencies import (
+    get_event_bus,
+    get_generation_repository,
+    get_storage_provider,
+    get_transform_service,
+    get_worker_pool,
+)
+from app.core.container import StorageProvider
 
 router = APIRouter()
 
-# TODO: This endpoint requires a storage layer to retrieve generation details
-# For now, returning a placeholder implementation
+
+def _with_current_urls(
+    generations: List[ModelImageGeneration], storage_provider: StorageProvider
+) -> List[ModelImageGeneration]:
+    """
+    Return copies of the generations with their image URLs re-issued by
+    the storage provider, so a stored presigned URL that has since
+    expired is never handed out. Providers sign through their URL cache,
+    so only URLs close to expiry are actually re-signed.
+    """
+    object_names = {variant.object_name for generation in generations for variant in generation.variants}
+    if not object_names:
+        return generations
+    urls = storage_provider.get_public_urls(
+        settings.OBJECT_STORAGE_BUCKET, object_names, expires_seconds=settings.IMAGE_URL_EXPIRES_SECONDS or None
+    )
+    refreshed = []
+    for generation in generations:
+        if not generation.variants:
+            refreshed.append(generation)
+            continue
+        variants = [variant.model_copy(update={"url": urls[variant.object_name]}) for variant in generation.variants]
+        refreshed.append(generation.model_copy(update={"variants": variants, "image_url": variants[0].url}))
+    return refreshed
+
+
 @router.get(
     "/generation/{generation_id}",
     response_model=GenerationDetailResponse,
@@ -14,16 +67,227 @@ router = APIRouter()
         500: {"model": ErrorResponse, "description": "Internal server error"}
     }
 )
-async def get_generation_details(generation_id: str):
+async def get_generation_details(
+    generation_id: str,
+    repository: BaseGenerationRepository = Depends(get_generation_repository),
+    storage_provider: StorageProvider = Depends(get_storage_provider)
+):
     """
     Retrieve details about a specific image generation task.
     
-    TODO: This requires implementing a storage layer for generation metadata.
-    Currently returns a 501 Not Implemented status.
-    """
-    # This endpoint needs a database or storage layer to retrieve generation details
-    # For the MVP, we could skip this endpoint or implement simple in-memory storage
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Generation lookup not yet implemented. This requires a database layer."
+    Generations queued with POST /generate?async=true can be polled here
+    until they reach the completed or failed status.
+    """
+    generation = repository.get(generation_id)
+    if generation is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Generation '{generation_id}' not found"
+        )
+    [generation] = await asyncio.to_thread(_with_current_urls, [generation], storage_provider)
+    return GenerationDetailResponse.model_validate(generation)
+
+
+@router.get(
+    "/generation/{generation_id}/image",
+    response_class=Response,
+    responses={
+        200: {"content": {"image/*": {}}, "description": "The requested rendition"},
+        304: {"description": "Not modified"},
+        404: {"model": ErrorResponse, "description": "Generation or image not found"},
+        409: {"model": ErrorResponse, "description": "Generation has not completed"},
+        422: {"model": ErrorResponse, "description": "Unsupported format"},
+        503: {"model": ErrorResponse, "description": "Storage is unavailable"}
+    }
+)
+async def get_generation_image(
+    generation_id: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=16, le=RENDER_PARAMS["width"], description="Width in pixels"),
+    fmt: Optional[OutputFormat] = Query(None, description="Output format; defaults to the stored format"),
+    q: int = Query(85, ge=1, le=100, description="Encoder quality for lossy formats"),
+    repository: BaseGenerationRepository = Depends(get_generation_repository),
+    transform_service: ImageTransformService = Depends(get_transform_service)
+):
+    """
+    Return a generation's image resized and/or transcoded on demand.
+    
+    A rendition is derived from the stored image on its first request,
+    written back to storage and kept in an in-memory LRU, so repeated
+    requests are served without re-encoding. Supports If-None-Match.
+    """
+    generation = repository.get(generation_id)
+    if generation is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Generation '{generation_id}' not found"
+        )
+    if generation.status != ModelGenerationStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Generation '{generation_id}' is {generation.status.value}"
+        )
+    output_format = ModelOutputFormat(fmt.value) if fmt else generation.output.output_format
+    if not is_format_supported(output_format.value):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Output format '{output_format.value}' is not supported by this server"
+        )
+
+    try:
+        image = await transform_service.get_image(
+            generation,
+            width=w or RENDER_PARAMS["width"],
+            fmt=output_format,
+            quality=q
+        )
+    except ImageNotAvailableError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    headers = {"ETag": image.etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or image.etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=image.data, media_type=image.content_type, headers=headers)
+
+
+@router.get(
+    "/generations",
+    response_model=GenerationListResponse,
+    responses={
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+async def list_generations(
+    status_filter: Optional[GenerationStatus] = Query(None, alias="status"),
+    created_before: Optional[datetime] = Query(
+        None, description="Only return generations created before this time (UTC unless an offset is given)"
+    ),
+    limit: int = Query(50, ge=1, le=500),
+    repository: BaseGenerationRepository = Depends(get_generation_repository),
+    storage_provider: StorageProvider = Depends(get_storage_provider)
+):
+    """
+    List generations newest first, optionally filtered by status.
+    """
+    if created_before is not None:
+        # Records are stamped in UTC; naive and offset times must compare against that
+        if created_before.tzinfo is None:
+            created_before = created_before.replace(tzinfo=timezone.utc)
+        created_before = created_before.astimezone(timezone.utc)
+    generations = await asyncio.to_thread(
+        lambda: _with_current_urls(
+            repository.list(
+                status=ModelGenerationStatus(status_filter.value) if status_filter else None,
+                created_before=created_before,
+                limit=limit,
+            ),
+            storage_provider,
+        )
+    )
+    items = [GenerationDetailResponse.model_validate(g) for g in generations]
+    next_before = items[-1].created_at if len(items) == limit else None
+    return GenerationListResponse(items=items, next_before=next_before)
+
+
+def _stream_generation_events(
+    generation_ids: List[str],
+    repository: BaseGenerationRepository,
+    event_bus: GenerationEventBus,
+    worker_pool: GenerationWorkerPool
+) -> StreamingResponse:
+    """
+    Build a Server-Sent Events response for the given generations, or
+    raise 404 if none of them exist. When jobs run in standalone workers,
+    whose transitions do not reach this process's event bus, the shared
+    repository is polled for changes instead.
+    """
+    initial = [g for g in (repository.get(gid) for gid in generation_ids) if g is not None]
+    if not initial:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Generation not found"
+        )
+    found_ids = [g.generation_id for g in initial]
+
+    async def refresh(ids: List[str]) -> List[Optional[ModelImageGeneration]]:
+        return await asyncio.to_thread(lambda: [repository.get(gid) for gid in ids])
+
+    async def event_source() -> AsyncIterator[str]:
+        # Subscribe only once the body streams, so a client that disconnects
+        # earlier leaves no subscription behind, then re-read the current
+        # state so no transition is missed
+        subscription = event_bus.subscribe(found_ids)
+        try:
+            current = [g for g in await refresh(found_ids) if g is not None] or initial
+            async for generation in iter_generation_events(
+                subscription,
+                current,
+                refresh=None if worker_pool.consume else refresh,
+                refresh_seconds=settings.GENERATION_EVENTS_POLL_SECONDS,
+            ):
+                if generation is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                payload = GenerationDetailResponse.model_validate(generation).model_dump_json()
+                yield f"event: {generation.status.value}\ndata: {payload}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
+
+
+@router.get(
+    "/generation/{generation_id}/events",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Stream of status transitions"},
+        404: {"model": ErrorResponse, "description": "Generation not found"}
+    }
+)
+async def stream_generation_events(
+    generation_id: str,
+    repository: BaseGenerationRepository = Depends(get_generation_repository),
+    event_bus: GenerationEventBus = Depends(get_event_bus),
+    worker_pool: GenerationWorkerPool = Depends(get_worker_pool)
+):
+    """
+    Stream status transitions of a generation as Server-Sent Events.
+    
+    The current state is sent first, followed by each transition
+    (processing, then completed or failed). The stream closes once the
+    generation reaches a terminal status.
+    """
+    return _stream_generation_events([generation_id], repository, event_bus, worker_pool)
+
+
+@router.get(
+    "/generations/events",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Stream of status transitions"},
+        404: {"model": ErrorResponse, "description": "None of the generations were found"}
+    }
+)
+async def stream_multiple_generation_events(
+    ids: List[str] = Query(..., min_length=1, max_length=100, description="Generation IDs to follow"),
+    repository: BaseGenerationRepository = Depends(get_generation_repository),
+    event_bus: GenerationEventBus = Depends(get_event_bus),
+    worker_pool: GenerationWorkerPool = Depends(get_worker_pool)
+):
+    """
+    Stream status transitions for several generations (e.g. an async batch)
+    over a single connection. Unknown IDs are ignored; the stream closes
+    once every known generation has completed or failed.
+    """
+    return _stream_generation_events(ids, repository, event_bus, worker_pool)
@@ -1,4 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+from app.core.container import ServiceContainer
+from app.core.dependencies import NOT_READY_RETRY_AFTER, get_container
 
 router = APIRouter()
 
@@ -7,4 +11,19 @@ async def health_check():
     """
     Simple health check endpoint to confirm the API is running.
     """
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def readiness_check(container: ServiceContainer = Depends(get_container)):
+    """
+    Readiness check: 200 once storage and the model client are warmed up,
+    503 while startup is still in progress (or retrying after an error).
+    """
+    if container.is_ready:
+        return {"status": "ready"}
+    return JSONResponse(
+        status_code=503,
+        content={"status": "starting", "error": container.last_error},
+        headers={"Retry-After": str(NOT_READY_RETRY_AFTER)},
+    )
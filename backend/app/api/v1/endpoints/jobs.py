@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.job_queues.base import Job
+from app.schemas.common import ErrorResponse
+from app.schemas.jobs import DeadLetterListResponse, DeadLetterResponse, WorkerHeartbeatResponse, WorkerListResponse
+from app.services.worker_pool import GenerationWorkerPool
+from app.api.v1.dependencies import get_worker_pool
+
+router = APIRouter()
+
+
+def _dead_letter_response(job: Job) -> DeadLetterResponse:
+    return DeadLetterResponse(
+        job_id=job.job_id,
+        generation_id=job.payload["generation_id"],
+        prompt=job.payload["prompt"],
+        attempts=job.attempts,
+        last_error=job.last_error,
+        created_at=datetime.fromtimestamp(job.created_at, timezone.utc),
+        failed_at=datetime.fromtimestamp(job.updated_at, timezone.utc),
+    )
+
+
+@router.get("/jobs/dead-letters", response_model=DeadLetterListResponse)
+async def list_dead_letters(
+    limit: int = Query(50, ge=1, le=500),
+    worker_pool: GenerationWorkerPool = Depends(get_worker_pool)
+):
+    """
+    List background generation jobs that exhausted their attempts.
+    """
+    jobs = await worker_pool.dead_letters(limit)
+    return DeadLetterListResponse(items=[_dead_letter_response(job) for job in jobs])
+
+
+@router.get("/jobs/workers", response_model=WorkerListResponse)
+async def list_workers(
+    worker_pool: GenerationWorkerPool = Depends(get_worker_pool)
+):
+    """
+    List the live generation workers, embedded or standalone, with their
+    latest throughput.
+    """
+    heartbeats = await worker_pool.heartbeats()
+    return WorkerListResponse(items=[
+        WorkerHeartbeatResponse(
+            worker_id=h["worker_id"],
+            concurrency=h["concurrency"],
+            in_flight=h["in_flight"],
+            jobs_per_second=h.get("jobs_per_second", 0.0),
+            jobs=h.get("jobs", {}),
+            started_at=datetime.fromtimestamp(h["started_at"], timezone.utc),
+            last_seen=datetime.fromtimestamp(h["last_seen"], timezone.utc),
+        )
+        for h in heartbeats
+    ])
+
+
+@router.post(
+    "/jobs/{job_id}/requeue",
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        404: {"model": ErrorResponse, "description": "No dead-lettered job with this ID"}
+    }
+)
+async def requeue_dead_letter(
+    job_id: str,
+    worker_pool: GenerationWorkerPool = Depends(get_worker_pool)
+):
+    """
+    Queue a dead-lettered job again with a fresh attempt budget, e.g.
+    after the outage that made it fail is over.
+    """
+    if not await worker_pool.requeue(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No dead-lettered job '{job_id}'"
+        )
+    return {"job_id": job_id, "status": "queued"}
@@ -1,9 +1,13 @@
 from fastapi import APIRouter
-from .endpoints import generate, generation, health
+from .endpoints import cache, files, generate, generation, health, jobs, metrics
 
 api_router = APIRouter()
 
 # Include routers from the endpoint modules
 api_router.include_router(generate.router, tags=["Image Generation"])
 api_router.include_router(generation.router, tags=["Generation Details"])
+api_router.include_router(jobs.router, tags=["Jobs"])
+api_router.include_router(cache.router, tags=["Cache"])
+api_router.include_router(files.router, tags=["Files"])
 api_router.include_router(health.router, tags=["Health"])
+api_router.include_router(metrics.router, tags=["Metrics"])
@@ -1,16 +1,178 @@
+from typing import List
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
-    GEMINI_API_KEY: str 
-    OBJECT_STORAGE_ENDPOINT: str 
+    GEMINI_API_KEY: str
+    OBJECT_STORAGE_ENDPOINT: str
     OBJECT_STORAGE_BUCKET: str
-    OBJECT_STORAGE_ACCESS_KEY: str 
+    OBJECT_STORAGE_ACCESS_KEY: str
     OBJECT_STORAGE_SECRET_KEY: str
     USE_HTTPS: bool = True
     DEBUG: bool = False
 
+    # Additional Gemini API keys (comma-separated) to spread load across
+    GEMINI_API_KEYS: str = ""
+    # Per-key outbound model quota; 0 disables that budget
+    MODEL_RPM_LIMIT: int = 0
+    MODEL_TPM_LIMIT: int = 0
+    # Tokens budgeted per call on top of the prompt (approximate image output)
+    MODEL_OUTPUT_TOKENS_ESTIMATE: int = 1290
+    # Longest a call may wait for quota per lane before it is rejected with 429
+    MODEL_QUOTA_MAX_WAIT_INTERACTIVE: float = 5.0
+    MODEL_QUOTA_MAX_WAIT_BATCH: float = 30.0
+    MODEL_QUOTA_MAX_WAIT_BACKGROUND: float = 300.0
+
+    # Model backends (comma-separated): "placeholder", "gemini" (one backend
+    # per GEMINI_MODELS entry and API key) and/or "fake" (one per API key)
+    MODEL_BACKENDS: str = "placeholder"
+    GEMINI_MODELS: str = "gemini-1.5-flash"
+    MODEL_REQUEST_TIMEOUT_SECONDS: float = 60.0
+    # Duplicate calls slower than the backend's p95 to a second backend
+    MODEL_HEDGING_ENABLED: bool = False
+    MODEL_HEDGE_QUANTILE: float = 0.95
+    MODEL_HEDGE_MIN_DELAY_SECONDS: float = 0.05
+    # At most this fraction of calls may be hedged
+    MODEL_HEDGE_BUDGET_RATIO: float = 0.1
+    # Per-attempt deadline and attempts for model calls (see resilience policies)
+    MODEL_CALL_DEADLINE_SECONDS: float = 90.0
+    MODEL_CALL_ATTEMPTS: int = 2
+    # Latency (median and log-normal spread) and failure rate of "fake" backends
+    FAKE_MODEL_LATENCY_MS: float = 200.0
+    FAKE_MODEL_LATENCY_SIGMA: float = 0.5
+    # Fraction of "fake" calls that take FAKE_MODEL_SLOW_FACTOR times longer
+    FAKE_MODEL_SLOW_RATE: float = 0.0
+    FAKE_MODEL_SLOW_FACTOR: float = 10.0
+    FAKE_MODEL_ERROR_RATE: float = 0.0
+
+    # Storage backend: "minio", "s3" (boto3), "async_s3" (native asyncio)
+    # or "local" (filesystem, served by /api/v1/files)
+    STORAGE_PROVIDER: str = "minio"
+    STORAGE_REGION: str = "us-east-1"
+    STORAGE_MAX_CONNECTIONS: int = 100
+    STORAGE_MAX_ATTEMPTS: int = 5
+    STORAGE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    STORAGE_KEEPALIVE_EXPIRY: float = 30.0
+    STORAGE_TIMEOUT_SECONDS: float = 30.0
+    STORAGE_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024
+    STORAGE_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024
+    STORAGE_MULTIPART_CONCURRENCY: int = 4
+    # Object key layout: "flat", "hash" (sharded by hash prefix) or "date"
+    # (by creation day), all under an optional OBJECT_KEY_PREFIX
+    OBJECT_KEY_LAYOUT: str = "flat"
+    OBJECT_KEY_PREFIX: str = ""
+    OBJECT_KEY_HASH_LEVELS: int = 2
+    LOCAL_STORAGE_ROOT: str = "data/objects"
+    LOCAL_STORAGE_FSYNC: bool = False
+    # Externally reachable base URL of this API, used for locally served files
+    PUBLIC_BASE_URL: str = "http://localhost:8000"
+    # Presigned URLs are reused until this fraction of their lifetime has elapsed
+    PRESIGNED_URL_REFRESH_FRACTION: float = 0.5
+    PRESIGNED_URL_CACHE_MAX_ENTRIES: int = 100000
+    # Lifetime of the presigned image URLs returned by GET /generation(s);
+    # 0 returns direct URLs, for public buckets
+    IMAGE_URL_EXPIRES_SECONDS: int = 0
+    # Encode renditions straight into chunked / multipart uploads through a
+    # bounded pipe instead of buffering each encoded image first
+    STREAMING_UPLOAD_ENABLED: bool = False
+    STREAMING_UPLOAD_CHUNK_SIZE: int = 256 * 1024
+    STREAMING_UPLOAD_MAX_CHUNKS: int = 4
+    # Per-attempt deadline and attempts for storage calls made by the services
+    STORAGE_CALL_DEADLINE_SECONDS: float = 30.0
+    STORAGE_CALL_ATTEMPTS: int = 3
+
+    # Resilience policies: jittered exponential backoff between retries, and
+    # a circuit breaker per dependency that opens after consecutive failures
+    RETRY_BACKOFF_BASE_SECONDS: float = 0.1
+    RETRY_BACKOFF_MAX_SECONDS: float = 2.0
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RECOVERY_SECONDS: float = 10.0
+
+    # Background generation (POST /generate?async=true)
+    GENERATION_WORKER_CONCURRENCY: int = 4
+    GENERATION_QUEUE_MAX_SIZE: int = 1000
+    # Job queue: "memory" (lost on restart), "sqlite" (durable, one host) or
+    # "redis" (durable, shared across hosts)
+    JOB_QUEUE_BACKEND: str = "memory"
+    JOB_QUEUE_SQLITE_PATH: str = "jobs.db"
+    JOB_QUEUE_REDIS_URL: str = "redis://localhost:6379/0"
+    JOB_QUEUE_NAMESPACE: str = "generation-jobs"
+    JOB_LEASE_SECONDS: float = 60.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 5.0
+    JOB_POLL_INTERVAL_SECONDS: float = 0.5
+    JOB_RETENTION_SECONDS: float = 86400
+    # "embedded" runs queued jobs in the API process; "external" leaves them
+    # to `python -m app.worker` processes and the API only enqueues
+    WORKER_MODE: str = "embedded"
+    WORKER_HEARTBEAT_SECONDS: float = 10.0
+    WORKER_DRAIN_TIMEOUT_SECONDS: float = 60.0
+    # How long a synchronous request waits on an external worker before a 202
+    GENERATION_WAIT_TIMEOUT_SECONDS: float = 120.0
+    # How often SSE streams re-read generations run by external workers
+    GENERATION_EVENTS_POLL_SECONDS: float = 1.0
+
+    # Generation metadata store: "memory" or "sqlite"
+    GENERATION_STORE_BACKEND: str = "memory"
+    GENERATION_STORE_MAX_ENTRIES: int = 100000
+    GENERATION_STORE_SQLITE_PATH: str = "generations.db"
+    GENERATION_STORE_BATCH_SIZE: int = 100
+    GENERATION_STORE_FLUSH_INTERVAL: float = 0.5
+
+    # Content-addressed prompt result cache
+    PROMPT_CACHE_ENABLED: bool = True
+    PROMPT_CACHE_MAX_ENTRIES: int = 10000
+    PROMPT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    PROMPT_CACHE_TTL_SECONDS: float = 3600
+
+    # Share one in-progress generation between concurrent identical prompts
+    GENERATION_COALESCING_ENABLED: bool = True
+
+    # POST /generate responses replayed to retries with the same Idempotency-Key
+    IDEMPOTENCY_TTL_SECONDS: float = 86400
+    IDEMPOTENCY_MAX_ENTRIES: int = 100000
+
+    # Adaptive concurrency limits (AIMD on latency) for model calls and uploads
+    CONCURRENCY_LIMITER_ENABLED: bool = True
+    MODEL_CONCURRENCY_INITIAL: int = 16
+    MODEL_CONCURRENCY_MIN: int = 2
+    MODEL_CONCURRENCY_MAX: int = 64
+    UPLOAD_CONCURRENCY_INITIAL: int = 32
+    UPLOAD_CONCURRENCY_MIN: int = 4
+    UPLOAD_CONCURRENCY_MAX: int = 256
+    # Back off when latency exceeds this multiple of the best recent latency
+    CONCURRENCY_LATENCY_TOLERANCE: float = 2.0
+    CONCURRENCY_BACKOFF_RATIO: float = 0.9
+    # Background jobs wait this long for a slot instead of being shed
+    BACKGROUND_ADMISSION_WAIT_SECONDS: float = 30.0
+
+    # Placeholder rendering: 0 renders on the thread pool, >0 uses a process pool
+    RENDER_PROCESS_WORKERS: int = 0
+    # Dedicated render threads instead of the shared default thread pool (0)
+    RENDER_THREAD_WORKERS: int = 0
+
+    # POST /generate/batch
+    BATCH_MAX_CONCURRENCY: int = 8
+
+    # GET /generation/{id}/image on-demand renditions
+    IMAGE_VARIANT_CACHE_MAX_ENTRIES: int = 1000
+    IMAGE_VARIANT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    IMAGE_TRANSFORM_WRITE_BACK: bool = True
+
     model_config = ConfigDict(env_file=".env")
-        
-settings = Settings()
 
+    @property
+    def gemini_api_keys(self) -> List[str]:
+        """GEMINI_API_KEY followed by any distinct GEMINI_API_KEYS."""
+        keys = [self.GEMINI_API_KEY]
+        for key in (k.strip() for k in self.GEMINI_API_KEYS.split(",")):
+            if key and key not in keys:
+                keys.append(key)
+        return keys
+
+    @property
+    def gemini_models(self) -> List[str]:
+        return [m.strip() for m in self.GEMINI_MODELS.split(",") if m.strip()]
+
+settings = Settings()
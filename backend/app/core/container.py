@@ -0,0 +1,500 @@
+"""
+Application-scoped service container.
+
+Built once in the FastAPI lifespan hook and shared by every request.
+Cheap, in-process components are created immediately; the storage
+client and model SDK are imported, connected and warmed up in the
+background, off the event loop, and requests that need them are
+rejected with 503 until the container reports ready.
+"""
+import asyncio
+from typing import Dict, List, Optional, Tuple, Union
+import logging
+
+from app.core.config import Settings
+from app.core.metrics import REGISTRY
+from app.job_queues.base import BaseJobQueue
+from app.models.generation import add_transition_listener, remove_transition_listener
+from app.repositories.base import BaseGenerationRepository
+from app.model_backends.base import BaseModelBackend, ModelRateLimitedError
+from app.model_backends.router import ModelBackendRouter
+from app.services.cache import PromptResultCache
+from app.services.events import GenerationEventBus
+from app.services.generator import MODEL_NAME, GeneratorService
+from app.services.idempotency import IdempotencyStore
+from app.services.limiter import AdaptiveConcurrencyLimiter
+from app.services.rate_limiter import ModelQuotaScheduler, Priority
+from app.services.renderer import PlaceholderRenderer
+from app.services.resilience import CircuitBreaker, ResiliencePolicy
+from app.services.singleflight import SingleFlight
+from app.services.transforms import DerivedImageCache, ImageTransformService
+from app.services.worker_pool import GenerationWorkerPool
+from app.storage_providers.base import AsyncBaseStorageProvider, BaseStorageProvider, ObjectNotFoundError
+from app.storage_providers.key_layout import (
+    BaseKeyLayout,
+    DatePrefixKeyLayout,
+    FlatKeyLayout,
+    HashPrefixKeyLayout,
+)
+from app.storage_providers.url_cache import PresignedUrlCache
+
+logger = logging.getLogger(__name__)
+
+StorageProvider = Union[BaseStorageProvider, AsyncBaseStorageProvider]
+
+
+class ServiceNotReadyError(Exception):
+    """Raised when a component is requested before warm-up has finished."""
+
+
+def build_storage_provider(settings: Settings) -> StorageProvider:
+    """
+    Create the storage provider selected by STORAGE_PROVIDER. Provider
+    modules are imported here so only the selected SDK is loaded. Blocking
+    providers check their bucket in the constructor, so call this off the
+    event loop.
+    """
+    provider = settings.STORAGE_PROVIDER.lower()
+    url_cache = PresignedUrlCache(
+        refresh_fraction=settings.PRESIGNED_URL_REFRESH_FRACTION,
+        max_entries=settings.PRESIGNED_URL_CACHE_MAX_ENTRIES,
+    )
+    if provider == "async_s3":
+        from app.storage_providers.async_s3 import AsyncS3StorageProvider
+        return AsyncS3StorageProvider(
+            settings.OBJECT_STORAGE_ENDPOINT,
+            settings.OBJECT_STORAGE_ACCESS_KEY,
+            settings.OBJECT_STORAGE_SECRET_KEY,
+            secure=settings.USE_HTTPS,
+            region=settings.STORAGE_REGION,
+            max_connections=settings.STORAGE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.STORAGE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.STORAGE_KEEPALIVE_EXPIRY,
+            timeout_seconds=settings.STORAGE_TIMEOUT_SECONDS,
+            multipart_threshold=settings.STORAGE_MULTIPART_THRESHOLD,
+            part_size=settings.STORAGE_MULTIPART_PART_SIZE,
+            max_part_concurrency=settings.STORAGE_MULTIPART_CONCURRENCY,
+            url_cache=url_cache,
+        )
+    if provider == "s3":
+        from app.storage_providers.s3 import S3StorageProvider
+        return S3StorageProvider(
+            settings.OBJECT_STORAGE_ENDPOINT,
+            settings.OBJECT_STORAGE_ACCESS_KEY,
+            settings.OBJECT_STORAGE_SECRET_KEY,
+            secure=settings.USE_HTTPS,
+            region=settings.STORAGE_REGION,
+            bucket=settings.OBJECT_STORAGE_BUCKET,
+            max_pool_connections=settings.STORAGE_MAX_CONNECTIONS,
+            max_attempts=settings.STORAGE_MAX_ATTEMPTS,
+            read_timeout=settings.STORAGE_TIMEOUT_SECONDS,
+            multipart_threshold=settings.STORAGE_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.STORAGE_MULTIPART_PART_SIZE,
+            max_concurrency=settings.STORAGE_MULTIPART_CONCURRENCY,
+            url_cache=url_cache,
+        )
+    if provider == "local":
+        from app.storage_providers.local import LocalFilesystemStorageProvider
+        return LocalFilesystemStorageProvider(
+            settings.LOCAL_STORAGE_ROOT,
+            settings.PUBLIC_BASE_URL,
+            fsync=settings.LOCAL_STORAGE_FSYNC,
+        )
+    if provider == "minio":
+        from app.storage_providers.minio import MinioStorageProvider
+        return MinioStorageProvider(url_cache=url_cache)
+    raise ValueError(f"Unknown STORAGE_PROVIDER: {settings.STORAGE_PROVIDER}")
+
+
+def build_key_layout(settings: Settings) -> BaseKeyLayout:
+    """Create the object key layout selected by OBJECT_KEY_LAYOUT."""
+    layout = settings.OBJECT_KEY_LAYOUT.lower()
+    if layout == "hash":
+        return HashPrefixKeyLayout(settings.OBJECT_KEY_PREFIX, levels=settings.OBJECT_KEY_HASH_LEVELS)
+    if layout == "date":
+        return DatePrefixKeyLayout(settings.OBJECT_KEY_PREFIX, levels=settings.OBJECT_KEY_HASH_LEVELS)
+    if layout == "flat":
+        return FlatKeyLayout(settings.OBJECT_KEY_PREFIX)
+    raise ValueError(f"Unknown OBJECT_KEY_LAYOUT: {settings.OBJECT_KEY_LAYOUT}")
+
+
+def build_generation_repository(settings: Settings) -> BaseGenerationRepository:
+    """Create the generation metadata store selected by GENERATION_STORE_BACKEND."""
+    backend = settings.GENERATION_STORE_BACKEND.lower()
+    if backend == "sqlite":
+        from app.repositories.sqlite import SqliteGenerationRepository
+        return SqliteGenerationRepository(
+            settings.GENERATION_STORE_SQLITE_PATH,
+            batch_size=settings.GENERATION_STORE_BATCH_SIZE,
+            flush_interval=settings.GENERATION_STORE_FLUSH_INTERVAL,
+        )
+    if backend == "memory":
+        from app.repositories.memory import InMemoryGenerationRepository
+        return InMemoryGenerationRepository(max_entries=settings.GENERATION_STORE_MAX_ENTRIES)
+    raise ValueError(f"Unknown GENERATION_STORE_BACKEND: {settings.GENERATION_STORE_BACKEND}")
+
+
+def build_job_queue(settings: Settings) -> BaseJobQueue:
+    """Create the generation job queue selected by JOB_QUEUE_BACKEND."""
+    backend = settings.JOB_QUEUE_BACKEND.lower()
+    if backend == "sqlite":
+        from app.job_queues.sqlite import SqliteJobQueue
+        return SqliteJobQueue(settings.JOB_QUEUE_SQLITE_PATH)
+    if backend == "redis":
+        from redis import Redis
+        from app.job_queues.redis import RedisJobQueue
+        client = Redis.from_url(settings.JOB_QUEUE_REDIS_URL, decode_responses=True)
+        return RedisJobQueue(client, namespace=settings.JOB_QUEUE_NAMESPACE)
+    if backend == "memory":
+        from app.job_queues.memory import InMemoryJobQueue
+        return InMemoryJobQueue()
+    raise ValueError(f"Unknown JOB_QUEUE_BACKEND: {settings.JOB_QUEUE_BACKEND}")
+
+
+def build_limiter(
+    settings: Settings, name: str, initial: int, minimum: int, maximum: int
+) -> Optional[AdaptiveConcurrencyLimiter]:
+    """Create an adaptive concurrency limiter, or None when limiting is disabled."""
+    if not settings.CONCURRENCY_LIMITER_ENABLED:
+        return None
+    return AdaptiveConcurrencyLimiter(
+        name,
+        initial_limit=initial,
+        min_limit=minimum,
+        max_limit=maximum,
+        latency_tolerance=settings.CONCURRENCY_LATENCY_TOLERANCE,
+        backoff_ratio=settings.CONCURRENCY_BACKOFF_RATIO,
+    )
+
+
+def build_quota_scheduler(settings: Settings) -> Optional[ModelQuotaScheduler]:
+    """Create the outbound model quota scheduler, or None when no budget is configured."""
+    if settings.MODEL_RPM_LIMIT <= 0 and settings.MODEL_TPM_LIMIT <= 0:
+        return None
+    return ModelQuotaScheduler(
+        settings.gemini_api_keys,
+        rpm=settings.MODEL_RPM_LIMIT,
+        tpm=settings.MODEL_TPM_LIMIT,
+        max_wait={
+            Priority.INTERACTIVE: settings.MODEL_QUOTA_MAX_WAIT_INTERACTIVE,
+            Priority.BATCH: settings.MODEL_QUOTA_MAX_WAIT_BATCH,
+            Priority.BACKGROUND: settings.MODEL_QUOTA_MAX_WAIT_BACKGROUND,
+        },
+    )
+
+
+def build_policy(
+    settings: Settings, name: str, deadline: float, attempts: int, non_retryable: Tuple[type, ...] = ()
+) -> ResiliencePolicy:
+    """Create the retry / deadline / circuit-breaker policy for one dependency."""
+    breaker = None
+    if settings.CIRCUIT_BREAKER_ENABLED:
+        breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_seconds=settings.CIRCUIT_RECOVERY_SECONDS,
+        )
+    return ResiliencePolicy(
+        name,
+        timeout_seconds=deadline,
+        max_attempts=attempts,
+        backoff_base=settings.RETRY_BACKOFF_BASE_SECONDS,
+        backoff_max=settings.RETRY_BACKOFF_MAX_SECONDS,
+        breaker=breaker,
+        non_retryable=non_retryable,
+    )
+
+
+def build_model_backend(
+    settings: Settings, renderer: PlaceholderRenderer, quota_scheduler: Optional[ModelQuotaScheduler]
+) -> ModelBackendRouter:
+    """
+    Create the backends listed in MODEL_BACKENDS behind a router. Key ids
+    follow the quota scheduler's numbering of `settings.gemini_api_keys`.
+    """
+    keys = list(enumerate(settings.gemini_api_keys))
+    model_names = settings.gemini_models or [MODEL_NAME]
+    backends: List[BaseModelBackend] = []
+    for kind in (k.strip().lower() for k in settings.MODEL_BACKENDS.split(",") if k.strip()):
+        if kind == "placeholder":
+            from app.model_backends.placeholder import PlaceholderModelBackend
+            backends.append(PlaceholderModelBackend(renderer))
+        elif kind == "gemini":
+            from app.model_backends.gemini import GeminiModelBackend
+            backends.extend(
+                GeminiModelBackend(
+                    api_key, model_name, renderer,
+                    key_id=f"key{i}",
+                    timeout_seconds=settings.MODEL_REQUEST_TIMEOUT_SECONDS,
+                )
+                for model_name in model_names
+                for i, api_key in keys
+            )
+        elif kind == "fake":
+            from app.model_backends.fake import FakeModelBackend
+            backends.extend(
+                FakeModelBackend(
+                    renderer,
+                    name=f"fake:key{i}",
+                    key_id=f"key{i}",
+                    latency_ms=settings.FAKE_MODEL_LATENCY_MS,
+                    latency_sigma=settings.FAKE_MODEL_LATENCY_SIGMA,
+                    slow_rate=settings.FAKE_MODEL_SLOW_RATE,
+                    slow_factor=settings.FAKE_MODEL_SLOW_FACTOR,
+                    error_rate=settings.FAKE_MODEL_ERROR_RATE,
+                )
+                for i, _ in keys
+            )
+        else:
+            raise ValueError(f"Unknown model backend in MODEL_BACKENDS: {kind}")
+    return ModelBackendRouter(
+        backends,
+        hedging=settings.MODEL_HEDGING_ENABLED,
+        hedge_quantile=settings.MODEL_HEDGE_QUANTILE,
+        hedge_min_delay=settings.MODEL_HEDGE_MIN_DELAY_SECONDS,
+        hedge_budget_ratio=settings.MODEL_HEDGE_BUDGET_RATIO,
+        quota_scheduler=quota_scheduler,
+    )
+
+
+class ServiceContainer:
+    """
+    Owns the long-lived components of the application and their startup
+    and shutdown order.
+
+    `role` is "api" for the HTTP server and "worker" for `app.worker`.
+    The worker pool runs queued jobs in a worker, and in the API only
+    when WORKER_MODE is "embedded".
+    """
+
+    def __init__(self, settings: Settings, *, role: str = "api"):
+        if role not in ("api", "worker"):
+            raise ValueError(f"Unknown container role: {role}")
+        if settings.WORKER_MODE.lower() not in ("embedded", "external"):
+            raise ValueError(f"Unknown WORKER_MODE: {settings.WORKER_MODE}")
+        external = role == "worker" or settings.WORKER_MODE.lower() == "external"
+        if external and "memory" in (settings.JOB_QUEUE_BACKEND.lower(), settings.GENERATION_STORE_BACKEND.lower()):
+            raise ValueError(
+                "Separate worker processes need a shared JOB_QUEUE_BACKEND (sqlite or redis) "
+                "and GENERATION_STORE_BACKEND (sqlite)"
+            )
+        self.settings = settings
+        self.role = role
+        self.repository = build_generation_repository(settings)
+        self.result_cache: Optional[PromptResultCache] = None
+        if settings.PROMPT_CACHE_ENABLED:
+            self.result_cache = PromptResultCache(
+                max_entries=settings.PROMPT_CACHE_MAX_ENTRIES,
+                max_bytes=settings.PROMPT_CACHE_MAX_BYTES,
+                ttl_seconds=settings.PROMPT_CACHE_TTL_SECONDS,
+            )
+        self.single_flight: Optional[SingleFlight] = SingleFlight() if settings.GENERATION_COALESCING_ENABLED else None
+        self.idempotency_store = IdempotencyStore(
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+        )
+        self.renderer = PlaceholderRenderer(
+            process_workers=settings.RENDER_PROCESS_WORKERS,
+            thread_workers=settings.RENDER_THREAD_WORKERS,
+        )
+        self.event_bus = GenerationEventBus()
+        self.model_limiter = build_limiter(
+            settings, "model",
+            settings.MODEL_CONCURRENCY_INITIAL, settings.MODEL_CONCURRENCY_MIN, settings.MODEL_CONCURRENCY_MAX,
+        )
+        self.quota_scheduler = build_quota_scheduler(settings)
+        self.model_backend = build_model_backend(settings, self.renderer, self.quota_scheduler)
+        # A rate-limited model is healthy, just busy: the router and quota scheduler handle it
+        self.model_policy = build_policy(
+            settings, "model",
+            settings.MODEL_CALL_DEADLINE_SECONDS, settings.MODEL_CALL_ATTEMPTS, (ModelRateLimitedError,),
+        )
+        self.storage_policy = build_policy(
+            settings, "storage",
+            settings.STORAGE_CALL_DEADLINE_SECONDS, settings.STORAGE_CALL_ATTEMPTS, (ObjectNotFoundError,),
+        )
+        self.upload_limiter = build_limiter(
+            settings, "upload",
+            settings.UPLOAD_CONCURRENCY_INITIAL, settings.UPLOAD_CONCURRENCY_MIN, settings.UPLOAD_CONCURRENCY_MAX,
+        )
+        self.variant_cache = DerivedImageCache(
+            max_entries=settings.IMAGE_VARIANT_CACHE_MAX_ENTRIES,
+            max_bytes=settings.IMAGE_VARIANT_CACHE_MAX_BYTES,
+        )
+        self.key_layout = build_key_layout(settings)
+        self.job_queue = build_job_queue(settings)
+        self.worker_pool = GenerationWorkerPool(
+            lambda: self.generator_service,
+            concurrency=settings.GENERATION_WORKER_CONCURRENCY,
+            max_queue_size=settings.GENERATION_QUEUE_MAX_SIZE,
+            admission_wait_seconds=settings.BACKGROUND_ADMISSION_WAIT_SECONDS,
+            job_queue=self.job_queue,
+            lease_seconds=settings.JOB_LEASE_SECONDS,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            retry_backoff_seconds=settings.JOB_RETRY_BACKOFF_SECONDS,
+            poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+            retention_seconds=settings.JOB_RETENTION_SECONDS,
+            consume=role == "worker" or not external,
+            heartbeat_interval=settings.WORKER_HEARTBEAT_SECONDS,
+        )
+        self._storage_provider: Optional[StorageProvider] = None
+        self._generator_service: Optional[GeneratorService] = None
+        self._transform_service: Optional[ImageTransformService] = None
+        self._ready = asyncio.Event()
+        self._warm_up_task: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+        self._metric_names: List[str] = []
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def storage_provider(self) -> StorageProvider:
+        if self._storage_provider is None:
+            raise ServiceNotReadyError("Storage provider is still starting up")
+        return self._storage_provider
+
+    @property
+    def generator_service(self) -> GeneratorService:
+        if self._generator_service is None:
+            raise ServiceNotReadyError("Generator service is still starting up")
+        return self._generator_service
+
+    @property
+    def transform_service(self) -> ImageTransformService:
+        if self._transform_service is None:
+            raise ServiceNotReadyError("Image transform service is still starting up")
+        return self._transform_service
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait until warm-up has finished; return False on timeout."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def start(self) -> None:
+        """Start in-process components and kick off background warm-up."""
+        self.event_bus.bind_loop(asyncio.get_running_loop())
+        add_transition_listener(self.event_bus.publish)
+        self._register_metrics()
+        self._warm_up_task = asyncio.create_task(self._warm_up(), name="service-container-warm-up")
+
+    async def stop(self, *, drain_timeout: Optional[float] = None) -> None:
+        """
+        Drain background work and release every resource, in reverse
+        order. Jobs still running after `drain_timeout` are cancelled.
+        """
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+            await asyncio.gather(self._warm_up_task, return_exceptions=True)
+        await self.worker_pool.stop(drain=self.is_ready, timeout=drain_timeout)
+        if self._transform_service is not None:
+            await self._transform_service.drain()
+        remove_transition_listener(self.event_bus.publish)
+        for name in self._metric_names:
+            REGISTRY.unregister(name)
+        await self.model_backend.aclose()
+        await asyncio.to_thread(self.job_queue.close)
+        await asyncio.to_thread(self.repository.close)
+        await asyncio.to_thread(self.renderer.shutdown)
+        if isinstance(self._storage_provider, AsyncBaseStorageProvider):
+            await self._storage_provider.aclose()
+
+    def _register_metrics(self) -> None:
+        """Export component-owned counters and gauges, read at scrape time."""
+        def events(stats: Optional[Dict[str, int]], names: Tuple[str, ...]):
+            return [({"event": n}, stats[n]) for n in names] if stats else []
+
+        def url_cache_stats() -> Optional[Dict[str, int]]:
+            url_cache = getattr(self._storage_provider, "url_cache", None)
+            return url_cache.stats() if url_cache is not None else None
+
+        def prompt_stats() -> Optional[Dict[str, int]]:
+            return self.result_cache.stats() if self.result_cache is not None else None
+
+        collectors = [
+            ("generation_queue_depth", "Generations waiting for a background worker.", "gauge",
+             lambda: [({}, self.worker_pool.queue_depth)]),
+            ("generation_jobs", "Background generation jobs by state, including dead-lettered ones.", "gauge",
+             lambda: [({"state": s.value}, n) for s, n in self.job_queue.counts().items()]),
+            ("singleflight_in_flight", "Distinct generations currently being coalesced.", "gauge",
+             lambda: [({}, self.single_flight.in_flight)] if self.single_flight else []),
+            ("singleflight_coalesced_total", "Requests that joined an in-progress generation.", "counter",
+             lambda: [({}, self.single_flight.coalesced)] if self.single_flight else []),
+            ("idempotency_events_total", "POST /generate requests by Idempotency-Key outcome.", "counter",
+             lambda: events(self.idempotency_store.stats(), ("replays", "joins", "misses", "evictions"))),
+            ("executor_capacity", "Workers available to an executor.", "gauge",
+             lambda: [({"executor": "render"}, self.renderer.capacity)]),
+            ("service_ready", "1 once storage and the model client are warmed up.", "gauge",
+             lambda: [({}, 1 if self.is_ready else 0)]),
+            ("prompt_cache_events_total", "Prompt result cache lookups and evictions.", "counter",
+             lambda: events(prompt_stats(), ("hits", "misses", "cold_hits", "evictions", "expirations"))),
+            ("prompt_cache_bytes", "Estimated memory held by the prompt result cache.", "gauge",
+             lambda: [({}, prompt_stats()["bytes"])] if self.result_cache else []),
+            ("variant_cache_events_total", "On-demand rendition cache lookups and evictions.", "counter",
+             lambda: events(self.variant_cache.stats(), ("hits", "misses", "evictions"))),
+            ("variant_cache_bytes", "Bytes held by the on-demand rendition cache.", "gauge",
+             lambda: [({}, self.variant_cache.stats()["bytes"])]),
+            ("model_backend_error_rate", "Smoothed error rate of each model backend.", "gauge",
+             lambda: [({"backend": n}, s["error_rate"]) for n, s in self.model_backend.stats().items()]),
+            ("model_backend_latency_p95_seconds", "Recent p95 latency of each model backend.", "gauge",
+             lambda: [({"backend": n}, s["p95_seconds"]) for n, s in self.model_backend.stats().items()]),
+            ("presigned_url_cache_events_total", "Presigned URL cache lookups.", "counter",
+             lambda: events(url_cache_stats(), ("hits", "misses"))),
+        ]
+        for name, documentation, kind, collector in collectors:
+            REGISTRY.register_collector(name, documentation, collector, kind=kind)
+            self._metric_names.append(name)
+
+    async def _warm_up(self) -> None:
+        """
+        Connect to storage and load the model SDK without blocking the
+        event loop, retrying with backoff until it succeeds.
+        """
+        delay = 1.0
+        while True:
+            try:
+                if self._storage_provider is None:
+                    storage_provider = await asyncio.to_thread(build_storage_provider, self.settings)
+                    if isinstance(storage_provider, AsyncBaseStorageProvider):
+                        await storage_provider.ensure_bucket(self.settings.OBJECT_STORAGE_BUCKET)
+                    self._storage_provider = storage_provider
+                service = GeneratorService(
+                    self._storage_provider,
+                    self.repository,
+                    self.result_cache,
+                    self.single_flight,
+                    self.renderer,
+                    model_limiter=self.model_limiter,
+                    upload_limiter=self.upload_limiter,
+                    quota_scheduler=self.quota_scheduler,
+                    model_backend=self.model_backend,
+                    model_policy=self.model_policy,
+                    storage_policy=self.storage_policy,
+                    streaming_upload=self.settings.STREAMING_UPLOAD_ENABLED,
+                    key_layout=self.key_layout,
+                )
+                await asyncio.to_thread(service.warm_up)
+                self._generator_service = service
+                self._transform_service = ImageTransformService(
+                    self._storage_provider,
+                    self.renderer,
+                    self.settings.OBJECT_STORAGE_BUCKET,
+                    cache=self.variant_cache,
+                    write_back=self.settings.IMAGE_TRANSFORM_WRITE_BACK,
+                    storage_policy=self.storage_policy,
+                )
+                # Jobs left in a durable queue need the generator service
+                await self.worker_pool.start()
+                self.last_error = None
+                self._ready.set()
+                logger.info("service_container.ready")
+                return
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("service_container.warm_up_failed", extra={"retry_in": delay})
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
@@ -1,17 +1,23 @@
-from fastapi import Depends, Request
-from app.storage_providers.base import BaseStorageProvider
-from app.storage_providers.minio import MinioStorageProvider
-from app.services.generator import GeneratorService
+from fastapi import HTTPException, Request, status
 
-# This is a simple way to create a singleton instance of the storage provider.
-# For more complex apps, you might use a more robust dependency injection framework.
-minio_provider = MinioStorageProvider()
-minio_provider.init() # Initialize the client and check for the bucket
+from app.core.container import ServiceContainer
 
-generator_service = GeneratorService(storage_provider=minio_provider)
+# Seconds clients are asked to wait while the container is warming up
+NOT_READY_RETRY_AFTER = 5
 
-def get_generator_service() -> GeneratorService:
+
+def get_container(request: Request) -> ServiceContainer:
     """
-    Dependency injector that provides a singleton instance of the GeneratorService.
+    Dependency injector that provides the application-scoped ServiceContainer
+    created in the lifespan hook.
     """
-    return generator_service
\ No newline at end of file
+    return request.app.state.container
+
+
+def service_unavailable(detail: str) -> HTTPException:
+    """503 response telling the client to retry once startup has finished."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": str(NOT_READY_RETRY_AFTER)},
+    )
@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+import time
+
+
+class JobState(str, Enum):
+    """Lifecycle of a queued job."""
+    READY = "ready"      # Waiting to be leased, possibly after `available_at`
+    LEASED = "leased"    # Held by a worker until `lease_expires_at`
+    DONE = "done"
+    DEAD = "dead"        # Gave up after `max_attempts`; kept for inspection
+
+
+@dataclass
+class Job:
+    """
+    A unit of queued work. `payload` must be JSON-serializable.
+
+    `attempts` counts leases, so a job whose worker died mid-run is
+    charged an attempt too; `lease_token` identifies the current lease
+    and must be presented to ack, retry or dead-letter the job.
+    """
+    job_id: str
+    payload: Dict[str, Any]
+    state: JobState = JobState.READY
+    attempts: int = 0
+    max_attempts: int = 3
+    idempotency_key: Optional[str] = None
+    available_at: float = field(default_factory=time.time)
+    lease_token: Optional[str] = None
+    leased_by: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    last_error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def exhausted(self) -> bool:
+        """True once the job has been leased more often than it may be attempted."""
+        return self.attempts > self.max_attempts
+
+
+class BaseJobQueue(ABC):
+    """
+    Abstract base class for generation job queues.
+
+    Jobs are leased rather than popped: a leased job becomes visible to
+    other workers again once its lease expires, so work held by a worker
+    that crashed is picked up elsewhere. Workers extend the lease while
+    they run and settle each job exactly once with `ack`, `retry` or
+    `dead_letter`; a settle call with a lost lease returns False and
+    changes nothing.
+
+    Methods block, so call them off the event loop.
+    """
+
+    # Whether queued jobs survive a restart of the process
+    durable: bool = True
+
+    @abstractmethod
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        *,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = 3,
+        delay_seconds: float = 0.0,
+    ) -> Tuple[Job, bool]:
+        """
+        Add a job, or return the existing one if a job was already
+        submitted with `idempotency_key`.
+
+        Returns:
+            The job and whether it was created by this call.
+        """
+
+    @abstractmethod
+    def lease(self, worker_id: str, *, lease_seconds: float, limit: int = 1) -> List[Job]:
+        """
+        Lease up to `limit` visible jobs, oldest first: ready jobs whose
+        `available_at` has passed and leased jobs whose lease expired.
+        Each lease increments `attempts`.
+        """
+
+    @abstractmethod
+    def extend(self, job: Job, lease_seconds: float) -> bool:
+        """Push the lease deadline of `job` out to `lease_seconds` from now."""
+
+    @abstractmethod
+    def ack(self, job: Job) -> bool:
+        """Mark a leased job as done."""
+
+    @abstractmethod
+    def retry(self, job: Job, error: str, *, delay_seconds: float = 0.0) -> bool:
+        """Release a leased job to be attempted again after `delay_seconds`."""
+
+    @abstractmethod
+    def dead_letter(self, job: Job, error: str) -> bool:
+        """Move a leased job to the dead-letter set."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return the job with the given ID, or None if unknown."""
+
+    @abstractmethod
+    def dead_letters(self, limit: int = 50) -> List[Job]:
+        """Return dead-lettered jobs, most recently failed first."""
+
+    @abstractmethod
+    def requeue(self, job_id: str) -> bool:
+        """Return a dead-lettered job to the queue with a fresh attempt budget."""
+
+    @abstractmethod
+    def counts(self) -> Dict[JobState, int]:
+        """Number of jobs in each state."""
+
+    @abstractmethod
+    def purge(self, finished_before: float) -> int:
+        """
+        Delete done and dead jobs last updated before `finished_before`,
+        releasing their idempotency keys. Returns the number deleted.
+        """
+
+    @abstractmethod
+    def record_heartbeat(self, worker_id: str, info: Dict[str, Any], *, ttl_seconds: float) -> None:
+        """Publish a worker's liveness and stats, considered stale after `ttl_seconds`."""
+
+    @abstractmethod
+    def remove_heartbeat(self, worker_id: str) -> None:
+        """Withdraw a worker's heartbeat, e.g. on graceful shutdown."""
+
+    @abstractmethod
+    def heartbeats(self) -> List[Dict[str, Any]]:
+        """The latest `info` of every worker whose heartbeat has not gone stale."""
+
+    def depth(self) -> int:
+        """Jobs waiting to be leased."""
+        return self.counts().get(JobState.READY, 0)
+
+    def close(self) -> None:
+        """Release resources."""
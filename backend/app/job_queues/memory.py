@@ -0,0 +1,195 @@
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
+import heapq
+import threading
+import time
+import uuid
+
+from app.utils.id_generator import generate_unique_id
+from .base import BaseJobQueue, Job, JobState
+
+
+class InMemoryJobQueue(BaseJobQueue):
+    """
+    Process-local job queue. Not durable: queued jobs are lost with the
+    process, as with the original in-process worker pool, but leases,
+    retries, idempotency keys and dead-lettering behave as in the
+    persistent queues.
+
+    Visible jobs are kept in a heap ordered by the time they become
+    visible (`available_at` for ready jobs, the lease deadline for
+    leased ones); entries made stale by a later state change are
+    skipped when popped.
+    """
+
+    durable = False
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, str] = {}
+        self._visible: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._counts: Dict[JobState, int] = {state: 0 for state in JobState}
+        self._heartbeats: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        *,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = 3,
+        delay_seconds: float = 0.0,
+    ) -> Tuple[Job, bool]:
+        now = time.time()
+        with self._lock:
+            if idempotency_key is not None and idempotency_key in self._by_key:
+                return replace(self._jobs[self._by_key[idempotency_key]]), False
+            job = Job(
+                job_id=generate_unique_id(prefix="job"),
+                payload=payload,
+                max_attempts=max_attempts,
+                idempotency_key=idempotency_key,
+                available_at=now + delay_seconds,
+                created_at=now,
+                updated_at=now,
+            )
+            self._jobs[job.job_id] = job
+            self._counts[JobState.READY] += 1
+            if idempotency_key is not None:
+                self._by_key[idempotency_key] = job.job_id
+            self._push(job.available_at, job.job_id)
+            return replace(job), True
+
+    def lease(self, worker_id: str, *, lease_seconds: float, limit: int = 1) -> List[Job]:
+        now = time.time()
+        leased = []
+        with self._lock:
+            while self._visible and len(leased) < limit and self._visible[0][0] <= now:
+                visible_at, _, job_id = heapq.heappop(self._visible)
+                job = self._jobs.get(job_id)
+                if job is None or visible_at != _visible_at(job):
+                    continue  # Stale entry
+                self._set_state(job, JobState.LEASED)
+                job.attempts += 1
+                job.lease_token = uuid.uuid4().hex
+                job.leased_by = worker_id
+                job.lease_expires_at = now + lease_seconds
+                job.updated_at = now
+                self._push(job.lease_expires_at, job_id)
+                leased.append(replace(job))
+        return leased
+
+    def extend(self, job: Job, lease_seconds: float) -> bool:
+        with self._lock:
+            current = self._leased(job)
+            if current is None:
+                return False
+            current.lease_expires_at = time.time() + lease_seconds
+            self._push(current.lease_expires_at, current.job_id)
+            job.lease_expires_at = current.lease_expires_at
+            return True
+
+    def ack(self, job: Job) -> bool:
+        return self._settle(job, JobState.DONE, None, 0.0)
+
+    def retry(self, job: Job, error: str, *, delay_seconds: float = 0.0) -> bool:
+        return self._settle(job, JobState.READY, error, delay_seconds)
+
+    def dead_letter(self, job: Job, error: str) -> bool:
+        return self._settle(job, JobState.DEAD, error, 0.0)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def dead_letters(self, limit: int = 50) -> List[Job]:
+        with self._lock:
+            dead = [replace(j) for j in self._jobs.values() if j.state == JobState.DEAD]
+        dead.sort(key=lambda j: j.updated_at, reverse=True)
+        return dead[:limit]
+
+    def requeue(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != JobState.DEAD:
+                return False
+            self._set_state(job, JobState.READY)
+            job.attempts = 0
+            job.available_at = job.updated_at = time.time()
+            self._push(job.available_at, job_id)
+            return True
+
+    def counts(self) -> Dict[JobState, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def depth(self) -> int:
+        return self._counts[JobState.READY]
+
+    def purge(self, finished_before: float) -> int:
+        with self._lock:
+            expired = [
+                job for job in self._jobs.values()
+                if job.state in (JobState.DONE, JobState.DEAD) and job.updated_at < finished_before
+            ]
+            for job in expired:
+                del self._jobs[job.job_id]
+                self._counts[job.state] -= 1
+                if job.idempotency_key is not None:
+                    self._by_key.pop(job.idempotency_key, None)
+        return len(expired)
+
+    def record_heartbeat(self, worker_id: str, info: Dict[str, Any], *, ttl_seconds: float) -> None:
+        with self._lock:
+            self._heartbeats[worker_id] = (time.time() + ttl_seconds, dict(info))
+
+    def remove_heartbeat(self, worker_id: str) -> None:
+        with self._lock:
+            self._heartbeats.pop(worker_id, None)
+
+    def heartbeats(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            for worker_id in [w for w, (expires_at, _) in self._heartbeats.items() if expires_at <= now]:
+                del self._heartbeats[worker_id]
+            return [dict(info) for _, info in self._heartbeats.values()]
+
+    def _leased(self, job: Job) -> Optional[Job]:
+        current = self._jobs.get(job.job_id)
+        if current is None or current.state != JobState.LEASED or current.lease_token != job.lease_token:
+            return None
+        return current
+
+    def _settle(self, job: Job, state: JobState, error: Optional[str], delay_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            current = self._leased(job)
+            if current is None:
+                return False
+            self._set_state(current, state)
+            current.last_error = error if error is not None else current.last_error
+            current.lease_token = current.leased_by = current.lease_expires_at = None
+            current.updated_at = now
+            if state == JobState.READY:
+                current.available_at = now + delay_seconds
+                self._push(current.available_at, current.job_id)
+            return True
+
+    def _set_state(self, job: Job, state: JobState) -> None:
+        self._counts[job.state] -= 1
+        self._counts[state] += 1
+        job.state = state
+
+    def _push(self, visible_at: float, job_id: str) -> None:
+        self._seq += 1
+        heapq.heappush(self._visible, (visible_at, self._seq, job_id))
+
+
+def _visible_at(job: Job) -> Optional[float]:
+    if job.state == JobState.READY:
+        return job.available_at
+    if job.state == JobState.LEASED:
+        return job.lease_expires_at
+    return None
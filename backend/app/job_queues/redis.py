@@ -0,0 +1,282 @@
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+import json
+import time
+import uuid
+
+from redis import Redis
+from redis.exceptions import WatchError
+
+from app.utils.id_generator import generate_unique_id
+from .base import BaseJobQueue, Job, JobState
+
+T = TypeVar("T")
+
+
+class RedisJobQueue(BaseJobQueue):
+    """
+    Job queue on a Redis-compatible broker, shared by any number of API
+    and worker processes across hosts.
+
+    Each job is a JSON document under `{namespace}:job:{id}`, indexed by
+    one sorted set per state: `ready` scored by `available_at`, `leased`
+    by lease deadline, `done` and `dead` by completion time. Every state
+    change is an optimistic transaction that WATCHes the job's key, so
+    two workers racing for a job cannot both lease it. Only plain
+    commands are used (no Lua), so stand-ins such as fakeredis work.
+
+    `client` must be created with `decode_responses=True`.
+    """
+
+    def __init__(self, client: Redis, *, namespace: str = "jobs"):
+        self._client = client
+        self._ns = namespace
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self._ns}:job:{job_id}"
+
+    def _index_key(self, state: JobState) -> str:
+        return f"{self._ns}:{state.value}"
+
+    def _idempotency_key(self, key: str) -> str:
+        return f"{self._ns}:idempotency:{key}"
+
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        *,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = 3,
+        delay_seconds: float = 0.0,
+    ) -> Tuple[Job, bool]:
+        now = time.time()
+        job = Job(
+            job_id=generate_unique_id(prefix="job"),
+            payload=payload,
+            max_attempts=max_attempts,
+            idempotency_key=idempotency_key,
+            available_at=now + delay_seconds,
+            created_at=now,
+            updated_at=now,
+        )
+        if idempotency_key is None:
+            with self._client.pipeline() as pipe:
+                self._write(pipe, job)
+                pipe.execute()
+            return job, True
+
+        key = self._idempotency_key(idempotency_key)
+
+        def attempt(pipe) -> Tuple[Job, bool]:
+            existing_id = pipe.get(key)
+            if existing_id is not None:
+                existing = self._load(pipe, existing_id)
+                if existing is not None:
+                    return existing, False
+            pipe.multi()
+            pipe.set(key, job.job_id)
+            self._write(pipe, job)
+            pipe.execute()
+            return job, True
+
+        return self._transaction(attempt, key)
+
+    def lease(self, worker_id: str, *, lease_seconds: float, limit: int = 1) -> List[Job]:
+        now = time.time()
+        # Over-fetch: other workers may win some of the candidates
+        candidates = self._client.zrangebyscore(
+            self._index_key(JobState.READY), "-inf", now, start=0, num=limit * 2
+        ) + self._client.zrangebyscore(self._index_key(JobState.LEASED), "-inf", now, start=0, num=limit * 2)
+        leased: List[Job] = []
+        for job_id in candidates:
+            if len(leased) >= limit:
+                break
+            job = self._try_lease(job_id, worker_id, lease_seconds)
+            if job is not None:
+                leased.append(job)
+        return leased
+
+    def _try_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(self._job_key(job_id))
+                job = self._load(pipe, job_id)
+                now = time.time()
+                if job is None or not _is_visible(job, now):
+                    pipe.unwatch()
+                    return None
+                previous = job.state
+                job.state = JobState.LEASED
+                job.attempts += 1
+                job.lease_token = uuid.uuid4().hex
+                job.leased_by = worker_id
+                job.lease_expires_at = now + lease_seconds
+                job.updated_at = now
+                pipe.multi()
+                if previous != JobState.LEASED:
+                    pipe.zrem(self._index_key(previous), job_id)
+                self._write(pipe, job)
+                pipe.execute()
+                return job
+            except WatchError:
+                return None  # Leased by another worker meanwhile
+
+    def extend(self, job: Job, lease_seconds: float) -> bool:
+        def attempt(pipe) -> bool:
+            current = self._load(pipe, job.job_id)
+            if not _holds_lease(current, job):
+                return False
+            current.lease_expires_at = time.time() + lease_seconds
+            pipe.multi()
+            self._write(pipe, current)
+            pipe.execute()
+            job.lease_expires_at = current.lease_expires_at
+            return True
+
+        return self._transaction(attempt, self._job_key(job.job_id))
+
+    def ack(self, job: Job) -> bool:
+        return self._settle(job, JobState.DONE, None, 0.0)
+
+    def retry(self, job: Job, error: str, *, delay_seconds: float = 0.0) -> bool:
+        return self._settle(job, JobState.READY, error, delay_seconds)
+
+    def dead_letter(self, job: Job, error: str) -> bool:
+        return self._settle(job, JobState.DEAD, error, 0.0)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._load(self._client, job_id)
+
+    def dead_letters(self, limit: int = 50) -> List[Job]:
+        job_ids = self._client.zrevrange(self._index_key(JobState.DEAD), 0, limit - 1)
+        jobs = (self._load(self._client, job_id) for job_id in job_ids)
+        return [job for job in jobs if job is not None]
+
+    def requeue(self, job_id: str) -> bool:
+        def attempt(pipe) -> bool:
+            job = self._load(pipe, job_id)
+            if job is None or job.state != JobState.DEAD:
+                return False
+            pipe.multi()
+            pipe.zrem(self._index_key(JobState.DEAD), job_id)
+            job.state = JobState.READY
+            job.attempts = 0
+            job.available_at = job.updated_at = time.time()
+            self._write(pipe, job)
+            pipe.execute()
+            return True
+
+        return self._transaction(attempt, self._job_key(job_id))
+
+    def counts(self) -> Dict[JobState, int]:
+        with self._client.pipeline(transaction=False) as pipe:
+            for state in JobState:
+                pipe.zcard(self._index_key(state))
+            return dict(zip(JobState, pipe.execute()))
+
+    def depth(self) -> int:
+        return self._client.zcard(self._index_key(JobState.READY))
+
+    def purge(self, finished_before: float) -> int:
+        purged = 0
+        for state in (JobState.DONE, JobState.DEAD):
+            index = self._index_key(state)
+            for job_id in self._client.zrangebyscore(index, "-inf", finished_before):
+                job = self._load(self._client, job_id)
+                with self._client.pipeline() as pipe:
+                    pipe.zrem(index, job_id)
+                    pipe.delete(self._job_key(job_id))
+                    if job is not None and job.idempotency_key is not None:
+                        pipe.delete(self._idempotency_key(job.idempotency_key))
+                    pipe.execute()
+                purged += 1
+        return purged
+
+    def record_heartbeat(self, worker_id: str, info: Dict[str, Any], *, ttl_seconds: float) -> None:
+        with self._client.pipeline() as pipe:
+            pipe.set(f"{self._ns}:worker:{worker_id}", json.dumps(info), px=max(1, int(ttl_seconds * 1000)))
+            pipe.zadd(f"{self._ns}:workers", {worker_id: time.time() + ttl_seconds})
+            pipe.execute()
+
+    def remove_heartbeat(self, worker_id: str) -> None:
+        with self._client.pipeline() as pipe:
+            pipe.delete(f"{self._ns}:worker:{worker_id}")
+            pipe.zrem(f"{self._ns}:workers", worker_id)
+            pipe.execute()
+
+    def heartbeats(self) -> List[Dict[str, Any]]:
+        index = f"{self._ns}:workers"
+        self._client.zremrangebyscore(index, "-inf", time.time())
+        worker_ids = self._client.zrange(index, 0, -1)
+        if not worker_ids:
+            return []
+        raw = self._client.mget([f"{self._ns}:worker:{w}" for w in worker_ids])
+        return [json.loads(r) for r in raw if r is not None]
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _settle(self, job: Job, state: JobState, error: Optional[str], delay_seconds: float) -> bool:
+        def attempt(pipe) -> bool:
+            current = self._load(pipe, job.job_id)
+            if not _holds_lease(current, job):
+                return False
+            now = time.time()
+            current.state = state
+            current.last_error = error if error is not None else current.last_error
+            current.lease_token = current.leased_by = current.lease_expires_at = None
+            current.updated_at = now
+            if state == JobState.READY:
+                current.available_at = now + delay_seconds
+            pipe.multi()
+            pipe.zrem(self._index_key(JobState.LEASED), job.job_id)
+            self._write(pipe, current)
+            pipe.execute()
+            return True
+
+        return self._transaction(attempt, self._job_key(job.job_id))
+
+    def _transaction(self, func: Callable[[Any], T], *watch: str) -> T:
+        """Run `func(pipe)` with `watch` keys watched, retrying when they change."""
+        with self._client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(*watch)
+                    return func(pipe)
+                except WatchError:
+                    continue
+                finally:
+                    pipe.reset()
+
+    def _load(self, client, job_id: str) -> Optional[Job]:
+        raw = client.get(self._job_key(job_id))
+        return _decode(raw) if raw is not None else None
+
+    def _write(self, pipe, job: Job) -> None:
+        """Queue the commands storing `job` and indexing it under its state."""
+        pipe.set(self._job_key(job.job_id), _encode(job))
+        score = {
+            JobState.READY: job.available_at,
+            JobState.LEASED: job.lease_expires_at,
+        }.get(job.state, job.updated_at)
+        pipe.zadd(self._index_key(job.state), {job.job_id: score})
+
+
+def _is_visible(job: Job, now: float) -> bool:
+    if job.state == JobState.READY:
+        return job.available_at <= now
+    return job.state == JobState.LEASED and job.lease_expires_at is not None and job.lease_expires_at <= now
+
+
+def _holds_lease(current: Optional[Job], job: Job) -> bool:
+    return current is not None and current.state == JobState.LEASED and current.lease_token == job.lease_token
+
+
+def _encode(job: Job) -> str:
+    return json.dumps({**asdict(job), "state": job.state.value})
+
+
+def _decode(raw: str) -> Job:
+    data = json.loads(raw)
+    data["state"] = JobState(data["state"])
+    return Job(**data)
@@ -0,0 +1,265 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.utils.id_generator import generate_unique_id
+from .base import BaseJobQueue, Job, JobState
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    idempotency_key TEXT UNIQUE,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_token TEXT,
+    leased_by TEXT,
+    lease_expires_at REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_ready ON jobs (state, available_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_leased ON jobs (state, lease_expires_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_state_updated_at ON jobs (state, updated_at);
+CREATE TABLE IF NOT EXISTS worker_heartbeats (
+    worker_id TEXT PRIMARY KEY,
+    info TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "job_id, idempotency_key, payload, state, attempts, max_attempts, available_at, "
+    "lease_token, leased_by, lease_expires_at, last_error, created_at, updated_at"
+)
+
+# Jobs visible to `lease`, oldest first. Two index-backed halves instead
+# of one OR so each uses its own index.
+_VISIBLE = f"""
+SELECT {_COLUMNS} FROM (
+    SELECT * FROM jobs WHERE state = 'ready' AND available_at <= :now
+    UNION ALL
+    SELECT * FROM jobs WHERE state = 'leased' AND lease_expires_at <= :now
+)
+ORDER BY available_at LIMIT :limit
+"""
+
+
+class SqliteJobQueue(BaseJobQueue):
+    """
+    SQLite-backed job queue running in WAL mode.
+
+    Every state change is committed before it returns, so queued and
+    leased jobs survive a crash. Several processes on one host can share
+    the database file: leasing runs in a `BEGIN IMMEDIATE` transaction,
+    which serializes claims across processes, and `busy_timeout` makes
+    concurrent writers wait instead of failing. Not for network
+    filesystems; use a broker-backed queue across hosts.
+    """
+
+    def __init__(self, path: str, *, busy_timeout_ms: int = 5000):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        *,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = 3,
+        delay_seconds: float = 0.0,
+    ) -> Tuple[Job, bool]:
+        now = time.time()
+        job = Job(
+            job_id=generate_unique_id(prefix="job"),
+            payload=payload,
+            max_attempts=max_attempts,
+            idempotency_key=idempotency_key,
+            available_at=now + delay_seconds,
+            created_at=now,
+            updated_at=now,
+        )
+        with self._lock:
+            cursor = self._conn.execute(
+                f"INSERT INTO jobs ({_COLUMNS}) VALUES "
+                "(:job_id, :idempotency_key, :payload, :state, :attempts, :max_attempts, :available_at, "
+                ":lease_token, :leased_by, :lease_expires_at, :last_error, :created_at, :updated_at) "
+                "ON CONFLICT (idempotency_key) DO NOTHING",
+                _to_row(job),
+            )
+            if cursor.rowcount == 1:
+                return job, True
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+        return _from_row(row), False
+
+    def lease(self, worker_id: str, *, lease_seconds: float, limit: int = 1) -> List[Job]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                rows = self._conn.execute(_VISIBLE, {"now": now, "limit": limit}).fetchall()
+                jobs = []
+                for row in rows:
+                    job = _from_row(row)
+                    job.state = JobState.LEASED
+                    job.attempts += 1
+                    job.lease_token = uuid.uuid4().hex
+                    job.leased_by = worker_id
+                    job.lease_expires_at = now + lease_seconds
+                    job.updated_at = now
+                    self._conn.execute(
+                        "UPDATE jobs SET state = ?, attempts = ?, lease_token = ?, leased_by = ?, "
+                        "lease_expires_at = ?, updated_at = ? WHERE job_id = ?",
+                        (job.state.value, job.attempts, job.lease_token, worker_id,
+                         job.lease_expires_at, now, job.job_id),
+                    )
+                    jobs.append(job)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return jobs
+
+    def extend(self, job: Job, lease_seconds: float) -> bool:
+        expires_at = time.time() + lease_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE job_id = ? AND state = 'leased' AND lease_token = ?",
+                (expires_at, job.job_id, job.lease_token),
+            )
+        if cursor.rowcount != 1:
+            return False
+        job.lease_expires_at = expires_at
+        return True
+
+    def ack(self, job: Job) -> bool:
+        return self._settle(job, JobState.DONE, None, 0.0)
+
+    def retry(self, job: Job, error: str, *, delay_seconds: float = 0.0) -> bool:
+        return self._settle(job, JobState.READY, error, delay_seconds)
+
+    def dead_letter(self, job: Job, error: str) -> bool:
+        return self._settle(job, JobState.DEAD, error, 0.0)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _from_row(row) if row else None
+
+    def dead_letters(self, limit: int = 50) -> List[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE state = 'dead' ORDER BY updated_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [_from_row(row) for row in rows]
+
+    def requeue(self, job_id: str) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = 'ready', attempts = 0, available_at = ?, updated_at = ? "
+                "WHERE job_id = ? AND state = 'dead'",
+                (now, now, job_id),
+            )
+        return cursor.rowcount == 1
+
+    def counts(self) -> Dict[JobState, int]:
+        counts = {state: 0 for state in JobState}
+        with self._lock:
+            for row in self._conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"):
+                counts[JobState(row["state"])] = row["n"]
+        return counts
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE state = 'ready'").fetchone()[0]
+
+    def purge(self, finished_before: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE state IN ('done', 'dead') AND updated_at < ?", (finished_before,)
+            )
+        return cursor.rowcount
+
+    def record_heartbeat(self, worker_id: str, info: Dict[str, Any], *, ttl_seconds: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO worker_heartbeats (worker_id, info, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (worker_id) DO UPDATE SET info = excluded.info, expires_at = excluded.expires_at",
+                (worker_id, json.dumps(info), time.time() + ttl_seconds),
+            )
+
+    def remove_heartbeat(self, worker_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM worker_heartbeats WHERE worker_id = ?", (worker_id,))
+
+    def heartbeats(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM worker_heartbeats WHERE expires_at <= ?", (now,))
+            rows = self._conn.execute("SELECT info FROM worker_heartbeats ORDER BY worker_id").fetchall()
+        return [json.loads(row["info"]) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _settle(self, job: Job, state: JobState, error: Optional[str], delay_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ?, last_error = COALESCE(?, last_error), available_at = ?, "
+                "lease_token = NULL, leased_by = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE job_id = ? AND state = 'leased' AND lease_token = ?",
+                (state.value, error, now + delay_seconds, now, job.job_id, job.lease_token),
+            )
+        return cursor.rowcount == 1
+
+
+def _to_row(job: Job) -> dict:
+    return {
+        "job_id": job.job_id,
+        "idempotency_key": job.idempotency_key,
+        "payload": json.dumps(job.payload),
+        "state": job.state.value,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "available_at": job.available_at,
+        "lease_token": job.lease_token,
+        "leased_by": job.leased_by,
+        "lease_expires_at": job.lease_expires_at,
+        "last_error": job.last_error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+def _from_row(row: sqlite3.Row) -> Job:
+    return Job(
+        job_id=row["job_id"],
+        payload=json.loads(row["payload"]),
+        state=JobState(row["state"]),
+        attempts=row["attempts"],
+        max_attempts=row["max_attempts"],
+        idempotency_key=row["idempotency_key"],
+        available_at=row["available_at"],
+        lease_token=row["lease_token"],
+        leased_by=row["leased_by"],
+        lease_expires_at=row["lease_expires_at"],
+        last_error=row["last_error"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
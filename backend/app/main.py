@@ -3,6 +3,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
+from app.core.config import settings
+from app.core.container import ServiceContainer
 from app.core.logging import setup_logging
 
 
@@ -11,9 +13,12 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     setup_logging()
+    app.state.container = ServiceContainer(settings)
+    await app.state.container.start()
     print("🔁 App startup completed")
     yield
     # Shutdown 
+    await app.state.container.stop()
     print("🛑 App shutdown complete")
 
 
@@ -0,0 +1,75 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.services.rate_limiter import KeyGrant
+
+
+class ModelBackendError(Exception):
+    """Raised when a model backend fails to produce an image."""
+
+
+class ModelRateLimitedError(ModelBackendError):
+    """Raised when the upstream model rejects a call for exceeding its quota."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class ModelImage:
+    """An encoded image and the model that produced it."""
+    data: bytes
+    model_name: str
+
+
+class BaseModelBackend(ABC):
+    """
+    Abstract base class for image model backends.
+    Defines the contract for turning a prompt into encoded image bytes.
+
+    `name` identifies one backend instance (a model behind one API key)
+    in routing decisions and metrics; `model_name` is the model it calls,
+    and the model that produced a render is part of its prompt cache key;
+    `key_id` is the quota scheduler's id of the API key it uses, or None
+    if it needs no key.
+    """
+
+    name: str
+    model_name: str
+    key_id: Optional[str] = None
+
+    @abstractmethod
+    async def generate_image(self, prompt: str, *, grant: Optional[KeyGrant] = None) -> bytes:
+        """
+        Generate an image for `prompt` and return it PNG-encoded.
+
+        `grant` is the quota grant the call was admitted with, if quota
+        is enforced; routers use it to pick a backend on the granted key.
+
+        Raises:
+            ModelRateLimitedError: If the upstream quota is exhausted.
+            ModelBackendError: If the model returned no usable image.
+        """
+
+    @property
+    def model_names(self) -> List[str]:
+        """Every model this backend may produce an image with, most preferred first."""
+        return [self.model_name]
+
+    async def generate(self, prompt: str, *, grant: Optional[KeyGrant] = None) -> ModelImage:
+        """
+        Like `generate_image`, but also report which model produced the
+        image; routers report the backend that actually answered.
+        """
+        return ModelImage(await self.generate_image(prompt, grant=grant), self.model_name)
+
+    def warm_up(self) -> None:
+        """
+        Import SDKs and build clients ahead of the first call. Blocking;
+        run it off the event loop.
+        """
+
+    async def aclose(self) -> None:
+        """Release connections held by the backend."""
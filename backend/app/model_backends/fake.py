@@ -0,0 +1,69 @@
+import asyncio
+import math
+import random
+from typing import Optional
+
+from app.services.rate_limiter import KeyGrant
+from app.services.renderer import PlaceholderRenderer
+
+from .base import BaseModelBackend, ModelBackendError, ModelRateLimitedError
+
+
+class FakeModelBackend(BaseModelBackend):
+    """
+    Local stand-in for a remote model, for tests and benchmarks.
+
+    Each call sleeps for a log-normally distributed latency (median
+    `latency_ms`, spread `latency_sigma`; 0 gives a fixed latency), made
+    `slow_factor` times longer with probability `slow_rate` to model a
+    separate slow mode. It then either fails with probability
+    `error_rate`, is rate limited with probability `rate_limit_rate`, or
+    returns a placeholder image.
+    """
+
+    def __init__(
+        self,
+        renderer: PlaceholderRenderer,
+        *,
+        name: str = "fake",
+        model_name: str = "fake-model",
+        key_id: Optional[str] = None,
+        latency_ms: float = 200.0,
+        latency_sigma: float = 0.5,
+        slow_rate: float = 0.0,
+        slow_factor: float = 10.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.renderer = renderer
+        self.name = name
+        self.model_name = model_name
+        self.key_id = key_id
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def sample_latency(self) -> float:
+        """One latency draw, in seconds."""
+        if self.latency_ms <= 0:
+            return 0.0
+        latency = self._random.lognormvariate(math.log(self.latency_ms / 1000), self.latency_sigma)
+        if self.slow_rate and self._random.random() < self.slow_rate:
+            latency *= self.slow_factor
+        return latency
+
+    async def generate_image(self, prompt: str, *, grant: Optional[KeyGrant] = None) -> bytes:
+        self.calls += 1
+        await asyncio.sleep(self.sample_latency())
+        roll = self._random.random()
+        if roll < self.error_rate:
+            raise ModelBackendError(f"{self.name}: injected failure")
+        if roll < self.error_rate + self.rate_limit_rate:
+            raise ModelRateLimitedError(f"{self.name}: injected rate limit", retry_after=1.0)
+        return await self.renderer.render(prompt)
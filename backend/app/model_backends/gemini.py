@@ -0,0 +1,111 @@
+from typing import Optional
+import base64
+import logging
+
+import httpx
+
+from app.services.rate_limiter import KeyGrant
+from app.services.renderer import DEFAULT_SIZE, PlaceholderRenderer
+
+from .base import BaseModelBackend, ModelBackendError, ModelRateLimitedError
+
+logger = logging.getLogger(__name__)
+
+API_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+# Used when a 429 carries no Retry-After header
+DEFAULT_RETRY_AFTER = 10.0
+
+
+class GeminiModelBackend(BaseModelBackend):
+    """
+    Image generation through the Gemini REST API, with one API key.
+
+    The REST API is called directly over a pooled httpx client rather
+    than through the google-generativeai SDK, whose API key is global to
+    the process, so that several keys can be used side by side. Returned
+    images are normalized to a PNG at the placeholder render size, which
+    is what the encoding pipeline expects of a master.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        renderer: PlaceholderRenderer,
+        *,
+        key_id: Optional[str] = None,
+        name: Optional[str] = None,
+        timeout_seconds: float = 60.0,
+        max_connections: int = 100,
+        base_url: str = API_BASE_URL,
+    ):
+        self.model_name = model_name
+        self.key_id = key_id
+        self.name = name or f"gemini:{model_name}:{key_id or 'default'}"
+        self.renderer = renderer
+        self._api_key = api_key
+        self._timeout_seconds = timeout_seconds
+        self._max_connections = max_connections
+        self._base_url = base_url.rstrip("/")
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def warm_up(self) -> None:
+        self._get_client()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers={"x-goog-api-key": self._api_key},
+                timeout=httpx.Timeout(self._timeout_seconds, connect=5.0),
+                limits=httpx.Limits(max_connections=self._max_connections),
+            )
+        return self._client
+
+    async def generate_image(self, prompt: str, *, grant: Optional[KeyGrant] = None) -> bytes:
+        body = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {"responseModalities": ["TEXT", "IMAGE"]},
+        }
+        try:
+            response = await self._get_client().post(f"/models/{self.model_name}:generateContent", json=body)
+        except httpx.HTTPError as e:
+            logger.warning("gemini.request_failed", extra={"backend": self.name, "error": str(e)})
+            raise ModelBackendError(f"{self.name}: {e}") from e
+
+        if response.status_code == 429:
+            raise ModelRateLimitedError(
+                f"{self.name}: quota exhausted", retry_after=_retry_after(response)
+            )
+        if response.status_code >= 400:
+            logger.warning(
+                "gemini.request_failed",
+                extra={"backend": self.name, "status_code": response.status_code},
+            )
+            raise ModelBackendError(f"{self.name}: HTTP {response.status_code}")
+
+        data = _first_image(response.json())
+        if data is None:
+            raise ModelBackendError(f"{self.name}: response contained no image")
+        return await self.renderer.encode(data, "png", DEFAULT_SIZE[0], 100)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _first_image(payload: dict) -> Optional[bytes]:
+    for candidate in payload.get("candidates", []):
+        for part in candidate.get("content", {}).get("parts", []):
+            inline = part.get("inlineData") or part.get("inline_data")
+            if inline and str(inline.get("mimeType", inline.get("mime_type", ""))).startswith("image/"):
+                return base64.b64decode(inline["data"])
+    return None
+
+
+def _retry_after(response: httpx.Response) -> float:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return DEFAULT_RETRY_AFTER
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from app.services.rate_limiter import KeyGrant
+from app.services.renderer import PlaceholderRenderer
+
+from .base import BaseModelBackend
+
+# Part of every prompt cache address, so placeholder renders are never
+# served for a real model; bump it when the drawing changes
+PLACEHOLDER_MODEL_NAME = "placeholder-v1"
+
+
+class PlaceholderModelBackend(BaseModelBackend):
+    """
+    Offline backend that draws the prompt onto a gradient instead of
+    calling a model. Used while model image generation is unavailable.
+    """
+
+    def __init__(
+        self, renderer: PlaceholderRenderer, *, model_name: str = PLACEHOLDER_MODEL_NAME, name: str = "placeholder"
+    ):
+        self.renderer = renderer
+        self.model_name = model_name
+        self.name = name
+
+    async def generate_image(self, prompt: str, *, grant: Optional[KeyGrant] = None) -> bytes:
+        return await self.renderer.render(prompt)
@@ -0,0 +1,249 @@
+"""
+Routing across several model backends (models x API keys).
+
+Each call goes to the better of two randomly sampled healthy backends,
+scored by smoothed latency, in-flight calls and error rate, so load
+spreads across keys while slow or failing backends are avoided. A
+backend that answers 429 is benched for its Retry-After and, if a quota
+scheduler is attached, its key is paused there too.
+
+With hedging on, a call that has not finished after the primary
+backend's p95 latency is duplicated to a second backend and the first
+success wins. Hedges are capped at `hedge_budget_ratio` of calls so a
+slow period cannot double the load on the model.
+"""
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+from app.core.metrics import REGISTRY
+from app.services.rate_limiter import KeyGrant, ModelQuotaScheduler
+
+from .base import BaseModelBackend, ModelBackendError, ModelImage, ModelRateLimitedError
+
+CALL_SECONDS = REGISTRY.histogram(
+    "model_backend_seconds",
+    "Latency of completed model backend calls.",
+    ["backend"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0),
+)
+CALLS = REGISTRY.counter(
+    "model_backend_calls_total", "Model backend calls by outcome.", ["backend", "outcome"]
+)
+HEDGES = REGISTRY.counter(
+    "model_hedges_total", "Hedged model calls: won, lost, or skipped for lack of budget.", ["outcome"]
+)
+
+# Calls a backend needs to have completed before its p95 is trusted for hedging
+MIN_HEDGE_SAMPLES = 20
+# Most hedges that can be saved up during quiet periods
+MAX_HEDGE_TOKENS = 10.0
+
+
+class BackendStats:
+    """Rolling latency and error statistics of one backend."""
+
+    def __init__(self, window: int = 200, alpha: float = 0.2):
+        self._alpha = alpha
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.benched_until = 0.0
+
+    def record(self, latency: Optional[float], ok: bool) -> None:
+        if latency is not None:
+            if ok:
+                self._latencies.append(latency)
+            # Failures count towards the smoothed latency too, so a backend
+            # that only ever fails does not keep the score of an untried one
+            self.latency = latency if not self.latency else (1 - self._alpha) * self.latency + self._alpha * latency
+        self.error_rate = (1 - self._alpha) * self.error_rate + self._alpha * (0.0 if ok else 1.0)
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def quantile(self, fraction: float) -> float:
+        """Latency below which `fraction` of recent successful calls finished."""
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+    def score(self) -> float:
+        """Expected cost of sending one more call here; lower is better. Untried backends score 0."""
+        return self.latency * (1 + self.in_flight) / max(0.05, 1.0 - self.error_rate) ** 2
+
+
+class ModelBackendRouter(BaseModelBackend):
+    """
+    A model backend that spreads calls over several backends, optionally
+    hedging slow calls. Use from a single event loop.
+    """
+
+    name = "router"
+
+    def __init__(
+        self,
+        backends: Sequence[BaseModelBackend],
+        *,
+        hedging: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.05,
+        hedge_budget_ratio: float = 0.1,
+        quota_scheduler: Optional[ModelQuotaScheduler] = None,
+        seed: Optional[int] = None,
+    ):
+        if not backends:
+            raise ValueError("At least one model backend is required")
+        self.backends = list(backends)
+        self._model_names = list(dict.fromkeys(b.model_name for b in self.backends))
+        self.model_name = "+".join(sorted(self._model_names))
+        self.hedging = hedging
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_budget_ratio = hedge_budget_ratio
+        self.quota_scheduler = quota_scheduler
+        self._stats: Dict[str, BackendStats] = {b.name: BackendStats() for b in self.backends}
+        self._hedge_tokens = MAX_HEDGE_TOKENS
+        self._random = random.Random(seed)
+
+    @property
+    def model_names(self) -> List[str]:
+        return self._model_names
+
+    def warm_up(self) -> None:
+        for backend in self.backends:
+            backend.warm_up()
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(b.aclose() for b in self.backends), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        now = time.monotonic()
+        return {
+            name: {
+                "latency_seconds": s.latency,
+                "p95_seconds": s.quantile(0.95),
+                "error_rate": s.error_rate,
+                "in_flight": s.in_flight,
+                "benched_for": max(0.0, s.benched_until - now),
+            }
+            for name, s in self._stats.items()
+        }
+
+    async def generate_image(self, prompt: str, *, grant: Optional[KeyGrant] = None) -> bytes:
+        return (await self.generate(prompt, grant=grant)).data
+
+    async def generate(self, prompt: str, *, grant: Optional[KeyGrant] = None) -> ModelImage:
+        self._hedge_tokens = min(MAX_HEDGE_TOKENS, self._hedge_tokens + self.hedge_budget_ratio)
+        primary = self._pick(grant)
+        if not self.hedging or len(self.backends) < 2:
+            return await self._call(primary, prompt)
+
+        tasks = [asyncio.create_task(self._call(primary, prompt))]
+        try:
+            delay = self._hedge_delay(primary)
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    hedge = self._start_hedge(primary, prompt, grant)
+                    if hedge is not None:
+                        tasks.append(hedge)
+            return await self._first_success(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _pick(self, grant: Optional[KeyGrant], exclude: Optional[BaseModelBackend] = None) -> BaseModelBackend:
+        """Power-of-two-choices among healthy backends usable with the granted key."""
+        now = time.monotonic()
+        candidates = [b for b in self._usable(grant) if b is not exclude]
+        healthy = [b for b in candidates if self._stats[b.name].benched_until <= now]
+        if not healthy:
+            if not candidates:
+                raise ModelBackendError("No model backend available")
+            retry_after = min(self._stats[b.name].benched_until for b in candidates) - now
+            raise ModelRateLimitedError("Every model backend is rate limited", retry_after=retry_after)
+        if len(healthy) == 1:
+            return healthy[0]
+        a, b = self._random.sample(healthy, 2)
+        return a if self._stats[a.name].score() <= self._stats[b.name].score() else b
+
+    def _usable(self, grant: Optional[KeyGrant]) -> List[BaseModelBackend]:
+        """Backends for the granted key, plus those that need no key."""
+        if grant is None:
+            return self.backends
+        usable = [b for b in self.backends if b.key_id in (None, grant.key_id)]
+        return usable or self.backends
+
+    def _hedge_delay(self, primary: BaseModelBackend) -> Optional[float]:
+        stats = self._stats[primary.name]
+        if stats.samples < MIN_HEDGE_SAMPLES:
+            return None
+        return max(self.hedge_min_delay, stats.quantile(self.hedge_quantile))
+
+    def _start_hedge(
+        self, primary: BaseModelBackend, prompt: str, grant: Optional[KeyGrant]
+    ) -> Optional["asyncio.Task[ModelImage]"]:
+        if self._hedge_tokens < 1:
+            HEDGES.inc(outcome="skipped")
+            return None
+        hedge_grant = None
+        if grant is not None and self.quota_scheduler is not None:
+            # Hedges are optional work: only use quota nobody is waiting for
+            hedge_grant = self.quota_scheduler.try_acquire(grant.tokens)
+            if hedge_grant is None:
+                HEDGES.inc(outcome="skipped")
+                return None
+        try:
+            backend = self._pick(hedge_grant, exclude=primary)
+        except ModelBackendError:
+            HEDGES.inc(outcome="skipped")
+            return None
+        self._hedge_tokens -= 1
+        return asyncio.create_task(self._call(backend, prompt))
+
+    async def _first_success(self, tasks: List["asyncio.Task[ModelImage]"]) -> ModelImage:
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if len(tasks) > 1:
+                        HEDGES.inc(outcome="won" if task is tasks[1] else "lost")
+                    return task.result()
+                error = task.exception()
+        raise error
+
+    async def _call(self, backend: BaseModelBackend, prompt: str) -> ModelImage:
+        stats = self._stats[backend.name]
+        stats.in_flight += 1
+        start = time.monotonic()
+        try:
+            image = await backend.generate(prompt)
+        except asyncio.CancelledError:
+            CALLS.inc(backend=backend.name, outcome="cancelled")
+            raise
+        except ModelRateLimitedError as e:
+            stats.benched_until = max(stats.benched_until, time.monotonic() + e.retry_after)
+            if self.quota_scheduler is not None and backend.key_id is not None:
+                self.quota_scheduler.penalize(backend.key_id, e.retry_after)
+            CALLS.inc(backend=backend.name, outcome="rate_limited")
+            raise
+        except Exception:
+            stats.record(time.monotonic() - start, ok=False)
+            CALLS.inc(backend=backend.name, outcome="error")
+            raise
+        finally:
+            stats.in_flight -= 1
+        latency = time.monotonic() - start
+        stats.record(latency, ok=True)
+        CALL_SECONDS.observe(latency, backend=backend.name)
+        CALLS.inc(backend=backend.name, outcome="ok")
+        return image
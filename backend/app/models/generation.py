@@ -1,8 +1,11 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, List, Optional
 from enum import Enum
+import logging
 from pydantic import BaseModel, Field, ConfigDict
 
+logger = logging.getLogger(__name__)
+
 class GenerationStatus(str, Enum):
     """Status of an image generation task."""
     PENDING = "pending"
@@ -10,6 +13,62 @@ class GenerationStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+    @property
+    def is_terminal(self) -> bool:
+        return self in (GenerationStatus.COMPLETED, GenerationStatus.FAILED)
+
+class OutputFormat(str, Enum):
+    """Encoding of a stored image."""
+    PNG = "png"
+    WEBP = "webp"
+    JPEG = "jpeg"
+    AVIF = "avif"
+
+    @property
+    def content_type(self) -> str:
+        return f"image/{self.value}"
+
+class OutputOptions(BaseModel):
+    """
+    Requested renditions of a generation: the full-size image in
+    `output_format`, plus one thumbnail per width in `sizes`.
+    """
+    output_format: OutputFormat = OutputFormat.PNG
+    quality: int = 85  # Ignored for PNG
+    sizes: List[int] = Field(default_factory=list)
+
+    model_config = ConfigDict(frozen=True)
+
+class ImageVariant(BaseModel):
+    """One stored rendition of a generated image."""
+    format: OutputFormat
+    width: int
+    height: int
+    object_name: str
+    url: str
+    size_bytes: Optional[int] = None  # Unknown when reused from an earlier render
+
+TransitionListener = Callable[["ImageGeneration"], None]
+_transition_listeners: List[TransitionListener] = []
+
+def add_transition_listener(listener: TransitionListener) -> None:
+    """Call `listener` with the generation after every mark_as_* transition."""
+    _transition_listeners.append(listener)
+
+def remove_transition_listener(listener: TransitionListener) -> None:
+    if listener in _transition_listeners:
+        _transition_listeners.remove(listener)
+
+def _notify_transition(generation: "ImageGeneration") -> None:
+    for listener in list(_transition_listeners):
+        try:
+            listener(generation)
+        except Exception:
+            logger.exception(
+                "generation.transition_listener_failed",
+                extra={"generation_id": generation.generation_id},
+            )
+
 class ImageGeneration(BaseModel):
     """
     Represents the internal state of an image generation task.
@@ -21,24 +80,35 @@ class ImageGeneration(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     failure_reason: Optional[str] = None
+    output: OutputOptions = Field(default_factory=OutputOptions)
+    variants: List[ImageVariant] = Field(default_factory=list)
 
     model_config = ConfigDict(from_attributes=True)
 
+    def mark_as_pending(self):
+        """Return the generation to the queue, e.g. before it is retried."""
+        self.status = GenerationStatus.PENDING
+        self.failure_reason = None
+        self.updated_at = datetime.now(timezone.utc)
+        _notify_transition(self)
+
     def mark_as_processing(self):
         """Mark the generation as in progress."""
         self.status = GenerationStatus.PROCESSING
         self.updated_at = datetime.now(timezone.utc)
+        _notify_transition(self)
 
-    def mark_as_completed(self, image_url: str):
-        """Mark the generation as completed with the final image URL."""
+    def mark_as_completed(self, image_url: str, variants: Optional[List[ImageVariant]] = None):
+        """Mark the generation as completed with the final image URL and its renditions."""
         self.status = GenerationStatus.COMPLETED
         self.image_url = image_url
+        self.variants = list(variants or [])
         self.updated_at = datetime.now(timezone.utc)
+        _notify_transition(self)
 
     def mark_as_failed(self, reason: str):
         """Mark the generation as failed with a reason."""
         self.status = GenerationStatus.FAILED
         self.failure_reason = reason
         self.updated_at = datetime.now(timezone.utc)
-
-
+        _notify_transition(self)
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+from app.models.generation import GenerationStatus, ImageGeneration
+
+
+class BaseGenerationRepository(ABC):
+    """
+    Abstract base class for generation metadata stores.
+    Defines the contract for persisting and querying ImageGeneration records.
+    """
+
+    @abstractmethod
+    def save(self, generation: ImageGeneration) -> None:
+        """Insert or update a generation record."""
+
+    @abstractmethod
+    def get(self, generation_id: str) -> Optional[ImageGeneration]:
+        """Return the generation with the given ID, or None if unknown."""
+
+    @abstractmethod
+    def list(
+        self,
+        *,
+        status: Optional[GenerationStatus] = None,
+        created_before: Optional[datetime] = None,
+        limit: int = 50,
+    ) -> List[ImageGeneration]:
+        """
+        Return generations newest first, optionally filtered by status and
+        restricted to those created strictly before `created_before`.
+        """
+
+    @abstractmethod
+    def delete(self, generation_id: str) -> None:
+        """Remove a generation record if present."""
+
+    def close(self) -> None:
+        """Flush pending writes and release resources."""
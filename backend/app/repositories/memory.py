@@ -0,0 +1,84 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import threading
+
+from app.models.generation import GenerationStatus, ImageGeneration
+from .base import BaseGenerationRepository
+
+_IndexKey = Tuple[datetime, str]
+
+
+class InMemoryGenerationRepository(BaseGenerationRepository):
+    """
+    Process-local generation store.
+
+    Records are indexed by generation_id, with secondary indexes sorted by
+    created_at (overall and per status). The oldest records are evicted
+    once `max_entries` is exceeded.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self._max_entries = max_entries
+        self._records: "OrderedDict[str, ImageGeneration]" = OrderedDict()
+        self._by_created: List[_IndexKey] = []
+        self._by_status: Dict[GenerationStatus, List[_IndexKey]] = {s: [] for s in GenerationStatus}
+        self._lock = threading.Lock()
+
+    def save(self, generation: ImageGeneration) -> None:
+        record = generation.model_copy()
+        key = (record.created_at, record.generation_id)
+        with self._lock:
+            previous = self._records.get(record.generation_id)
+            if previous is None:
+                insort(self._by_created, key)
+            elif previous.status != record.status:
+                _remove(self._by_status[previous.status], key)
+            if previous is None or previous.status != record.status:
+                insort(self._by_status[record.status], key)
+            self._records[record.generation_id] = record
+            while len(self._records) > self._max_entries:
+                self._evict_oldest()
+
+    def get(self, generation_id: str) -> Optional[ImageGeneration]:
+        with self._lock:
+            record = self._records.get(generation_id)
+        return record.model_copy() if record else None
+
+    def list(
+        self,
+        *,
+        status: Optional[GenerationStatus] = None,
+        created_before: Optional[datetime] = None,
+        limit: int = 50,
+    ) -> List[ImageGeneration]:
+        with self._lock:
+            index = self._by_created if status is None else self._by_status[status]
+            end = len(index) if created_before is None else bisect_left(index, (created_before, ""))
+            keys = index[max(0, end - limit):end]
+            return [self._records[gid].model_copy() for _, gid in reversed(keys)]
+
+    def delete(self, generation_id: str) -> None:
+        with self._lock:
+            record = self._records.pop(generation_id, None)
+            if record is not None:
+                self._unindex(record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _evict_oldest(self) -> None:
+        _, record = self._records.popitem(last=False)
+        self._unindex(record)
+
+    def _unindex(self, record: ImageGeneration) -> None:
+        key = (record.created_at, record.generation_id)
+        _remove(self._by_created, key)
+        _remove(self._by_status[record.status], key)
+
+
+def _remove(index: List[_IndexKey], key: _IndexKey) -> None:
+    i = bisect_left(index, key)
+    if i < len(index) and index[i] == key:
+        del index[i]
@@ -0,0 +1,202 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+import json
+import logging
+import sqlite3
+import threading
+
+from app.models.generation import GenerationStatus, ImageGeneration, ImageVariant, OutputOptions
+from .base import BaseGenerationRepository
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    generation_id TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    status TEXT NOT NULL,
+    image_url TEXT,
+    failure_reason TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    output TEXT,
+    variants TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_generations_created_at ON generations (created_at);
+CREATE INDEX IF NOT EXISTS ix_generations_status_created_at ON generations (status, created_at);
+"""
+
+_UPSERT = """
+INSERT INTO generations (
+    generation_id, prompt, status, image_url, failure_reason, created_at, updated_at, output, variants
+)
+VALUES (
+    :generation_id, :prompt, :status, :image_url, :failure_reason, :created_at, :updated_at, :output, :variants
+)
+ON CONFLICT (generation_id) DO UPDATE SET
+    status = excluded.status,
+    image_url = excluded.image_url,
+    failure_reason = excluded.failure_reason,
+    updated_at = excluded.updated_at,
+    variants = excluded.variants
+WHERE excluded.updated_at >= generations.updated_at
+"""
+
+_COLUMNS = "generation_id, prompt, status, image_url, failure_reason, created_at, updated_at, output, variants"
+# Columns added after the first release, created on open for older databases
+_ADDED_COLUMNS = {"output": "TEXT", "variants": "TEXT"}
+
+
+class SqliteGenerationRepository(BaseGenerationRepository):
+    """
+    SQLite-backed generation store running in WAL mode.
+
+    Writes are buffered and flushed in a single transaction once
+    `batch_size` records are pending or every `flush_interval` seconds,
+    so a burst of status transitions costs one commit instead of many.
+    Reads see pending writes immediately. Several processes may share
+    the file (an API and its workers); a buffered write never replaces
+    a record another process has updated since.
+    """
+
+    def __init__(self, path: str, *, batch_size: int = 100, flush_interval: float = 0.5):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._db_lock = threading.Lock()
+        self._pending: Dict[str, ImageGeneration] = {}
+        # Batch currently being written; kept readable until committed
+        self._flushing: Dict[str, ImageGeneration] = {}
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="sqlite-generation-flusher", daemon=True)
+        self._flusher.start()
+
+    def save(self, generation: ImageGeneration) -> None:
+        with self._pending_lock:
+            self._pending[generation.generation_id] = generation.model_copy()
+            full = len(self._pending) >= self._batch_size
+        if full:
+            self._wakeup.set()
+
+    def get(self, generation_id: str) -> Optional[ImageGeneration]:
+        with self._pending_lock:
+            pending = self._pending.get(generation_id) or self._flushing.get(generation_id)
+        if pending is not None:
+            return pending.model_copy()
+        with self._db_lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM generations WHERE generation_id = ?", (generation_id,)
+            ).fetchone()
+        return _from_row(row) if row else None
+
+    def list(
+        self,
+        *,
+        status: Optional[GenerationStatus] = None,
+        created_before: Optional[datetime] = None,
+        limit: int = 50,
+    ) -> List[ImageGeneration]:
+        self.flush()
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status.value)
+        if created_before is not None:
+            clauses.append("created_at < ?")
+            params.append(created_before.isoformat())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        with self._db_lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM generations {where} ORDER BY created_at DESC LIMIT ?", params
+            ).fetchall()
+        return [_from_row(row) for row in rows]
+
+    def delete(self, generation_id: str) -> None:
+        with self._pending_lock:
+            self._pending.pop(generation_id, None)
+        with self._db_lock:
+            self._conn.execute("DELETE FROM generations WHERE generation_id = ?", (generation_id,))
+
+    def flush(self) -> None:
+        """Write all pending records in one transaction."""
+        with self._db_lock:
+            with self._pending_lock:
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+            rows = [_to_row(g) for g in batch.values()]
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(_UPSERT, rows)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                logger.exception("sqlite_repository.flush_failed", extra={"batch_size": len(rows)})
+                # Requeue records that were not superseded meanwhile
+                with self._pending_lock:
+                    for gid, generation in batch.items():
+                        self._pending.setdefault(gid, generation)
+                raise
+            finally:
+                with self._pending_lock:
+                    self._flushing = {}
+
+    def _migrate(self) -> None:
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(generations)")}
+        for column, column_type in _ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE generations ADD COLUMN {column} {column_type}")
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # already logged; retried on the next tick
+
+
+def _to_row(generation: ImageGeneration) -> dict:
+    return {
+        "generation_id": generation.generation_id,
+        "prompt": generation.prompt,
+        "status": generation.status.value,
+        "image_url": generation.image_url,
+        "failure_reason": generation.failure_reason,
+        "created_at": generation.created_at.isoformat(),
+        "updated_at": generation.updated_at.isoformat(),
+        "output": generation.output.model_dump_json(),
+        "variants": json.dumps([v.model_dump(mode="json") for v in generation.variants]),
+    }
+
+
+def _from_row(row: sqlite3.Row) -> ImageGeneration:
+    return ImageGeneration(
+        generation_id=row["generation_id"],
+        prompt=row["prompt"],
+        status=GenerationStatus(row["status"]),
+        image_url=row["image_url"],
+        failure_reason=row["failure_reason"],
+        created_at=datetime.fromisoformat(row["created_at"]),
+        updated_at=datetime.fromisoformat(row["updated_at"]),
+        output=OutputOptions.model_validate_json(row["output"]) if row["output"] else OutputOptions(),
+        variants=[ImageVariant.model_validate(v) for v in json.loads(row["variants"] or "[]")],
+    )
@@ -1,5 +1,7 @@
+from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 from .common import Status, ErrorResponse
+from .generation import GenerationStatus, ImageVariantResponse, OutputFormat
 
 class GenerateRequest(BaseModel):
     """
@@ -11,6 +13,21 @@ class GenerateRequest(BaseModel):
         max_length=500,
         description="The user's imaginative input for the image."
     )
+    output_format: OutputFormat = Field(
+        OutputFormat.png,
+        description="Encoding of the full-size image and its thumbnails."
+    )
+    quality: int = Field(
+        85,
+        ge=1,
+        le=100,
+        description="Encoder quality for lossy formats; ignored for PNG."
+    )
+    sizes: List[int] = Field(
+        default_factory=list,
+        max_length=8,
+        description="Widths in pixels of additional thumbnails (16-512)."
+    )
 
     @field_validator("prompt")
     @classmethod
@@ -20,10 +37,20 @@ class GenerateRequest(BaseModel):
             raise ValueError("Prompt cannot be empty or whitespace.")
         return v2
 
+    @field_validator("sizes")
+    @classmethod
+    def sizes_in_range(cls, v: List[int]) -> List[int]:
+        if any(size < 16 or size > 512 for size in v):
+            raise ValueError("Thumbnail widths must be between 16 and 512 pixels.")
+        return sorted(set(v), reverse=True)
+
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
-                "prompt": "a futuristic city skyline at sunset"
+                "prompt": "a futuristic city skyline at sunset",
+                "output_format": "webp",
+                "quality": 80,
+                "sizes": [256, 128]
             }
         }
     )
@@ -35,14 +62,114 @@ class GenerateResponse(BaseModel):
     generation_id: str
     image_url: str
     status: Status
+    variants: List[ImageVariantResponse] = []
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "generation_id": "img-1a2b3c4d",
+                "image_url": "https://cdn.example.com/assets/img-1a2b3c4d.webp",
+                "status": "success",
+                "variants": [
+                    {
+                        "format": "webp",
+                        "width": 512,
+                        "height": 512,
+                        "url": "https://cdn.example.com/assets/img-1a2b3c4d.webp",
+                        "size_bytes": 8214
+                    },
+                    {
+                        "format": "webp",
+                        "width": 256,
+                        "height": 256,
+                        "url": "https://cdn.example.com/assets/img-1a2b3c4d_256w.webp",
+                        "size_bytes": 3127
+                    }
+                ]
+            }
+        }
+    )
+
+class GenerationAcceptedResponse(BaseModel):
+    """
+    Schema for the 202 response of the /generate endpoint in async mode.
+    Poll GET /generation/{generation_id} for the result.
+    """
+    generation_id: str
+    status: GenerationStatus
 
     model_config = ConfigDict(
         from_attributes=True,
         json_schema_extra={
             "example": {
                 "generation_id": "img-1a2b3c4d",
-                "image_url": "https://cdn.example.com/assets/img-1a2b3c4d.png",
-                "status": "success"
+                "status": "pending"
+            }
+        }
+    )
+
+class BatchGenerateRequest(BaseModel):
+    """
+    Schema for the request body of the /generate/batch endpoint.
+    """
+    items: List[GenerateRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Prompts to generate; identical prompts are rendered once."
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "items": [
+                    {"prompt": "a futuristic city skyline at sunset"},
+                    {"prompt": "a futuristic city skyline at dawn"}
+                ]
+            }
+        }
+    )
+
+class BatchItemResult(BaseModel):
+    """
+    Outcome of a single item in a batch, in request order.
+    """
+    index: int
+    status: Status
+    generation_id: Optional[str] = None
+    image_url: Optional[str] = None
+    variants: List[ImageVariantResponse] = []
+    error: Optional[str] = None
+
+class BatchGenerateResponse(BaseModel):
+    """
+    Schema for the response of the /generate/batch endpoint.
+    Individual items may fail without failing the whole batch.
+    """
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "results": [
+                    {
+                        "index": 0,
+                        "status": "success",
+                        "generation_id": "img-1a2b3c4d",
+                        "image_url": "https://cdn.example.com/assets/img-1a2b3c4d.png"
+                    },
+                    {
+                        "index": 1,
+                        "status": "error",
+                        "generation_id": "img-5e6f7a8b",
+                        "error": "Storage upload failed: timeout"
+                    }
+                ],
+                "succeeded": 1,
+                "failed": 1
             }
         }
     )
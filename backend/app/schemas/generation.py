@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 from pydantic import BaseModel, ConfigDict
 
@@ -9,6 +9,25 @@ class GenerationStatus(str, Enum):
     completed = "completed"
     failed = "failed"
 
+class OutputFormat(str, Enum):
+    png = "png"
+    webp = "webp"
+    jpeg = "jpeg"
+    avif = "avif"
+
+class ImageVariantResponse(BaseModel):
+    """
+    One stored rendition of a generated image. `size_bytes` is null when
+    the rendition was reused from an earlier identical request.
+    """
+    format: OutputFormat
+    width: int
+    height: int
+    url: str
+    size_bytes: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 class GenerationDetailResponse(BaseModel):
     """
     Schema for the response of GET /generation/{id}.
@@ -18,8 +37,10 @@ class GenerationDetailResponse(BaseModel):
     prompt: str
     status: GenerationStatus
     image_url: Optional[str] = None
+    variants: List[ImageVariantResponse] = []
+    failure_reason: Optional[str] = None
     created_at: datetime
-    # updated_at: Optional[datetime] = None  # Uncomment when tracked
+    updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(
         from_attributes=True,
@@ -29,7 +50,16 @@ class GenerationDetailResponse(BaseModel):
                 "prompt": "a futuristic city skyline at sunset",
                 "status": "completed",
                 "image_url": "https://cdn.example.com/assets/img-1a2b3c4d.png",
-                "created_at": "2025-08-08T14:00:00Z"
+                "created_at": "2025-08-08T14:00:00Z",
+                "updated_at": "2025-08-08T14:00:07Z"
             }
         }
     )
+
+class GenerationListResponse(BaseModel):
+    """
+    Schema for the response of GET /generations.
+    Pass `next_before` as `created_before` to fetch the next page.
+    """
+    items: List[GenerationDetailResponse]
+    next_before: Optional[datetime] = None
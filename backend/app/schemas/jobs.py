@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+class DeadLetterResponse(BaseModel):
+    """
+    A background generation job that was given up on after exhausting
+    its attempts. Its generation is marked failed with the same reason.
+    """
+    job_id: str
+    generation_id: str
+    prompt: str
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    failed_at: datetime
+
+class DeadLetterListResponse(BaseModel):
+    """
+    Schema for the response of GET /jobs/dead-letters, most recent first.
+    """
+    items: List[DeadLetterResponse]
+
+class WorkerHeartbeatResponse(BaseModel):
+    """
+    Liveness and throughput of one generation worker, as of its last
+    heartbeat. `jobs` counts settled jobs by outcome since it started.
+    """
+    worker_id: str
+    concurrency: int
+    in_flight: int
+    jobs_per_second: float
+    jobs: Dict[str, int]
+    started_at: datetime
+    last_seen: datetime
+
+class WorkerListResponse(BaseModel):
+    """
+    Schema for the response of GET /jobs/workers. Workers that missed
+    several heartbeats are left out.
+    """
+    items: List[WorkerHeartbeatResponse]
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+
+from app.models.generation import ImageVariant
+
+# Rough per-entry bookkeeping overhead (dict slot, dataclass, key string)
+_ENTRY_OVERHEAD_BYTES = 256
+# Rough size of one cached ImageVariant besides its strings
+_VARIANT_OVERHEAD_BYTES = 128
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt so trivially different spellings share a cache key."""
+    return " ".join(unicodedata.normalize("NFKC", prompt).split())
+
+
+def prompt_cache_key(prompt: str, *, model: str, params: Mapping[str, Any]) -> str:
+    """
+    Return a content address for a render: the SHA-256 of the normalized
+    prompt, the model name and the render parameters.
+    """
+    payload = json.dumps(
+        {"prompt": normalize_prompt(prompt), "model": model, "params": dict(params)},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResult:
+    """A rendered image that already exists in object storage."""
+    object_name: str
+    image_url: str
+    variants: Tuple[ImageVariant, ...] = ()
+    expires_at: float = field(default=0.0, compare=False)
+
+    @property
+    def size_bytes(self) -> int:
+        variant_bytes = sum(
+            len(v.object_name) + len(v.url) + _VARIANT_OVERHEAD_BYTES for v in self.variants
+        )
+        return len(self.object_name) + len(self.image_url) + variant_bytes + _ENTRY_OVERHEAD_BYTES
+
+
+class PromptResultCache:
+    """
+    In-memory LRU of recent render results, bounded by entry count, total
+    size and a per-entry TTL. This is the hot tier; the object store itself
+    is the cold tier, checked by the GeneratorService on a miss.
+    """
+
+    def __init__(self, *, max_entries: int = 10_000, max_bytes: int = 16 * 1024 * 1024, ttl_seconds: float = 3600):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.cold_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Return a live entry and mark it most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self, key: str, object_name: str, image_url: str, variants: Sequence[ImageVariant] = ()
+    ) -> None:
+        """Insert or refresh an entry, evicting least recently used ones as needed."""
+        entry = CachedResult(
+            object_name, image_url, tuple(variants), expires_at=time.monotonic() + self._ttl_seconds
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size_bytes
+            while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def record_cold_hit(self) -> None:
+        """Count a miss in memory that was satisfied by an existing stored object."""
+        with self._lock:
+            self.cold_hits += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "cold_hits": self.cold_hits,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size_bytes
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from app.models.generation import ImageGeneration
+
+
+class GenerationSubscription:
+    """
+    A stream of generation snapshots for a fixed set of generation IDs.
+    Holds at most `max_pending` undelivered snapshots, dropping the oldest
+    first since only the latest state of a generation matters.
+    """
+
+    def __init__(self, bus: "GenerationEventBus", generation_ids: Set[str], max_pending: int):
+        self.generation_ids = generation_ids
+        self._bus = bus
+        self._queue: asyncio.Queue[ImageGeneration] = asyncio.Queue(maxsize=max_pending)
+
+    def _offer(self, generation: ImageGeneration) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(generation)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[ImageGeneration]:
+        """Return the next snapshot, or None if `timeout` elapses first."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+
+class GenerationEventBus:
+    """
+    Fans ImageGeneration status transitions out to subscribers.
+
+    `publish` is registered as a model transition listener, so every
+    mark_as_* call produces an event. It may be called from any thread;
+    delivery always happens on the bus's event loop.
+    """
+
+    def __init__(self, max_pending_per_subscriber: int = 100):
+        self._max_pending = max_pending_per_subscriber
+        self._subscriptions: Dict[str, Set[GenerationSubscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+
+    def subscribe(self, generation_ids: Iterable[str]) -> GenerationSubscription:
+        subscription = GenerationSubscription(self, set(generation_ids), self._max_pending)
+        for generation_id in subscription.generation_ids:
+            self._subscriptions.setdefault(generation_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: GenerationSubscription) -> None:
+        for generation_id in subscription.generation_ids:
+            subscribers = self._subscriptions.get(generation_id)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscriptions[generation_id]
+
+    def publish(self, generation: ImageGeneration) -> None:
+        if generation.generation_id not in self._subscriptions or self._loop is None:
+            return
+        snapshot = generation.model_copy()
+        if threading.get_ident() == self._loop_thread:
+            self._deliver(snapshot)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, snapshot)
+
+    def _deliver(self, generation: ImageGeneration) -> None:
+        for subscription in list(self._subscriptions.get(generation.generation_id, ())):
+            subscription._offer(generation)
+
+
+async def iter_generation_events(
+    subscription: GenerationSubscription,
+    initial: Iterable[ImageGeneration],
+    *,
+    keepalive_seconds: float = 15.0,
+    refresh: Optional[Callable[[List[str]], Awaitable[List[Optional[ImageGeneration]]]]] = None,
+    refresh_seconds: float = 1.0,
+) -> AsyncIterator[Optional[ImageGeneration]]:
+    """
+    Yield the initial snapshots followed by live transitions until every
+    subscribed generation reaches a terminal status. Yields None when no
+    event arrived within `keepalive_seconds`, so callers can send a ping.
+
+    Transitions made in other processes (standalone workers) never reach
+    this process's bus; with `refresh`, the generations still running are
+    re-read through it every `refresh_seconds` while the bus is quiet.
+    """
+    remaining = set(subscription.generation_ids)
+    last_seen: Dict[str, datetime] = {}
+    wait = min(keepalive_seconds, refresh_seconds) if refresh is not None else keepalive_seconds
+    try:
+        for generation in initial:
+            last_seen[generation.generation_id] = generation.updated_at
+            yield generation
+            if generation.status.is_terminal:
+                remaining.discard(generation.generation_id)
+        last_sent = time.monotonic()
+        while remaining:
+            generation = await subscription.get(timeout=wait)
+            if generation is not None:
+                updates = [generation]
+            elif refresh is not None:
+                updates = [g for g in await refresh(sorted(remaining)) if g is not None]
+            else:
+                updates = []
+            for update in updates:
+                seen = last_seen.get(update.generation_id)
+                # Skip transitions already delivered, e.g. by the initial snapshot
+                if update.generation_id not in remaining or (seen and update.updated_at <= seen):
+                    continue
+                last_seen[update.generation_id] = update.updated_at
+                last_sent = time.monotonic()
+                yield update
+                if update.status.is_terminal:
+                    remaining.discard(update.generation_id)
+            if remaining and time.monotonic() - last_sent >= keepalive_seconds:
+                last_sent = time.monotonic()
+                yield None
+    finally:
+        subscription.close()
@@ -1,139 +1,496 @@
 import asyncio
+from contextlib import nullcontext
 from io import BytesIO
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 import logging
+import math
 
-import google.generativeai as genai
-from fastapi import Depends
-from PIL import Image
+import structlog
 
 from app.core.config import settings
-from app.models.generation import ImageGeneration
-from app.storage_providers.base import BaseStorageProvider
-from app.storage_providers.minio import MinioStorageProvider 
+from app.core.metrics import GENERATIONS_IN_FLIGHT, GENERATIONS_TOTAL, UPLOADED_BYTES, collect_timings, timed
+from app.model_backends.base import BaseModelBackend, ModelImage, ModelRateLimitedError
+from app.model_backends.placeholder import PlaceholderModelBackend
+from app.models.generation import ImageGeneration, ImageVariant, OutputFormat, OutputOptions
+from app.repositories.base import BaseGenerationRepository
+from app.services.cache import CachedResult, PromptResultCache, prompt_cache_key
+from app.services.limiter import AdaptiveConcurrencyLimiter, LimitExceededError
+from app.services.rate_limiter import (
+    KeyGrant,
+    ModelQuotaScheduler,
+    RateLimitedError,
+    current_priority,
+    estimate_tokens,
+)
+from app.services.renderer import PlaceholderRenderer, scaled_size
+from app.services.resilience import ResiliencePolicy
+from app.services.singleflight import SingleFlight
+from app.storage_providers.base import AsyncBaseStorageProvider, BaseStorageProvider, call_storage
+from app.storage_providers.key_layout import BaseKeyLayout, FlatKeyLayout
+from app.storage_providers.streaming import BoundedPipe
 from app.utils.id_generator import generate_unique_id
 
-# Configure the old SDK
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
 logger = logging.getLogger(__name__)
+timing_logger = structlog.get_logger("generation.timings")
+
+# Default Gemini model when GEMINI_MODELS is not set
+MODEL_NAME = "gemini-1.5-flash"
+# Everything besides prompt and model that changes the rendered bytes
+RENDER_PARAMS = {"renderer": "placeholder-v1", "width": 512, "height": 512, "format": "png"}
+DEFAULT_OUTPUT = OutputOptions()
+
+# (object_name, width, height) of a rendition to produce
+VariantPlan = Tuple[str, int, int]
+
+
+def render_params(output: OutputOptions) -> Dict[str, Any]:
+    """
+    Render parameters for the cache key. Default output keeps the
+    original parameters so existing cache addresses stay valid.
+    """
+    if output == DEFAULT_OUTPUT:
+        return RENDER_PARAMS
+    return {
+        **RENDER_PARAMS,
+        "format": output.output_format.value,
+        "quality": output.quality,
+        "sizes": sorted(set(output.sizes)),
+    }
+
+
+def plan_variants(base_name: str, output: OutputOptions) -> List[VariantPlan]:
+    """
+    Object names and dimensions of every rendition: the full-size image
+    first, then one thumbnail per requested width, largest first.
+    """
+    ext = output.output_format.value
+    full_width = RENDER_PARAMS["width"]
+    widths = sorted({w for w in output.sizes if w < full_width}, reverse=True)
+    plan = [(f"{base_name}.{ext}", *scaled_size(full_width))]
+    plan.extend((f"{base_name}_{w}w.{ext}", *scaled_size(w)) for w in widths)
+    return plan
+
+def _admitted(limiter: Optional[AdaptiveConcurrencyLimiter]):
+    """Acquire a slot from `limiter`, or do nothing when limiting is disabled."""
+    return limiter.acquire() if limiter is not None else nullcontext()
 
 class GeneratorService:
     """
     Service responsible for the core logic of generating and storing images.
     """ 
-    def __init__(self, storage_provider: BaseStorageProvider):
+    def __init__(
+        self,
+        storage_provider: Union[BaseStorageProvider, AsyncBaseStorageProvider],
+        repository: Optional[BaseGenerationRepository] = None,
+        result_cache: Optional[PromptResultCache] = None,
+        single_flight: Optional[SingleFlight[ImageGeneration]] = None,
+        renderer: Optional[PlaceholderRenderer] = None,
+        model_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        upload_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        quota_scheduler: Optional[ModelQuotaScheduler] = None,
+        model_backend: Optional[BaseModelBackend] = None,
+        model_policy: Optional[ResiliencePolicy] = None,
+        storage_policy: Optional[ResiliencePolicy] = None,
+        streaming_upload: bool = False,
+        key_layout: Optional[BaseKeyLayout] = None,
+    ):
         self.storage_provider = storage_provider
-        self.model = genai.GenerativeModel("gemini-1.5-flash")
+        self.repository = repository
+        self.result_cache = result_cache
+        self.single_flight = single_flight
+        self.renderer = renderer or PlaceholderRenderer()
+        self.model_limiter = model_limiter
+        self.upload_limiter = upload_limiter
+        self.quota_scheduler = quota_scheduler
+        self.model_backend = model_backend or PlaceholderModelBackend(self.renderer)
+        self.model_policy = model_policy
+        self.storage_policy = storage_policy
+        self.streaming_upload = streaming_upload
+        self.key_layout = key_layout or FlatKeyLayout()
 
-    async def _generate_image_from_prompt(self, prompt: str) -> Optional[BytesIO]:
+    def warm_up(self) -> None:
         """
-        For now, create a simple placeholder image since Gemini image generation
-        requires billing. This allows the API to work for testing.
-        
-        TODO: Replace with actual Gemini image generation once billing is enabled.
+        Build the model backend's clients ahead of the first request.
+        Blocking; run it off the event loop.
+        """
+        self.model_backend.warm_up()
+
+    def _cache_key(self, prompt: str, output: OutputOptions, model_name: Optional[str] = None) -> str:
+        return prompt_cache_key(
+            prompt, model=model_name or self.model_backend.model_name, params=render_params(output)
+        )
+
+    async def _generate_image_from_prompt(self, prompt: str, grant: Optional[KeyGrant] = None) -> Optional[ModelImage]:
+        """
+        Generate the master image with the configured model backend (the
+        placeholder renderer unless MODEL_BACKENDS says otherwise).
         """
         try:
-            def create_placeholder_image():
-                # Create a simple placeholder image for testing
-                from PIL import Image, ImageDraw, ImageFont
-                import textwrap
-                
-                # Create a 512x512 image with a gradient background
-                img = Image.new('RGB', (512, 512), color=(30, 30, 50))
-                draw = ImageDraw.Draw(img)
-                
-                # Draw a simple gradient effect
-                for i in range(512):
-                    color = (30 + i//8, 30 + i//12, 50 + i//6)
-                    draw.line([(0, i), (512, i)], fill=color)
-                
-                # Add text overlay
-                try:
-                    # Try to load a font, fallback to default if not available
-                    font = ImageFont.load_default()
-                except:
-                    font = None
-                
-                # Wrap the prompt text
-                wrapped_text = textwrap.fill(prompt, width=40)
-                lines = wrapped_text.split('\n')
-                
-                # Calculate text position (centered)
-                y_start = 256 - (len(lines) * 15) // 2
-                
-                for i, line in enumerate(lines[:10]):  # Limit to 10 lines
-                    # Calculate text width for centering
-                    bbox = draw.textbbox((0, 0), line, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    x = (512 - text_width) // 2
-                    y = y_start + i * 20
-                    
-                    # Draw text with shadow effect
-                    draw.text((x+1, y+1), line, fill=(0, 0, 0), font=font)  # Shadow
-                    draw.text((x, y), line, fill=(255, 255, 255), font=font)  # Main text
-                
-                # Save to BytesIO
-                buffer = BytesIO()
-                img.save(buffer, format='PNG')
-                buffer.seek(0)
-                return buffer
-            
-            # Run in thread to simulate async behavior
-            buffer = await asyncio.to_thread(create_placeholder_image)
-            return buffer
+            async with _admitted(self.model_limiter):
+                if self.model_policy is None:
+                    return await self.model_backend.generate(prompt, grant=grant)
+                # Model calls have no side effects, so failed ones may be retried
+                return await self.model_policy.call(lambda: self.model_backend.generate(prompt, grant=grant))
+        except LimitExceededError:
+            raise
+        except ModelRateLimitedError as e:
+            raise RateLimitedError(current_priority().lane, max(1, math.ceil(e.retry_after))) from e
         except Exception as e:
-            logger.exception("Failed to create placeholder image", extra={"prompt": prompt})
+            logger.exception("Failed to generate image", extra={"prompt": prompt})
             return None
-    async def generate_and_store_image(self, prompt: str) -> Optional[ImageGeneration]:
+
+    def create_generation(
+        self, prompt: str, output: Optional[OutputOptions] = None, *, persist: bool = True
+    ) -> ImageGeneration:
+        """Create a pending generation record with a fresh ID, persisting it unless told not to."""
+        generation = ImageGeneration(
+            generation_id=generate_unique_id(prefix="gen"),
+            prompt=prompt,
+            output=output or DEFAULT_OUTPUT,
+        )
+        if persist:
+            self.persist(generation)
+        return generation
+
+    def persist(self, generation: ImageGeneration) -> None:
+        """Persist the current state of a generation, if a repository is configured."""
+        if self.repository is None:
+            return
+        try:
+            self.repository.save(generation)
+        except Exception:
+            logger.exception(
+                "Failed to persist generation state",
+                extra={"generation_id": generation.generation_id}
+            )
+
+    async def generate_and_store_image(
+        self, prompt: str, output: Optional[OutputOptions] = None
+    ) -> Optional[ImageGeneration]:
         """
         Orchestrates the full image generation and storage workflow.
         
         Args:
             prompt: The user's text prompt for image generation
+            output: Requested format, quality and thumbnail sizes
             
         Returns:
             ImageGeneration object with metadata, or None if failed
+
+        Concurrent calls for the same normalized prompt share a single
+        generation when a SingleFlight is configured.
         """
-        generation_id = generate_unique_id(prefix="gen")
-        object_name = f"{generation_id}.png"
+        output = output or DEFAULT_OUTPUT
+        if self.single_flight is None:
+            return await self._generate_new(prompt, output)
+        key = self._cache_key(prompt, output)
+        return await self.single_flight.do(key, lambda: self._generate_new(prompt, output))
 
-        # Create initial generation record
-        generation_result = ImageGeneration(
-            generation_id=generation_id,
-            prompt=prompt,
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        *,
+        concurrency: int,
+        outputs: Optional[Sequence[Optional[OutputOptions]]] = None,
+    ) -> List[Union[ImageGeneration, Exception]]:
+        """
+        Generate images for several prompts in one call.
+
+        Identical prompts (after normalization) are generated once and share
+        the result. `outputs`, if given, holds the output options for each
+        prompt. At most `concurrency` generations run at a time, so
+        uploads of finished images overlap with renders of later ones.
+
+        Returns:
+            One entry per prompt, in order: the ImageGeneration, or the
+            exception raised while producing it.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def bounded(prompt: str, output: OutputOptions) -> ImageGeneration:
+            async with semaphore:
+                return await self.generate_and_store_image(prompt, output)
+
+        resolved = [(o or DEFAULT_OUTPUT) for o in (outputs or [None] * len(prompts))]
+        keys = [
+            self._cache_key(p, o)
+            for p, o in zip(prompts, resolved)
+        ]
+        for key, prompt, output in zip(keys, prompts, resolved):
+            if key not in tasks:
+                tasks[key] = asyncio.create_task(bounded(prompt, output))
+
+        unique_keys = list(tasks)
+        outcomes = await asyncio.gather(*(tasks[k] for k in unique_keys), return_exceptions=True)
+        by_key = dict(zip(unique_keys, outcomes))
+        return [by_key[k] for k in keys]
+
+    async def _generate_new(self, prompt: str, output: OutputOptions) -> ImageGeneration:
+        generation = self.create_generation(prompt, output)
+        try:
+            return await self.run_generation(generation)
+        except asyncio.CancelledError:
+            generation.mark_as_failed("Generation cancelled")
+            self.persist(generation)
+            raise
+
+    async def run_generation(self, generation_result: ImageGeneration) -> ImageGeneration:
+        """
+        Render and upload the image for an existing generation record,
+        updating its status in place.
+
+        The master image is rendered once; the requested format and
+        thumbnail sizes are derived from it in parallel and all
+        renditions are uploaded concurrently. Each stage is timed into
+        the stage histogram and logged as one structured timing event.
+        """
+        with collect_timings() as timings, GENERATIONS_IN_FLIGHT.track_inprogress():
+            with timed("total"):
+                try:
+                    result = await self._run_generation(generation_result)
+                except LimitExceededError as e:
+                    generation_result.mark_as_failed(f"Shed under load: {str(e)}")
+                    self.persist(generation_result)
+                    GENERATIONS_TOTAL.inc(status=generation_result.status.value, source="shed")
+                    raise
+        source = "render" if "render" in timings else "cache"
+        GENERATIONS_TOTAL.inc(status=result.status.value, source=source)
+        timing_logger.info(
+            "generation.timings",
+            generation_id=result.generation_id,
+            status=result.status.value,
+            source=source,
+            **{f"{stage}_ms": round(seconds * 1000, 3) for stage, seconds in timings.items()},
         )
-        
-        # Step 1: Mark as processing and generate the image
+        return result
+
+    async def _run_generation(self, generation_result: ImageGeneration) -> ImageGeneration:
+        generation_id = generation_result.generation_id
+        prompt = generation_result.prompt
+        output = generation_result.output
+        bucket = settings.OBJECT_STORAGE_BUCKET
+        cache_key = None
+        plan = plan_variants(self.key_layout.key(generation_id), output)
+
         generation_result.mark_as_processing()
-        image_buffer = await self._generate_image_from_prompt(prompt)
-        if not image_buffer:
+        self.persist(generation_result)
+
+        # Step 0: Reuse an identical earlier render by any of the models
+        # calls may be routed to, if one exists
+        if self.result_cache is not None:
+            cached = None
+            with timed("cache_lookup"):
+                for model_name in self.model_backend.model_names:
+                    key = self._cache_key(prompt, output, model_name)
+                    lookup_plan = plan_variants(self.key_layout.key(key), output)
+                    cached = await self._lookup_cached(key, bucket, lookup_plan, output.output_format)
+                    if cached:
+                        break
+            if cached:
+                generation_result.mark_as_completed(cached.image_url, list(cached.variants))
+                self.persist(generation_result)
+                logger.info(
+                    "Served image from prompt cache",
+                    extra={"generation_id": generation_id, "object_name": cached.object_name}
+                )
+                return generation_result
+
+        # Step 1: Generate the image, once the model quota allows another call
+        grant = None
+        if self.quota_scheduler is not None:
+            with timed("quota_wait"):
+                grant = await self.quota_scheduler.acquire(
+                    estimate_tokens(prompt, settings.MODEL_OUTPUT_TOKENS_ESTIMATE)
+                )
+        with timed("render"):
+            image = await self._generate_image_from_prompt(prompt, grant)
+        if not image:
             generation_result.mark_as_failed("Failed to generate image from AI model")
+            self.persist(generation_result)
             logger.warning("Image generation failed", extra={"generation_id": generation_id})
             return generation_result
-            
-        # Step 2: Upload the generated image to storage
+        image_buffer = BytesIO(image.data)
+        if self.result_cache is not None:
+            # Cache under the model that actually drew the image, which a
+            # router chooses per call
+            cache_key = self._cache_key(prompt, output, image.model_name)
+            plan = plan_variants(self.key_layout.key(cache_key), output)
+
+        # Step 2: Derive the requested renditions from the master
         try:
-            def upload():
-                return self.storage_provider.upload(
-                    file_object=image_buffer,
-                    bucket=settings.OBJECT_STORAGE_BUCKET,
+            with timed("encode"):
+                buffers = await self._encode_variants(image_buffer, plan, output)
+        except Exception as e:
+            image_buffer.close()
+            generation_result.mark_as_failed(f"Image encoding failed: {str(e)}")
+            self.persist(generation_result)
+            logger.exception("Failed to encode image variants", extra={"generation_id": generation_id})
+            return generation_result
+
+        # Step 3: Upload every rendition to storage (encoding the streamed ones on the way)
+        try:
+            master = image_buffer.getvalue() if None in buffers else b""
+            with timed("upload"):
+                stored = await asyncio.gather(*(
+                    self._upload(buffer, bucket, object_name, output.output_format.content_type)
+                    if buffer is not None
+                    else self._upload_streamed(master, bucket, object_name, width, output)
+                    for buffer, (object_name, width, _) in zip(buffers, plan)
+                ))
+            urls = [url for url, _ in stored]
+            variants = [
+                ImageVariant(
+                    format=output.output_format,
+                    width=width,
+                    height=height,
                     object_name=object_name,
-                    content_type="image/png"
+                    url=url,
+                    size_bytes=size_bytes,
                 )
-            public_url = await asyncio.to_thread(upload)
-            generation_result.mark_as_completed(public_url)
+                for (url, size_bytes), (object_name, width, height) in zip(stored, plan)
+            ]
+            UPLOADED_BYTES.inc(sum(v.size_bytes for v in variants), format=output.output_format.value)
+            generation_result.mark_as_completed(urls[0], variants)
+            if cache_key is not None:
+                self.result_cache.put(cache_key, plan[0][0], urls[0], variants)
+        except LimitExceededError:
+            raise
         except Exception as e:
             generation_result.mark_as_failed(f"Storage upload failed: {str(e)}")
             logger.exception(
                 "Failed to upload generated image", 
-                extra={"generation_id": generation_id, "object_name": object_name}
+                extra={"generation_id": generation_id, "object_name": plan[0][0]}
             )
         finally:
             image_buffer.close()
+            for buffer in buffers:
+                if buffer is not None:
+                    buffer.close()
+            self.persist(generation_result)
 
         logger.info(
             "Successfully generated and stored image", 
             extra={"generation_id": generation_id, "prompt_length": len(prompt)}
         )
         return generation_result
+
+    async def _upload(self, buffer: BytesIO, bucket: str, object_name: str, content_type: str) -> Tuple[str, int]:
+        # Every attempt reads its own buffer: the thread of an attempt that
+        # timed out may still be reading while the retry uploads
+        data = buffer.getvalue()
+
+        async def attempt() -> str:
+            return await call_storage(
+                self.storage_provider,
+                "upload",
+                file_object=BytesIO(data),
+                bucket=bucket,
+                object_name=object_name,
+                content_type=content_type
+            )
+
+        async with _admitted(self.upload_limiter):
+            url = await (attempt() if self.storage_policy is None else self.storage_policy.call(attempt))
+        return url, len(data)
+
+    async def _upload_streamed(
+        self, master: bytes, bucket: str, object_name: str, width: int, output: OutputOptions
+    ) -> Tuple[str, int]:
+        """
+        Encode one rendition straight into its upload through a bounded
+        pipe, so the upload starts before encoding ends and the encoded
+        image is never held in memory as a whole.
+        """
+        pipe = BoundedPipe(settings.STREAMING_UPLOAD_CHUNK_SIZE, settings.STREAMING_UPLOAD_MAX_CHUNKS)
+        encoder = asyncio.create_task(
+            self.renderer.encode_to(master, output.output_format.value, width, output.quality, pipe)
+        )
+        try:
+            async with _admitted(self.upload_limiter):
+                url = await self._call_storage(
+                    "upload_stream",
+                    pipe,
+                    bucket,
+                    object_name,
+                    content_type=output.output_format.content_type,
+                    idempotent=False,  # The stream cannot be replayed
+                )
+        except BaseException:
+            pipe.cancel()
+            raise
+        finally:
+            await asyncio.gather(encoder, return_exceptions=True)
+        return url, pipe.bytes_written
+
+    async def _encode_variants(
+        self, image_buffer: BytesIO, plan: List[VariantPlan], output: OutputOptions
+    ) -> List[Optional[BytesIO]]:
+        """
+        Return one buffer per planned rendition. A full-size PNG is the
+        master itself; everything else is encoded concurrently, or left as
+        None with streaming uploads, to be encoded while it is uploaded.
+        """
+        master = None
+
+        async def encode(width: int) -> Optional[BytesIO]:
+            nonlocal master
+            if output.output_format == OutputFormat.PNG and width == RENDER_PARAMS["width"]:
+                return image_buffer
+            if self.streaming_upload:
+                return None
+            if master is None:
+                master = image_buffer.getvalue()
+            data = await self.renderer.encode(master, output.output_format.value, width, output.quality)
+            return BytesIO(data)
+
+        return list(await asyncio.gather(*(encode(width) for _, width, _ in plan)))
+
+    async def _lookup_cached(
+        self, cache_key: str, bucket: str, plan: List[VariantPlan], fmt: OutputFormat
+    ) -> Optional[CachedResult]:
+        """
+        Return an existing render for `cache_key`, checking the in-memory
+        tier first and then the bucket itself, where every planned
+        rendition must be present.
+        """
+        entry = self.result_cache.get(cache_key)
+        if entry is not None:
+            return entry
+        try:
+            found = await asyncio.gather(*(
+                self._call_storage("exists", bucket, object_name) for object_name, _, _ in plan
+            ))
+        except LimitExceededError:
+            raise  # Storage is unavailable; fail before spending a model call
+        except Exception:
+            logger.exception("Prompt cache storage lookup failed", extra={"object_name": plan[0][0]})
+            return None
+        if not all(found):
+            return None
+        variants = [
+            ImageVariant(
+                format=fmt,
+                width=width,
+                height=height,
+                object_name=object_name,
+                url=self.storage_provider.get_public_url(bucket, object_name),
+            )
+            for object_name, width, height in plan
+        ]
+        self.result_cache.record_cold_hit()
+        self.result_cache.put(cache_key, plan[0][0], variants[0].url, variants)
+        return CachedResult(plan[0][0], variants[0].url, tuple(variants))
+
+    async def _call_storage(self, method: str, *args: Any, idempotent: bool = True, **kwargs: Any) -> Any:
+        """
+        Invoke a storage provider I/O method without blocking the event
+        loop, under the storage policy if one is configured. Calls are
+        idempotent unless said otherwise: object names are deterministic,
+        so a retried upload overwrites the same object.
+        """
+        if self.storage_policy is None:
+            return await call_storage(self.storage_provider, method, *args, **kwargs)
+        return await self.storage_policy.call(
+            lambda: call_storage(self.storage_provider, method, *args, **kwargs), idempotent=idempotent
+        )
@@ -0,0 +1,129 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Tuple
+import hashlib
+import json
+import time
+
+
+@dataclass
+class StoredResponse:
+    """
+    A response recorded under an idempotency key, replayed to retries.
+    A response that is not `final` (e.g. a 202 for work that is still
+    running) goes to the callers waiting for it but is not stored.
+    """
+    status_code: int
+    content: Dict[str, Any]
+    headers: Dict[str, str] = field(default_factory=dict)
+    final: bool = True
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    response: StoredResponse
+    expires_at: float
+
+
+@dataclass
+class _InFlight:
+    fingerprint: str
+    task: "asyncio.Future[StoredResponse]"
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Raised when an idempotency key is sent again with a different request."""
+
+
+def request_fingerprint(payload: Any) -> str:
+    """SHA-256 of a JSON-serializable request, to detect a key reused for other work."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Process-local record of requests made with an `Idempotency-Key`.
+
+    The first request with a key runs; retries that arrive while it is
+    in flight await the same task, and retries after it finished get its
+    response replayed until `ttl_seconds` have passed. The task is not
+    cancelled when its callers disconnect, so a client that retries
+    after a dropped connection still picks up the original result.
+
+    Only responses returned by the task are stored. A task that raises
+    (a failed, shed or rate-limited request) leaves the key free, so the
+    next retry runs again. Bounded by `max_entries`, least recently used
+    first.
+    """
+
+    def __init__(self, *, ttl_seconds: float = 86400, max_entries: int = 100_000):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self.replays = 0
+        self.joins = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def run(
+        self, key: str, fingerprint: str, fn: Callable[[], Awaitable[StoredResponse]]
+    ) -> Tuple[StoredResponse, bool]:
+        """
+        Run `fn()` once for `key` and return its response, along with
+        whether it was produced by an earlier request.
+
+        Raises:
+            IdempotencyKeyReusedError: If `key` was used for a request
+                with a different `fingerprint`.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is not None:
+            _check(key, entry.fingerprint, fingerprint)
+            self._entries.move_to_end(key)
+            self.replays += 1
+            return entry.response, True
+
+        call = self._in_flight.get(key)
+        if call is not None:
+            _check(key, call.fingerprint, fingerprint)
+            self.joins += 1
+            return await asyncio.shield(call.task), True
+
+        self.misses += 1
+        call = _InFlight(fingerprint, asyncio.ensure_future(fn()))
+        self._in_flight[key] = call
+        call.task.add_done_callback(lambda task: self._settle(key, call))
+        return await asyncio.shield(call.task), False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "replays": self.replays,
+            "joins": self.joins,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _settle(self, key: str, call: _InFlight) -> None:
+        if self._in_flight.get(key) is call:
+            del self._in_flight[key]
+        if call.task.cancelled() or call.task.exception() is not None or not call.task.result().final:
+            return
+        self._entries[key] = _Entry(call.fingerprint, call.task.result(), time.monotonic() + self._ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+def _check(key: str, expected: str, fingerprint: str) -> None:
+    if expected != fingerprint:
+        raise IdempotencyKeyReusedError(f"Idempotency key '{key}' was already used for a different request")
@@ -0,0 +1,184 @@
+"""
+Adaptive concurrency limiting (AIMD on observed latency).
+
+Each limiter allows up to `limit` calls at once. While latency stays
+near the best recently observed latency, the limit grows additively
+(by about one per limit's worth of completions); when latency exceeds
+`latency_tolerance` times that baseline, or a call fails, it shrinks
+multiplicatively. Latency within `latency_slack` seconds of the baseline
+never counts as congestion, so jitter on very fast calls is ignored.
+Calls beyond the limit are rejected immediately unless the caller
+opted into a bounded wait with `admission_wait`.
+"""
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, Optional, Set
+import math
+import time
+
+from app.core.metrics import REGISTRY
+
+LIMIT = REGISTRY.gauge("concurrency_limit", "Current adaptive concurrency limit.", ["limiter"])
+IN_FLIGHT = REGISTRY.gauge("concurrency_in_flight", "Calls currently admitted by a limiter.", ["limiter"])
+REJECTED = REGISTRY.counter("concurrency_rejected_total", "Calls shed because a limiter was full.", ["limiter"])
+
+# Seconds a caller is willing to wait for a free slot; 0 means fail fast
+_admission_wait: ContextVar[float] = ContextVar("admission_wait", default=0.0)
+
+
+@contextmanager
+def admission_wait(seconds: float) -> Iterator[None]:
+    """Let limiters queue calls made inside the block for up to `seconds`."""
+    token = _admission_wait.set(seconds)
+    try:
+        yield
+    finally:
+        _admission_wait.reset(token)
+
+
+class LimitExceededError(Exception):
+    """Raised when a limiter sheds a call; `retry_after` is a hint in seconds."""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"Too many concurrent {name} calls, retry in {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit for one dependency (e.g. model calls or
+    uploads). Not thread-safe; use from a single event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        initial_limit: int = 16,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.9,
+        latency_slack: float = 0.01,
+        baseline_window: int = 200,
+    ):
+        self.name = name
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._latency_tolerance = latency_tolerance
+        self._backoff_ratio = backoff_ratio
+        self._latency_slack = latency_slack
+        self._baseline_window = baseline_window
+        self._in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+        # Wake-up tasks still running; the loop only keeps weak references
+        self._notify_tasks: Set["asyncio.Task[None]"] = set()
+        # Best latency in the previous and the current window of samples
+        self._baseline: Optional[float] = None
+        self._window_min = math.inf
+        self._window_samples = 0
+        self._smoothed_latency = 0.0
+        self._last_backoff = 0.0
+        LIMIT.set(self.limit, limiter=name)
+        IN_FLIGHT.set(0, limiter=name)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """
+        Admit one call for the duration of the block.
+
+        Raises:
+            LimitExceededError: If no slot is free (within the caller's
+                admission wait, if any).
+        """
+        await self._admit()
+        start = time.monotonic()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(time.monotonic() - start, failed)
+
+    async def _admit(self) -> None:
+        if self._in_flight < self.limit:
+            self._take()
+            return
+        wait = _admission_wait.get()
+        if wait > 0:
+            if self._condition is None:
+                self._condition = asyncio.Condition()
+            try:
+                async with self._condition:
+                    await asyncio.wait_for(self._condition.wait_for(lambda: self._in_flight < self.limit), wait)
+                    self._take()
+                    return
+            except asyncio.TimeoutError:
+                pass
+        REJECTED.inc(limiter=self.name)
+        raise LimitExceededError(self.name, self.retry_after())
+
+    def retry_after(self) -> int:
+        """Seconds after which a slot is likely to be free."""
+        return max(1, math.ceil(self._smoothed_latency))
+
+    def _take(self) -> None:
+        self._in_flight += 1
+        IN_FLIGHT.set(self._in_flight, limiter=self.name)
+
+    def _release(self, latency: float, failed: bool) -> None:
+        self._in_flight -= 1
+        IN_FLIGHT.set(self._in_flight, limiter=self.name)
+        self._smoothed_latency = latency if not self._smoothed_latency else (
+            0.9 * self._smoothed_latency + 0.1 * latency
+        )
+        self._update_baseline(latency)
+
+        congested = failed or (
+            self._baseline is not None
+            and latency > max(self._baseline * self._latency_tolerance, self._baseline + self._latency_slack)
+        )
+        now = time.monotonic()
+        if congested:
+            # Back off at most once per smoothed latency, so one burst of
+            # slow completions counts as one congestion signal
+            if now - self._last_backoff >= self._smoothed_latency:
+                self._limit = max(self._min_limit, self._limit * self._backoff_ratio)
+                self._last_backoff = now
+        elif self._in_flight + 1 >= self.limit:
+            # Only grow while the current limit is actually being used
+            self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+        LIMIT.set(self.limit, limiter=self.name)
+
+        if self._condition is not None:
+            task = asyncio.ensure_future(self._notify())
+            self._notify_tasks.add(task)
+            task.add_done_callback(self._notify_tasks.discard)
+
+    async def _notify(self) -> None:
+        async with self._condition:
+            self._condition.notify(max(0, self.limit - self._in_flight))
+
+    def _update_baseline(self, latency: float) -> None:
+        self._window_min = min(self._window_min, latency)
+        self._window_samples += 1
+        if self._baseline is None or self._window_min < self._baseline:
+            self._baseline = self._window_min
+        if self._window_samples >= self._baseline_window:
+            # Let the baseline follow the dependency if it got slower for good
+            self._baseline = self._window_min
+            self._window_min = math.inf
+            self._window_samples = 0
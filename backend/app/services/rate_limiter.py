@@ -0,0 +1,296 @@
+"""
+Client-side quota scheduling for outbound model calls.
+
+Every configured API key gets a requests-per-minute and a
+tokens-per-minute token bucket. Callers ask for a grant with an
+estimated token cost; a grant is issued from whichever key can afford
+it now (the one with the most request budget left), otherwise the
+caller waits in a priority lane. Lanes are served strictly in order:
+interactive requests go ahead of batch jobs, which go ahead of
+background work. A caller whose expected wait exceeds its lane's
+budget is rejected immediately instead of queueing.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence
+
+from app.core.metrics import REGISTRY
+from app.services.limiter import LimitExceededError
+
+# Buckets hold this many seconds of budget, so short bursts are allowed
+BURST_SECONDS = 10.0
+
+WAIT_SECONDS = REGISTRY.histogram(
+    "model_quota_wait_seconds", "Time model calls waited for RPM/TPM budget.", ["lane"]
+)
+THROTTLED = REGISTRY.counter(
+    "model_quota_throttled_total", "Model calls rejected because the quota wait was too long.", ["lane"]
+)
+WAITING = REGISTRY.gauge("model_quota_waiting", "Model calls queued for quota.", ["lane"])
+KEY_REQUESTS = REGISTRY.counter("model_key_requests_total", "Model calls granted per API key.", ["key"])
+KEY_TOKENS = REGISTRY.counter("model_key_tokens_total", "Estimated model tokens granted per API key.", ["key"])
+KEY_PENALTIES = REGISTRY.counter(
+    "model_key_penalties_total", "Upstream rate-limit responses reported per API key.", ["key"]
+)
+
+
+class Priority(IntEnum):
+    """Scheduling lane of a model call; lower values are served first."""
+    INTERACTIVE = 0
+    BATCH = 1
+    BACKGROUND = 2
+
+    @property
+    def lane(self) -> str:
+        return self.name.lower()
+
+
+_priority: ContextVar[Priority] = ContextVar("model_call_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def priority_lane(priority: Priority) -> Iterator[None]:
+    """Schedule model calls made inside the block (and tasks it spawns) in `priority`'s lane."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimitedError(LimitExceededError):
+    """Raised when a model call cannot get quota within its lane's wait budget."""
+
+    def __init__(self, lane: str, retry_after: int):
+        Exception.__init__(self, f"Model quota exhausted for {lane} requests, retry in {retry_after}s")
+        self.name = "model"
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Continuously refilling bucket; may go negative to record debt."""
+
+    def __init__(self, per_minute: float, *, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 if it can be taken now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.tokens -= amount
+
+
+@dataclass
+class KeyGrant:
+    """Permission to make one model call with `api_key`."""
+    key_id: str
+    api_key: str = field(repr=False)
+    tokens: int
+
+
+class _KeyBudget:
+    def __init__(self, key_id: str, api_key: str, rpm: int, tpm: int):
+        self.key_id = key_id
+        self.api_key = api_key
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.paused_until = 0.0
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        return max(
+            self.paused_until - now,
+            self.requests.wait_time(1, now) if self.requests else 0.0,
+            self.tokens.wait_time(tokens, now) if self.tokens else 0.0,
+        )
+
+    def headroom(self) -> float:
+        return self.requests.tokens if self.requests else math.inf
+
+    def take(self, tokens: int, now: float) -> None:
+        if self.requests:
+            self.requests.take(1, now)
+        if self.tokens:
+            self.tokens.take(tokens, now)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    future: "asyncio.Future[KeyGrant]" = field(compare=False)
+
+
+class ModelQuotaScheduler:
+    """
+    Shared RPM/TPM scheduler for outbound model calls across one or
+    more API keys. Use from a single event loop.
+    """
+
+    def __init__(
+        self,
+        api_keys: Sequence[str],
+        *,
+        rpm: int,
+        tpm: int,
+        max_wait: Mapping[Priority, float],
+    ):
+        if not api_keys:
+            raise ValueError("At least one API key is required")
+        self._keys = [_KeyBudget(f"key{i}", key, rpm, tpm) for i, key in enumerate(api_keys)]
+        self._max_wait = dict(max_wait)
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def acquire(self, tokens: int, priority: Optional[Priority] = None) -> KeyGrant:
+        """
+        Wait for budget for one call costing about `tokens` tokens.
+
+        Raises:
+            RateLimitedError: If the call would wait longer than its
+                lane's budget.
+        """
+        priority = _priority.get() if priority is None else priority
+        lane = priority.lane
+        now = time.monotonic()
+        if not self._waiters or self._waiters[0].priority > priority:
+            grant = self._try_grant(tokens, now)
+            if grant is not None:
+                WAIT_SECONDS.observe(0.0, lane=lane)
+                return grant
+
+        max_wait = self._max_wait.get(priority, 0.0)
+        expected = self._expected_wait(tokens, now, priority)
+        if expected > max_wait:
+            THROTTLED.inc(lane=lane)
+            raise RateLimitedError(lane, max(1, math.ceil(expected)))
+
+        waiter = _Waiter(priority, next(self._seq), tokens, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, waiter)
+        self._wake()
+        WAITING.inc(lane=lane)
+        try:
+            grant = await asyncio.wait_for(asyncio.shield(waiter.future), max_wait)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                grant = waiter.future.result()  # Granted just as the wait ran out
+            else:
+                waiter.future.cancel()
+                THROTTLED.inc(lane=lane)
+                retry_after = self._expected_wait(tokens, time.monotonic(), priority)
+                raise RateLimitedError(lane, max(1, math.ceil(retry_after)))
+        except asyncio.CancelledError:
+            waiter.future.cancel()
+            raise
+        finally:
+            WAITING.dec(lane=lane)
+        WAIT_SECONDS.observe(time.monotonic() - now, lane=lane)
+        return grant
+
+    def try_acquire(self, tokens: int) -> Optional[KeyGrant]:
+        """
+        Grant budget only if it is available now and nobody is queued for
+        it; for optional calls such as hedged requests.
+        """
+        if self._waiters:
+            return None
+        return self._try_grant(tokens, time.monotonic())
+
+    def settle(self, grant: KeyGrant, actual_tokens: int) -> None:
+        """Correct a key's token budget once the real cost of a call is known."""
+        budget = self._budget(grant.key_id)
+        if budget is not None and budget.tokens is not None:
+            budget.tokens.take(actual_tokens - grant.tokens, time.monotonic())
+
+    def penalize(self, key_id: str, retry_after: float) -> None:
+        """Stop using a key for `retry_after` seconds after an upstream 429."""
+        budget = self._budget(key_id)
+        if budget is not None:
+            budget.paused_until = max(budget.paused_until, time.monotonic() + retry_after)
+            KEY_PENALTIES.inc(key=key_id)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        now = time.monotonic()
+        return {
+            b.key_id: {
+                "requests_available": b.requests.tokens if b.requests else math.inf,
+                "tokens_available": b.tokens.tokens if b.tokens else math.inf,
+                "paused_for": max(0.0, b.paused_until - now),
+            }
+            for b in self._keys
+        }
+
+    def _budget(self, key_id: str) -> Optional[_KeyBudget]:
+        return next((b for b in self._keys if b.key_id == key_id), None)
+
+    def _try_grant(self, tokens: int, now: float) -> Optional[KeyGrant]:
+        ready = [b for b in self._keys if b.wait_time(tokens, now) <= 0]
+        if not ready:
+            return None
+        budget = max(ready, key=lambda b: b.headroom())
+        budget.take(tokens, now)
+        KEY_REQUESTS.inc(key=budget.key_id)
+        KEY_TOKENS.inc(tokens, key=budget.key_id)
+        return KeyGrant(budget.key_id, budget.api_key, tokens)
+
+    def _expected_wait(self, tokens: int, now: float, priority: Priority) -> float:
+        """Rough wait: time until the soonest key can afford this call, plus queued calls ahead of it."""
+        soonest = min(b.wait_time(tokens, now) for b in self._keys)
+        queued = sum(1 for w in self._waiters if w.priority <= priority and not w.future.done())
+        rates = [b.requests.rate for b in self._keys if b.requests]
+        return soonest + (queued / sum(rates) if rates else 0.0)
+
+    def _wake(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch(), name="model-quota-dispatcher")
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            head = self._waiters[0]
+            if head.future.done():
+                heapq.heappop(self._waiters)
+                continue
+            now = time.monotonic()
+            grant = self._try_grant(head.tokens, now)
+            if grant is not None:
+                heapq.heappop(self._waiters)
+                head.future.set_result(grant)
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), min(b.wait_time(head.tokens, now) for b in self._keys))
+            except asyncio.TimeoutError:
+                pass
+
+
+def current_priority() -> Priority:
+    """Lane that model calls made in the current context are scheduled in."""
+    return _priority.get()
+
+
+def estimate_tokens(prompt: str, output_tokens: int) -> int:
+    """Rough token cost of a call: ~4 characters per prompt token plus the expected output."""
+    return max(1, len(prompt) // 4) + output_tokens
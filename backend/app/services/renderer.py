@@ -0,0 +1,235 @@
+"""
+Offline placeholder renderer used while model image generation is
+unavailable, and as the load-testing / degraded-mode backend.
+
+The module only depends on Pillow (and the stdlib-only metrics module)
+so it can be imported cheaply by worker processes.
+"""
+import asyncio
+import multiprocessing
+import textwrap
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import IO, Any, Callable, Optional, Tuple
+import os
+import time
+
+from PIL import Image, ImageDraw, ImageFont, features
+
+from app.core.metrics import EXECUTOR_IN_FLIGHT, EXECUTOR_WAIT_SECONDS
+
+RGB = Tuple[int, int, int]
+# Gradient start colour and per-channel row divisors
+Palette = Tuple[RGB, RGB]
+TextLayout = Tuple[Tuple[int, int, str], ...]
+
+DEFAULT_SIZE = (512, 512)
+DEFAULT_PALETTE: Palette = ((30, 30, 50), (8, 12, 6))
+MAX_TEXT_LINES = 10
+LINE_HEIGHT = 20
+
+
+@lru_cache(maxsize=1)
+def _default_font() -> Optional[ImageFont.ImageFont]:
+    try:
+        return ImageFont.load_default()
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=32)
+def _gradient_background(width: int, height: int, palette: Palette) -> Image.Image:
+    """
+    Build the vertical gradient once per size and palette. A single
+    1-pixel column is filled and then stretched horizontally.
+    """
+    (r0, g0, b0), (dr, dg, db) = palette
+    column = bytearray()
+    for y in range(height):
+        column += bytes((
+            min(255, r0 + y // dr),
+            min(255, g0 + y // dg),
+            min(255, b0 + y // db),
+        ))
+    strip = Image.frombytes("RGB", (1, height), bytes(column))
+    return strip.resize((width, height), Image.NEAREST)
+
+
+@lru_cache(maxsize=1024)
+def _layout_text(prompt: str, width: int, height: int) -> TextLayout:
+    """Wrap the prompt and compute centred (x, y, line) positions."""
+    font = _default_font()
+    lines = textwrap.fill(prompt, width=40).split("\n")
+    y_start = height // 2 - (len(lines) * 15) // 2
+    layout = []
+    for i, line in enumerate(lines[:MAX_TEXT_LINES]):
+        if font is not None:
+            left, _, right, _ = font.getbbox(line)
+        else:
+            left, right = 0, len(line) * 6
+        x = (width - (right - left)) // 2
+        layout.append((x, y_start + i * LINE_HEIGHT, line))
+    return tuple(layout)
+
+
+def render_placeholder_png(
+    prompt: str,
+    width: int = DEFAULT_SIZE[0],
+    height: int = DEFAULT_SIZE[1],
+    palette: Palette = DEFAULT_PALETTE,
+) -> bytes:
+    """
+    Render the placeholder image for `prompt` and return it PNG-encoded.
+    Top-level and argument-picklable so it can run in a worker process.
+    """
+    img = _gradient_background(width, height, palette).copy()
+    draw = ImageDraw.Draw(img)
+    font = _default_font()
+    for x, y, line in _layout_text(prompt, width, height):
+        draw.text((x + 1, y + 1), line, fill=(0, 0, 0), font=font)  # Shadow
+        draw.text((x, y), line, fill=(255, 255, 255), font=font)  # Main text
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# Pillow save() format names and extra encoder options per output format
+_ENCODERS = {
+    "png": ("PNG", {}),
+    "webp": ("WEBP", {"method": 4}),
+    "jpeg": ("JPEG", {"optimize": True, "progressive": True}),
+    "avif": ("AVIF", {"speed": 8}),
+}
+
+
+def is_format_supported(fmt: str) -> bool:
+    """Return True if this Pillow build can encode `fmt`."""
+    if fmt in ("png", "jpeg"):
+        return True
+    return fmt in _ENCODERS and bool(features.check(fmt))
+
+
+def scaled_size(width: int, size: Tuple[int, int] = DEFAULT_SIZE) -> Tuple[int, int]:
+    """Return the (width, height) of a rendition `width` pixels wide, keeping the aspect ratio."""
+    return width, max(1, round(size[1] * width / size[0]))
+
+
+def encode_variant(master_png: bytes, fmt: str, width: int, quality: int) -> bytes:
+    """
+    Decode the master PNG once, resize it to `width` if needed and encode
+    it as `fmt`. Top-level and argument-picklable so it can run in a
+    worker process.
+    """
+    buffer = BytesIO()
+    write_variant(master_png, fmt, width, quality, buffer)
+    return buffer.getvalue()
+
+
+def write_variant(master_png: bytes, fmt: str, width: int, quality: int, fp: IO[bytes]) -> None:
+    """Like `encode_variant`, but write the encoded image to `fp` as it is produced."""
+    with Image.open(BytesIO(master_png)) as img:
+        img.load()
+        if img.width != width:
+            img = img.resize(scaled_size(width, img.size), Image.LANCZOS)
+        pil_format, options = _ENCODERS[fmt]
+        if fmt != "png":
+            options = {**options, "quality": quality}
+        img.convert("RGB").save(fp, format=pil_format, **options)
+
+
+def _write_to_pipe(master_png: bytes, fmt: str, width: int, quality: int, sink) -> None:
+    try:
+        write_variant(master_png, fmt, width, quality, sink)
+    except BaseException as e:
+        sink.fail(e)
+        raise
+    sink.finish()
+
+
+def _run_measured(submitted_at: float, func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """Run `func` and return its result with the time it spent queued (wall clock, so valid across processes)."""
+    waited = time.time() - submitted_at
+    return func(*args), waited
+
+
+class PlaceholderRenderer:
+    """
+    Runs placeholder renders off the event loop: on the default thread
+    pool, on a dedicated pool of `thread_workers` threads, or, when
+    `process_workers` > 0, on a process pool so PNG encoding scales
+    across cores.
+    """
+
+    def __init__(self, process_workers: int = 0, thread_workers: int = 0):
+        self._process_workers = process_workers
+        self._thread_workers = thread_workers
+        self._executor: Optional[Executor] = None
+        self._stream_executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self._executor is None:
+            if self._process_workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            elif self._thread_workers > 0:
+                self._executor = ThreadPoolExecutor(max_workers=self._thread_workers, thread_name_prefix="render")
+        return self._executor
+
+    async def render(self, prompt: str) -> bytes:
+        return await self._run(render_placeholder_png, prompt)
+
+    async def encode(self, master_png: bytes, fmt: str, width: int, quality: int) -> bytes:
+        """Derive one rendition of a rendered master; see `encode_variant`."""
+        return await self._run(encode_variant, master_png, fmt, width, quality)
+
+    async def encode_to(self, master_png: bytes, fmt: str, width: int, quality: int, sink) -> None:
+        """
+        Encode one rendition into `sink` (a BoundedPipe), finishing it on
+        success and failing it on error so its consumer never hangs.
+
+        Runs on a dedicated thread pool: the encoder blocks whenever the
+        pipe is full, and must not hold a default-pool thread that the
+        upload consuming the pipe may be waiting for.
+        """
+        if self._stream_executor is None:
+            self._stream_executor = ThreadPoolExecutor(
+                max_workers=self.capacity, thread_name_prefix="stream-encode"
+            )
+        loop = asyncio.get_running_loop()
+        with EXECUTOR_IN_FLIGHT.track_inprogress(executor="stream_encode"):
+            _, waited = await loop.run_in_executor(
+                self._stream_executor, _run_measured, time.time(), _write_to_pipe,
+                master_png, fmt, width, quality, sink,
+            )
+        EXECUTOR_WAIT_SECONDS.observe(max(0.0, waited), executor="stream_encode")
+
+    @property
+    def capacity(self) -> int:
+        """Number of workers that can render at once."""
+        if self._process_workers > 0:
+            return self._process_workers
+        if self._thread_workers > 0:
+            return self._thread_workers
+        return min(32, (os.cpu_count() or 1) + 4)  # asyncio.to_thread's default pool size
+
+    async def _run(self, func, *args):
+        executor = self._get_executor()
+        with EXECUTOR_IN_FLIGHT.track_inprogress(executor="render"):
+            if executor is None:
+                result, waited = await asyncio.to_thread(_run_measured, time.time(), func, *args)
+            else:
+                loop = asyncio.get_running_loop()
+                result, waited = await loop.run_in_executor(executor, _run_measured, time.time(), func, *args)
+        EXECUTOR_WAIT_SECONDS.observe(max(0.0, waited), executor="render")
+        return result
+
+    def shutdown(self) -> None:
+        if self._stream_executor is not None:
+            self._stream_executor.shutdown(wait=True, cancel_futures=True)
+            self._stream_executor = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,190 @@
+"""
+Retry, timeout and circuit-breaker policies for outbound dependencies.
+
+A `ResiliencePolicy` wraps every call to one dependency (the model, the
+object store): each attempt gets a deadline, failed idempotent calls
+are retried with full-jitter exponential backoff, and a circuit breaker
+fails calls fast once the dependency keeps failing, letting a single
+probe through after `recovery_seconds` to detect recovery.
+
+Deadlines bound how long a request waits, not how long a blocking
+client call keeps its worker thread; client-level timeouts still apply
+there. The breaker is what keeps a dead dependency from occupying every
+executor thread: once open, calls no longer reach it.
+"""
+import asyncio
+import enum
+import math
+import random
+import time
+from typing import Awaitable, Callable, Optional, Tuple, Type, TypeVar
+
+from app.core.metrics import REGISTRY
+from app.services.limiter import LimitExceededError
+
+T = TypeVar("T")
+
+ATTEMPTS = REGISTRY.counter(
+    "dependency_attempts_total", "Calls to a dependency by outcome (ok, error, timeout).", ["dependency", "outcome"]
+)
+RETRIES = REGISTRY.counter("dependency_retries_total", "Calls to a dependency that were retried.", ["dependency"])
+CIRCUIT_STATE = REGISTRY.gauge(
+    "circuit_breaker_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open.", ["dependency"]
+)
+CIRCUIT_OPENED = REGISTRY.counter("circuit_breaker_opened_total", "Times a circuit breaker opened.", ["dependency"])
+CIRCUIT_REJECTED = REGISTRY.counter(
+    "circuit_breaker_rejected_total", "Calls failed fast by an open circuit breaker.", ["dependency"]
+)
+
+
+class CircuitState(enum.IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitOpenError(LimitExceededError):
+    """Raised when a call is failed fast because its dependency's circuit is open."""
+
+    def __init__(self, name: str, retry_after: int):
+        Exception.__init__(self, f"{name} is unavailable, retry in {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker. Opens after `failure_threshold`
+    failures in a row; after `recovery_seconds` one probe call is let
+    through, which closes the circuit on success or reopens it on failure.
+    Use from a single event loop.
+    """
+
+    def __init__(self, name: str, *, failure_threshold: int = 5, recovery_seconds: float = 10.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        CIRCUIT_STATE.set(CircuitState.CLOSED, dependency=name)
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+            self._set_state(CircuitState.HALF_OPEN)
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a
+                probe already in flight.
+        """
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return
+        if state == CircuitState.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        CIRCUIT_REJECTED.inc(dependency=self.name)
+        remaining = self.recovery_seconds - (time.monotonic() - self._opened_at)
+        raise CircuitOpenError(self.name, max(1, math.ceil(remaining)))
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probing = False
+        if self._state != CircuitState.CLOSED:
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probing = False
+        if self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != CircuitState.OPEN:
+                CIRCUIT_OPENED.inc(dependency=self.name)
+            self._opened_at = time.monotonic()
+            self._set_state(CircuitState.OPEN)
+
+    def record_ignored(self) -> None:
+        """Release a probe whose outcome says nothing about the dependency's health."""
+        self._probing = False
+
+    def _set_state(self, state: CircuitState) -> None:
+        self._state = state
+        CIRCUIT_STATE.set(state, dependency=self.name)
+
+
+class ResiliencePolicy:
+    """
+    Deadline, retry and circuit-breaker policy for one dependency.
+
+    Exceptions in `non_retryable` (e.g. "object not found") are answers,
+    not failures: they are raised straight away and do not count against
+    the breaker. Limiter rejections and cancellation are never retried.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        timeout_seconds: Optional[float] = None,
+        max_attempts: int = 1,
+        backoff_base: float = 0.1,
+        backoff_max: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        non_retryable: Tuple[Type[BaseException], ...] = (),
+        seed: Optional[int] = None,
+    ):
+        self.name = name
+        self.timeout_seconds = timeout_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.non_retryable = (LimitExceededError, *non_retryable)
+        self._random = random.Random(seed)
+
+    async def call(self, func: Callable[[], Awaitable[T]], *, idempotent: bool = True) -> T:
+        """
+        Run `func()` under the policy. `func` must return a fresh awaitable
+        on every call. Calls that are not idempotent are attempted once.
+
+        Raises:
+            CircuitOpenError: If the dependency's circuit is open.
+            asyncio.TimeoutError: If the last attempt ran past its deadline.
+        """
+        attempts = self.max_attempts if idempotent else 1
+        for attempt in range(1, attempts + 1):
+            if self.breaker is not None:
+                self.breaker.before_call()
+            try:
+                result = await asyncio.wait_for(func(), self.timeout_seconds)
+            except self.non_retryable:
+                if self.breaker is not None:
+                    self.breaker.record_ignored()
+                raise
+            except asyncio.CancelledError:
+                if self.breaker is not None:
+                    self.breaker.record_ignored()
+                raise
+            except Exception as e:
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                ATTEMPTS.inc(dependency=self.name, outcome="timeout" if timed_out else "error")
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                if attempt == attempts:
+                    raise
+                RETRIES.inc(dependency=self.name)
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            ATTEMPTS.inc(dependency=self.name, outcome="ok")
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return result
+        raise AssertionError("unreachable")
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max, base * 2^(attempt-1))]."""
+        return self._random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
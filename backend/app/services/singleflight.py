@@ -0,0 +1,51 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call(Generic[T]):
+    task: "asyncio.Future[T]"
+    waiters: int = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent calls that share a key into one in-progress task.
+
+    Every caller awaits the same task and receives the same result (or
+    exception). A caller being cancelled only detaches that caller; the
+    shared task is cancelled once its last waiter has gone away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call[T]] = {}
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn()` for `key`, or join the call already running for it."""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call[T]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
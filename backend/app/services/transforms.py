@@ -0,0 +1,201 @@
+"""
+On-demand renditions of stored images.
+
+A derived image (a given width and format of a generation's master) is
+produced on first request: the master is fetched from object storage,
+resized and transcoded on the renderer's executor, written back to the
+bucket for later cold starts, and kept in a bounded in-memory LRU of
+hot variants.
+"""
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, Optional, Set, Union
+import hashlib
+import logging
+import posixpath
+import threading
+
+from app.models.generation import ImageGeneration, OutputFormat
+from app.services.renderer import PlaceholderRenderer
+from app.services.resilience import ResiliencePolicy
+from app.services.singleflight import SingleFlight
+from app.storage_providers.base import (
+    AsyncBaseStorageProvider,
+    BaseStorageProvider,
+    ObjectNotFoundError,
+    call_storage,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ImageNotAvailableError(Exception):
+    """Raised when a generation has no stored image to derive from."""
+
+
+@dataclass(frozen=True)
+class DerivedImage:
+    """An encoded rendition, ready to be sent to a client."""
+    data: bytes
+    content_type: str
+    etag: str
+
+
+def derived_object_name(master_object_name: str, width: int, fmt: OutputFormat, quality: int) -> str:
+    """Object name under which a derived rendition is written back."""
+    stem = posixpath.splitext(master_object_name)[0]
+    return f"{stem}_{width}w_q{quality}.{fmt.value}"
+
+
+class DerivedImageCache:
+    """
+    LRU of derived image bytes, bounded by entry count and total size.
+    Entries larger than the byte budget are not cached.
+    """
+
+    def __init__(self, *, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, DerivedImage]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[DerivedImage]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, image: DerivedImage) -> None:
+        if len(image.data) > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key).data)
+            self._entries[key] = image
+            self._bytes += len(image.data)
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._bytes -= len(oldest.data)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class ImageTransformService:
+    """
+    Serves resized / transcoded renditions of completed generations.
+
+    Lookups go hot cache -> stored rendition -> transform of the master.
+    Concurrent requests for the same rendition share one transform.
+    """
+
+    def __init__(
+        self,
+        storage_provider: Union[BaseStorageProvider, AsyncBaseStorageProvider],
+        renderer: PlaceholderRenderer,
+        bucket: str,
+        *,
+        cache: Optional[DerivedImageCache] = None,
+        write_back: bool = True,
+        storage_policy: Optional[ResiliencePolicy] = None,
+    ):
+        self.storage_provider = storage_provider
+        self.renderer = renderer
+        self.bucket = bucket
+        self.cache = cache or DerivedImageCache()
+        self.write_back = write_back
+        self.storage_policy = storage_policy
+        self._single_flight: SingleFlight[DerivedImage] = SingleFlight()
+        self._write_backs: Set[asyncio.Task] = set()
+
+    async def drain(self) -> None:
+        """Wait for pending write-backs to finish."""
+        if self._write_backs:
+            await asyncio.gather(*self._write_backs, return_exceptions=True)
+
+    async def get_image(
+        self, generation: ImageGeneration, *, width: int, fmt: OutputFormat, quality: int
+    ) -> DerivedImage:
+        """
+        Return the rendition of `generation` at `width` pixels in `fmt`.
+
+        Raises:
+            ImageNotAvailableError: If the generation has no stored master.
+        """
+        if not generation.variants:
+            raise ImageNotAvailableError(f"Generation '{generation.generation_id}' has no stored image")
+        master = generation.variants[0]
+        if width == master.width and fmt == master.format:
+            object_name = master.object_name  # Served as stored, never re-encoded
+        else:
+            object_name = derived_object_name(master.object_name, width, fmt, quality)
+
+        image = self.cache.get(object_name)
+        if image is not None:
+            return image
+        return await self._single_flight.do(
+            object_name, lambda: self._load(master.object_name, object_name, width, fmt, quality)
+        )
+
+    async def _load(
+        self, master_object_name: str, object_name: str, width: int, fmt: OutputFormat, quality: int
+    ) -> DerivedImage:
+        try:
+            data = await self._call_storage("download", self.bucket, object_name)
+        except ObjectNotFoundError:
+            data = await self._transform(master_object_name, object_name, width, fmt, quality)
+        image = DerivedImage(data, fmt.content_type, f'"{hashlib.sha256(data).hexdigest()[:32]}"')
+        self.cache.put(object_name, image)
+        return image
+
+    async def _transform(
+        self, master_object_name: str, object_name: str, width: int, fmt: OutputFormat, quality: int
+    ) -> bytes:
+        try:
+            master = await self._call_storage("download", self.bucket, master_object_name)
+        except ObjectNotFoundError as e:
+            raise ImageNotAvailableError(f"Stored image '{master_object_name}' is missing") from e
+        data = await self.renderer.encode(master, fmt.value, width, quality)
+        logger.info("transforms.derived", extra={"object_name": object_name, "size_bytes": len(data)})
+        if self.write_back:
+            task = asyncio.create_task(self._store(object_name, data, fmt))
+            self._write_backs.add(task)
+            task.add_done_callback(self._write_backs.discard)
+        return data
+
+    async def _store(self, object_name: str, data: bytes, fmt: OutputFormat) -> None:
+        try:
+            await self._call_storage(
+                "upload",
+                file_object=BytesIO(data),
+                bucket=self.bucket,
+                object_name=object_name,
+                content_type=fmt.content_type,
+            )
+        except Exception:
+            logger.exception("transforms.write_back_failed", extra={"object_name": object_name})
+
+    async def _call_storage(self, method: str, *args, **kwargs):
+        if self.storage_policy is None:
+            return await call_storage(self.storage_provider, method, *args, **kwargs)
+        return await self.storage_policy.call(
+            lambda: call_storage(self.storage_provider, method, *args, **kwargs)
+        )
@@ -0,0 +1,484 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import logging
+import os
+import socket
+import time
+
+from app.core.metrics import REGISTRY
+from app.job_queues.base import BaseJobQueue, Job, JobState
+from app.job_queues.memory import InMemoryJobQueue
+from app.models.generation import GenerationStatus, ImageGeneration, OutputOptions
+from app.services.generator import GeneratorService
+from app.services.idempotency import IdempotencyKeyReusedError
+from app.services.limiter import LimitExceededError, admission_wait
+from app.services.rate_limiter import Priority, priority_lane
+
+logger = logging.getLogger(__name__)
+
+JOBS = REGISTRY.counter(
+    "generation_jobs_total",
+    "Background generation jobs settled by outcome (completed, retried, dead_lettered, skipped, lease_lost).",
+    ["outcome"],
+)
+
+# Longest delay between retries of a failing job
+MAX_RETRY_BACKOFF_SECONDS = 300.0
+# How often finished jobs past their retention are purged
+PURGE_INTERVAL_SECONDS = 60.0
+# A worker's heartbeat goes stale after this many missed intervals
+HEARTBEAT_TTL_INTERVALS = 3
+# How often a request waiting on an externally run generation checks on it
+WAIT_POLL_SECONDS = 0.1
+
+
+class QueueFullError(Exception):
+    """Raised when the generation queue cannot accept more work."""
+
+
+class GenerationWorkerPool:
+    """
+    Worker pool for background image generation, fed by a job queue.
+
+    Requests enqueue a job and return the pending generation immediately;
+    `concurrency` worker tasks lease jobs from the queue and run them
+    through the GeneratorService, which records each status transition in
+    its generation repository. With a durable queue, several processes
+    can share the same queue, and a job whose worker died is leased again
+    once its lease expires.
+
+    A job that raises is retried with exponential backoff and moved to
+    the dead-letter set, with its generation marked failed, once
+    `max_attempts` is spent. Attempts are counted per lease, so a job
+    that keeps crashing its worker is dead-lettered too.
+
+    With `consume=False` the pool only enqueues (an API process whose
+    jobs run in `python -m app.worker` processes). Consuming pools
+    publish a heartbeat with their throughput every `heartbeat_interval`
+    seconds.
+    """
+
+    def __init__(
+        self,
+        service_factory: Callable[[], GeneratorService],
+        *,
+        concurrency: int,
+        max_queue_size: int,
+        admission_wait_seconds: float = 30.0,
+        job_queue: Optional[BaseJobQueue] = None,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 5.0,
+        poll_interval: float = 0.5,
+        retention_seconds: float = 86400.0,
+        consume: bool = True,
+        heartbeat_interval: float = 10.0,
+    ):
+        self._service_factory = service_factory
+        self._service: Optional[GeneratorService] = None
+        self._concurrency = max(1, concurrency)
+        self._max_queue_size = max_queue_size
+        self.job_queue = job_queue or InMemoryJobQueue()
+        self._lease_seconds = lease_seconds
+        self._max_attempts = max(1, max_attempts)
+        self._retry_backoff_seconds = retry_backoff_seconds
+        self._poll_interval = poll_interval
+        self._retention_seconds = retention_seconds
+        self.consume = consume
+        self._heartbeat_interval = heartbeat_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._workers: List[asyncio.Task] = []
+        self._housekeeper: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._started_at = time.time()
+        self._in_flight = 0
+        self._outcomes: Dict[str, int] = {}
+        # Set on local submissions so idle workers do not wait for the next poll
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        # Queued jobs wait for limiter capacity rather than being shed
+        self._admission_wait_seconds = admission_wait_seconds
+
+    @property
+    def service(self) -> GeneratorService:
+        """Resolve the generator service on first use."""
+        if self._service is None:
+            self._service = self._service_factory()
+        return self._service
+
+    @property
+    def queue_depth(self) -> int:
+        return self.job_queue.depth()
+
+    async def start(self) -> None:
+        """Spawn the worker tasks on the running event loop."""
+        if self._housekeeper is not None:
+            return
+        self._closing = False
+        self._started_at = time.time()
+        self._housekeeper = asyncio.create_task(self._purge_loop(), name="generation-job-purge")
+        if self.consume:
+            self._workers = [
+                asyncio.create_task(self._worker(i), name=f"generation-worker-{i}")
+                for i in range(self._concurrency)
+            ]
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop(), name="generation-worker-heartbeat")
+        logger.info(
+            "worker_pool.started",
+            extra={
+                "concurrency": self._concurrency if self.consume else 0,
+                "worker_id": self.worker_id,
+                "durable": self.job_queue.durable,
+            },
+        )
+
+    async def stop(self, *, drain: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Stop the workers. With `drain`, running jobs are finished first,
+        and so are queued ones unless the queue is durable (they stay
+        queued for the next worker). Jobs still running after `timeout`
+        seconds, or right away without `drain`, are cancelled; a durable
+        queue hands them out again once their leases expire.
+        """
+        for task in (self._housekeeper, self._heartbeat):
+            if task is not None:
+                task.cancel()
+        self._closing = True
+        self._wakeup.set()
+        if self._workers:
+            if drain:
+                logger.info("worker_pool.draining", extra={"in_flight": self._in_flight})
+                _, pending = await asyncio.wait(self._workers, timeout=timeout)
+            else:
+                pending = set(self._workers)
+            for worker in pending:
+                worker.cancel()
+            if pending:
+                logger.warning("worker_pool.drain_timed_out", extra={"cancelled": len(pending)})
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        await asyncio.gather(
+            *(t for t in (self._housekeeper, self._heartbeat) if t is not None), return_exceptions=True
+        )
+        if self._heartbeat is not None:
+            try:
+                await asyncio.to_thread(self.job_queue.remove_heartbeat, self.worker_id)
+            except Exception:
+                logger.exception("worker_pool.heartbeat_failed")
+        self._housekeeper = self._heartbeat = None
+        self._workers = []
+        logger.info("worker_pool.stopped", extra=self.stats())
+
+    def stats(self) -> Dict[str, Any]:
+        """Liveness and throughput of this pool, as published in its heartbeat."""
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self._concurrency if self.consume else 0,
+            "in_flight": self._in_flight,
+            "started_at": self._started_at,
+            "uptime_seconds": round(time.time() - self._started_at, 3),
+            "jobs": dict(sorted(self._outcomes.items())),
+        }
+
+    async def submit(
+        self,
+        prompt: str,
+        output: Optional[OutputOptions] = None,
+        *,
+        idempotency_key: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+    ) -> ImageGeneration:
+        """
+        Enqueue a generation and return its pending record. A repeated
+        `idempotency_key` returns the generation of the original job,
+        which is queued again if it was dead-lettered. `fingerprint`
+        identifies the request the key was first sent with.
+
+        Raises:
+            QueueFullError: If the queue is at capacity.
+            IdempotencyKeyReusedError: If the key was sent with a request
+                of another fingerprint, by this or any other process.
+        """
+        if await asyncio.to_thread(self.job_queue.depth) >= self._max_queue_size:
+            raise QueueFullError("Generation queue is full, retry later")
+        generation = self.service.create_generation(prompt, output, persist=False)
+        payload = _to_payload(generation)
+        if fingerprint is not None:
+            payload["fingerprint"] = fingerprint
+        job, created = await asyncio.to_thread(
+            self.job_queue.enqueue,
+            payload,
+            idempotency_key=idempotency_key,
+            max_attempts=self._max_attempts,
+        )
+        if not created:
+            return await self._resubmitted(job, idempotency_key, fingerprint)
+        await asyncio.to_thread(self.service.persist, generation)
+        self._wakeup.set()
+        return generation
+
+    async def _resubmitted(
+        self, job: Job, idempotency_key: Optional[str], fingerprint: Optional[str]
+    ) -> ImageGeneration:
+        """
+        The generation of a job submitted again under its idempotency key.
+        A retry of a request that was given up on runs it again rather
+        than getting the failure back until the key expires.
+        """
+        if fingerprint is not None and job.payload.get("fingerprint", fingerprint) != fingerprint:
+            raise IdempotencyKeyReusedError(
+                f"Idempotency key '{idempotency_key}' was already used for a different request"
+            )
+        generation = await self._generation_for(job)
+        if job.state == JobState.DEAD and await asyncio.to_thread(self.job_queue.requeue, job.job_id):
+            generation.mark_as_pending()
+            await asyncio.to_thread(self.service.persist, generation)
+            logger.info(
+                "worker_pool.job_resubmitted",
+                extra={"job_id": job.job_id, "generation_id": generation.generation_id},
+            )
+            self._wakeup.set()
+        return generation
+
+    async def wait_for(self, generation_id: str, timeout: float) -> Optional[ImageGeneration]:
+        """
+        Wait up to `timeout` seconds for a generation run by another
+        process to complete or fail, polling the shared repository.
+        Returns its latest state, which is not terminal on timeout.
+        """
+        repository = self.service.repository
+        deadline = time.monotonic() + timeout
+        while True:
+            generation = await asyncio.to_thread(repository.get, generation_id) if repository is not None else None
+            if generation is not None and generation.status.is_terminal:
+                return generation
+            if time.monotonic() >= deadline:
+                return generation
+            await asyncio.sleep(WAIT_POLL_SECONDS)
+
+    async def run_batch(
+        self,
+        prompts: List[str],
+        outputs: Sequence[Optional[OutputOptions]],
+        *,
+        timeout: float,
+    ) -> List[Union[ImageGeneration, Exception]]:
+        """
+        Enqueue a batch for other processes to run and wait up to
+        `timeout` seconds for it, like `GeneratorService.generate_batch`.
+        Identical items are enqueued once. Entries still running at the
+        deadline are returned in their current, non-terminal state.
+        """
+        deadline = time.monotonic() + timeout
+        keys = [(p, (o or OutputOptions()).model_dump_json()) for p, o in zip(prompts, outputs)]
+        unique: Dict[Tuple[str, str], Optional[OutputOptions]] = {}
+        for key, output in zip(keys, outputs):
+            unique.setdefault(key, output)
+
+        async def run(prompt: str, output: Optional[OutputOptions]) -> ImageGeneration:
+            generation = await self.submit(prompt, output)
+            finished = await self.wait_for(generation.generation_id, max(0.0, deadline - time.monotonic()))
+            return finished or generation
+
+        outcomes = await asyncio.gather(
+            *(run(prompt, output) for (prompt, _), output in unique.items()), return_exceptions=True
+        )
+        by_key = dict(zip(unique, outcomes))
+        return [by_key[k] for k in keys]
+
+    async def heartbeats(self) -> List[Dict[str, Any]]:
+        """Latest stats of every live consuming pool, in any process."""
+        return await asyncio.to_thread(self.job_queue.heartbeats)
+
+    async def dead_letters(self, limit: int = 50) -> List[Job]:
+        """Jobs given up on after exhausting their attempts, most recent first."""
+        return await asyncio.to_thread(self.job_queue.dead_letters, limit)
+
+    async def requeue(self, job_id: str) -> bool:
+        """Queue a dead-lettered job again; False if there is no such job."""
+        if not await asyncio.to_thread(self.job_queue.requeue, job_id):
+            return False
+        logger.info("worker_pool.job_requeued", extra={"job_id": job_id})
+        self._wakeup.set()
+        return True
+
+    async def _worker(self, index: int) -> None:
+        worker_id = f"{self.worker_id}:{index}"
+        while True:
+            if self._closing and self.job_queue.durable:
+                return
+            try:
+                jobs = await asyncio.to_thread(
+                    self.job_queue.lease, worker_id, lease_seconds=self._lease_seconds, limit=1
+                )
+            except Exception:
+                logger.exception("worker_pool.lease_failed", extra={"worker": index})
+                jobs = []
+            if not jobs:
+                if self._closing:
+                    return
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            try:
+                await self._run_job(jobs[0], index)
+            except Exception:
+                # Keep the worker alive; the job comes back once its lease expires
+                logger.exception("worker_pool.job_crashed", extra={"worker": index, "job_id": jobs[0].job_id})
+
+    async def _run_job(self, job: Job, index: int) -> None:
+        generation = await self._generation_for(job)
+        log_extra = {"worker": index, "job_id": job.job_id, "generation_id": generation.generation_id}
+        if generation.status == GenerationStatus.COMPLETED:
+            # Finished by a worker that died before acknowledging the job
+            await self._settle(self.job_queue.ack, job, "skipped", log_extra)
+            return
+        if job.exhausted:
+            logger.error("worker_pool.job_abandoned", extra={**log_extra, "attempts": job.attempts})
+            await self._give_up(job, generation, f"Abandoned after {job.max_attempts} attempts", log_extra)
+            return
+
+        renewal = asyncio.create_task(self._keep_leased(job, log_extra))
+        self._in_flight += 1
+        failure = None
+        retry_after = None
+        try:
+            with admission_wait(self._admission_wait_seconds), priority_lane(Priority.BACKGROUND):
+                await self.service.run_generation(generation)
+            if generation.status == GenerationStatus.FAILED:
+                # Model and upload failures are recorded on the generation, not raised
+                failure = generation.failure_reason or "Image generation failed"
+                logger.warning("worker_pool.job_failed", extra={**log_extra, "attempt": job.attempts, "reason": failure})
+        except LimitExceededError as e:
+            # Shed under load, or a dependency's circuit is open: both are transient,
+            # so retry once the limiter's hint has elapsed
+            logger.warning(
+                "worker_pool.job_shed",
+                extra={**log_extra, "attempt": job.attempts, "retry_after": e.retry_after},
+            )
+            failure = generation.failure_reason or f"Shed under load: {str(e)}"
+            retry_after = e.retry_after
+        except Exception as e:
+            logger.exception("worker_pool.job_failed", extra={**log_extra, "attempt": job.attempts})
+            failure = f"Unexpected error during image generation: {str(e)}"
+        finally:
+            renewal.cancel()
+            self._in_flight -= 1
+        if failure is not None:
+            await self._fail(job, generation, failure, log_extra, delay_seconds=retry_after)
+            return
+        await self._settle(self.job_queue.ack, job, "completed", log_extra)
+
+    async def _fail(
+        self,
+        job: Job,
+        generation: ImageGeneration,
+        reason: str,
+        log_extra: dict,
+        *,
+        delay_seconds: Optional[float] = None,
+    ) -> None:
+        """
+        Retry a failed job after `delay_seconds` (exponential backoff by
+        default), or dead-letter it once its attempts are spent.
+        """
+        if job.attempts >= job.max_attempts:
+            await self._give_up(job, generation, reason, log_extra)
+            return
+        generation.mark_as_pending()
+        await asyncio.to_thread(self.service.persist, generation)
+        delay = delay_seconds
+        if delay is None:
+            delay = min(MAX_RETRY_BACKOFF_SECONDS, self._retry_backoff_seconds * 2 ** (job.attempts - 1))
+        await self._settle(self.job_queue.retry, job, "retried", log_extra, reason, delay_seconds=delay)
+
+    async def _give_up(self, job: Job, generation: ImageGeneration, reason: str, log_extra: dict) -> None:
+        generation.mark_as_failed(reason)
+        await asyncio.to_thread(self.service.persist, generation)
+        await self._settle(self.job_queue.dead_letter, job, "dead_lettered", log_extra, reason)
+
+    async def _settle(self, settle: Callable[..., bool], job: Job, outcome: str, log_extra: dict, *args, **kwargs) -> None:
+        try:
+            settled = await asyncio.to_thread(settle, job, *args, **kwargs)
+        except Exception:
+            # The lease expires and the job is retried elsewhere
+            logger.exception("worker_pool.settle_failed", extra={**log_extra, "outcome": outcome})
+            return
+        if not settled:
+            logger.warning("worker_pool.lease_lost", extra={**log_extra, "outcome": outcome})
+            outcome = "lease_lost"
+        JOBS.inc(outcome=outcome)
+        self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+
+    async def _keep_leased(self, job: Job, log_extra: dict) -> None:
+        """Renew the job's lease while it runs, so it is not handed to another worker."""
+        while True:
+            await asyncio.sleep(self._lease_seconds / 3)
+            try:
+                if not await asyncio.to_thread(self.job_queue.extend, job, self._lease_seconds):
+                    logger.warning("worker_pool.lease_lost", extra=log_extra)
+                    return
+            except Exception:
+                logger.exception("worker_pool.lease_renewal_failed", extra=log_extra)
+
+    async def _heartbeat_loop(self) -> None:
+        """Publish this pool's stats to the queue and log its throughput."""
+        last_settled, last_at = 0, time.monotonic()
+        while True:
+            stats = self.stats()
+            settled = sum(self._outcomes.values())
+            now = time.monotonic()
+            stats["jobs_per_second"] = round((settled - last_settled) / max(1e-9, now - last_at), 3)
+            last_settled, last_at = settled, now
+            try:
+                await asyncio.to_thread(
+                    self.job_queue.record_heartbeat,
+                    self.worker_id,
+                    {**stats, "last_seen": time.time()},
+                    ttl_seconds=self._heartbeat_interval * HEARTBEAT_TTL_INTERVALS,
+                )
+            except Exception:
+                logger.exception("worker_pool.heartbeat_failed")
+            logger.info("worker_pool.heartbeat", extra=stats)
+            await asyncio.sleep(self._heartbeat_interval)
+
+    async def _purge_loop(self) -> None:
+        while True:
+            await asyncio.sleep(PURGE_INTERVAL_SECONDS)
+            try:
+                purged = await asyncio.to_thread(self.job_queue.purge, time.time() - self._retention_seconds)
+                if purged:
+                    logger.info("worker_pool.jobs_purged", extra={"count": purged})
+            except Exception:
+                logger.exception("worker_pool.purge_failed")
+
+    async def _generation_for(self, job: Job) -> ImageGeneration:
+        """
+        The job's generation record, rebuilt from the job payload if the
+        repository lost it (e.g. an in-memory store in a restarted process).
+        """
+        payload = job.payload
+        repository = self.service.repository
+        generation = None
+        if repository is not None:
+            generation = await asyncio.to_thread(repository.get, payload["generation_id"])
+        if generation is None:
+            generation = ImageGeneration(
+                generation_id=payload["generation_id"],
+                prompt=payload["prompt"],
+                output=OutputOptions.model_validate(payload["output"]),
+                created_at=datetime.fromisoformat(payload["created_at"]),
+            )
+        return generation
+
+
+def _to_payload(generation: ImageGeneration) -> dict:
+    return {
+        "generation_id": generation.generation_id,
+        "prompt": generation.prompt,
+        "output": generation.output.model_dump(mode="json"),
+        "created_at": generation.created_at.isoformat(),
+    }
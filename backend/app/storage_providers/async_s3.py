@@ -0,0 +1,386 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, IO, List, Optional, Tuple, Union
+from urllib.parse import quote
+from xml.etree import ElementTree
+import hashlib
+import hmac
+import logging
+
+import httpx
+
+from .base import AsyncBaseStorageProvider, ObjectNotFoundError
+from .url_cache import PresignedUrlCache
+
+logger = logging.getLogger(__name__)
+
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+_STREAM_CHUNK_SIZE = 256 * 1024
+_S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+
+class AsyncS3StorageProvider(AsyncBaseStorageProvider):
+    """
+    Native asyncio storage provider for S3-compatible services (MinIO, AWS
+    S3, or a local stand-in such as moto_server).
+
+    Requests go through one shared httpx connection pool with keep-alive
+    and are signed with AWS Signature V4 (path-style addressing). Objects
+    larger than `multipart_threshold` are uploaded as a multipart upload
+    with up to `max_part_concurrency` parts in flight.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        access_key: str,
+        secret_key: str,
+        *,
+        secure: bool = True,
+        region: str = "us-east-1",
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout_seconds: float = 30.0,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        part_size: int = 8 * 1024 * 1024,
+        max_part_concurrency: int = 4,
+        url_cache: Optional[PresignedUrlCache] = None,
+    ):
+        self.endpoint = endpoint.rstrip("/")
+        self.url_cache = url_cache or PresignedUrlCache()
+        self.secure = secure
+        self.region = region
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._multipart_threshold = multipart_threshold
+        self._part_size = max(part_size, 5 * 1024 * 1024)  # S3 minimum for non-final parts
+        self._max_part_concurrency = max(1, max_part_concurrency)
+        self._signing_keys: Dict[str, bytes] = {}
+        self.client = httpx.AsyncClient(
+            base_url=f"{'https' if secure else 'http'}://{self.endpoint}",
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout_seconds,
+        )
+
+    async def ensure_bucket(self, bucket: str) -> None:
+        """Create the bucket if it doesn't already exist."""
+        response = await self._request("HEAD", bucket)
+        if response.status_code == 404:
+            response = await self._request("PUT", bucket)
+        response.raise_for_status()
+
+    async def upload(
+        self, file_object: IO[bytes], bucket: str, object_name: str, *, content_type: Optional[str] = None
+    ) -> str:
+        """Upload a file-like object and return an access URL."""
+        data = _read_payload(file_object)
+        content_type = content_type or "image/png"
+        try:
+            if len(data) <= self._multipart_threshold:
+                response = await self._request(
+                    "PUT", bucket, object_name, content=data, headers={"Content-Type": content_type}
+                )
+                response.raise_for_status()
+            else:
+                await self._multipart_upload(data, bucket, object_name, content_type)
+            return self.get_public_url(bucket, object_name)
+        except httpx.HTTPError:
+            logger.exception(
+                "async_s3.upload_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+
+    async def upload_stream(
+        self, stream: IO[bytes], bucket: str, object_name: str, *, content_type: Optional[str] = None
+    ) -> str:
+        """
+        Upload a blocking stream of unknown length. A stream that ends
+        within one part is sent with a single PUT; otherwise parts are
+        uploaded as they fill, holding at most `max_part_concurrency` + 1
+        parts in memory.
+        """
+        content_type = content_type or "image/png"
+        try:
+            first = await asyncio.to_thread(_read_exactly, stream, self._part_size)
+            if len(first) < self._part_size:
+                response = await self._request(
+                    "PUT", bucket, object_name, content=memoryview(first), headers={"Content-Type": content_type}
+                )
+                response.raise_for_status()
+            else:
+                await self._upload_parts(self._stream_parts(first, stream), bucket, object_name, content_type)
+            return self.get_public_url(bucket, object_name)
+        except httpx.HTTPError:
+            logger.exception(
+                "async_s3.upload_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+
+    async def _stream_parts(self, first: bytes, stream: IO[bytes]) -> AsyncIterator[memoryview]:
+        part = first
+        while part:
+            yield memoryview(part)
+            part = await asyncio.to_thread(_read_exactly, stream, self._part_size)
+
+    def get_public_url(self, bucket: str, object_name: str, *, expires_seconds: Optional[int] = None) -> str:
+        """
+        Construct a URL for the object.
+        - If expires_seconds is provided, return a presigned URL.
+        - Otherwise, construct a direct URL (assumes public bucket).
+        """
+        protocol = "https" if self.secure else "http"
+        path = _object_path(bucket, object_name)
+        if not expires_seconds:
+            return f"{protocol}://{self.endpoint}{path}"
+        return self.url_cache.get_or_sign(
+            bucket, object_name, expires_seconds, lambda: self._presign(path, expires_seconds)
+        )
+
+    def _presign(self, path: str, expires_seconds: int) -> str:
+        protocol = "https" if self.secure else "http"
+        amz_date, datestamp = _timestamps()
+        scope = f"{datestamp}/{self.region}/s3/aws4_request"
+        query = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self._access_key}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires_seconds),
+            "X-Amz-SignedHeaders": "host",
+        }
+        signature = self._signature(
+            "GET", path, query, {"host": self.endpoint}, UNSIGNED_PAYLOAD, amz_date, datestamp
+        )
+        return f"{protocol}://{self.endpoint}{path}?{_canonical_query(query)}&X-Amz-Signature={signature}"
+
+    async def download(self, bucket: str, object_name: str) -> bytes:
+        try:
+            response = await self._request("GET", bucket, object_name)
+            if response.status_code == 404:
+                raise ObjectNotFoundError(f"{bucket}/{object_name}")
+            response.raise_for_status()
+            return response.content
+        except httpx.HTTPError:
+            logger.exception(
+                "async_s3.download_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+
+    async def delete(self, bucket: str, object_name: str) -> None:
+        self.url_cache.invalidate(bucket, object_name)
+        try:
+            response = await self._request("DELETE", bucket, object_name)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            logger.exception(
+                "async_s3.delete_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+
+    async def exists(self, bucket: str, object_name: str) -> bool:
+        response = await self._request("HEAD", bucket, object_name)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _multipart_upload(self, data: memoryview, bucket: str, object_name: str, content_type: str) -> None:
+        async def slices() -> AsyncIterator[memoryview]:
+            for offset in range(0, len(data), self._part_size):
+                yield data[offset:offset + self._part_size]
+
+        await self._upload_parts(slices(), bucket, object_name, content_type)
+
+    async def _upload_parts(
+        self, chunks: AsyncIterator[memoryview], bucket: str, object_name: str, content_type: str
+    ) -> None:
+        """Multipart-upload `chunks` in order, with up to `max_part_concurrency` parts in flight."""
+        response = await self._request(
+            "POST", bucket, object_name, query={"uploads": ""}, headers={"Content-Type": content_type}
+        )
+        response.raise_for_status()
+        upload_id = _find_text(response.content, "UploadId")
+
+        semaphore = asyncio.Semaphore(self._max_part_concurrency)
+        tasks: List["asyncio.Task[Tuple[int, str]]"] = []
+
+        async def upload_part(part_number: int, chunk: memoryview) -> Tuple[int, str]:
+            try:
+                part = await self._request(
+                    "PUT", bucket, object_name,
+                    query={"partNumber": str(part_number), "uploadId": upload_id},
+                    content=chunk,
+                )
+                part.raise_for_status()
+                return part_number, part.headers["ETag"]
+            finally:
+                semaphore.release()
+
+        try:
+            async for chunk in chunks:
+                # Wait for a free slot before taking the next part, so
+                # unsent parts never pile up in memory
+                await semaphore.acquire()
+                for task in tasks:
+                    if task.done() and task.exception() is not None:
+                        semaphore.release()
+                        raise task.exception()
+                tasks.append(asyncio.create_task(upload_part(len(tasks) + 1, chunk)))
+            parts: List[Tuple[int, str]] = await asyncio.gather(*tasks)
+            body = "<CompleteMultipartUpload>" + "".join(
+                f"<Part><PartNumber>{n}</PartNumber><ETag>{etag}</ETag></Part>" for n, etag in sorted(parts)
+            ) + "</CompleteMultipartUpload>"
+            response = await self._request(
+                "POST", bucket, object_name, query={"uploadId": upload_id}, content=body.encode("utf-8")
+            )
+            response.raise_for_status()
+            # S3 can report a failed completion with a 200 status and an Error body
+            if b"<Error>" in response.content:
+                raise httpx.HTTPStatusError(
+                    "CompleteMultipartUpload failed", request=response.request, response=response
+                )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self._request("DELETE", bucket, object_name, query={"uploadId": upload_id})
+            except httpx.HTTPError:
+                logger.warning(
+                    "async_s3.abort_multipart_failed",
+                    extra={"bucket": bucket, "object_name": object_name},
+                )
+            raise
+
+    async def _request(
+        self,
+        method: str,
+        bucket: str,
+        object_name: Optional[str] = None,
+        *,
+        query: Optional[Dict[str, str]] = None,
+        content: Optional[Union[bytes, memoryview]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        path = _object_path(bucket, object_name)
+        query = query or {}
+        amz_date, datestamp = _timestamps()
+        signed = {
+            "host": self.endpoint,
+            "x-amz-content-sha256": UNSIGNED_PAYLOAD,
+            "x-amz-date": amz_date,
+        }
+        signature = self._signature(method, path, query, signed, UNSIGNED_PAYLOAD, amz_date, datestamp)
+        scope = f"{datestamp}/{self.region}/s3/aws4_request"
+        request_headers = {
+            **(headers or {}),
+            "x-amz-content-sha256": UNSIGNED_PAYLOAD,
+            "x-amz-date": amz_date,
+            "Authorization": (
+                f"AWS4-HMAC-SHA256 Credential={self._access_key}/{scope}, "
+                f"SignedHeaders={';'.join(sorted(signed))}, Signature={signature}"
+            ),
+        }
+        if isinstance(content, memoryview):
+            # Stream slices of the caller's buffer instead of copying it to bytes
+            request_headers["Content-Length"] = str(content.nbytes)
+            content = _iter_slices(content)
+        url = f"{path}?{_canonical_query(query)}" if query else path
+        return await self.client.request(method, url, content=content, headers=request_headers)
+
+    def _signature(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, str],
+        headers: Dict[str, str],
+        payload_hash: str,
+        amz_date: str,
+        datestamp: str,
+    ) -> str:
+        """Compute an AWS Signature V4 over the canonical request."""
+        canonical_headers = "".join(f"{k}:{headers[k].strip()}\n" for k in sorted(headers))
+        canonical_request = "\n".join([
+            method,
+            path,
+            _canonical_query(query),
+            canonical_headers,
+            ";".join(sorted(headers)),
+            payload_hash,
+        ])
+        scope = f"{datestamp}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+        ])
+        return hmac.new(self._signing_key(datestamp), string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def _signing_key(self, datestamp: str) -> bytes:
+        key = self._signing_keys.get(datestamp)
+        if key is None:
+            key = f"AWS4{self._secret_key}".encode("utf-8")
+            for part in (datestamp, self.region, "s3", "aws4_request"):
+                key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+            self._signing_keys = {datestamp: key}
+        return key
+
+
+def _read_payload(file_object: IO[bytes]) -> memoryview:
+    """Return the object's bytes, without copying for BytesIO-like buffers."""
+    file_object.seek(0)
+    getbuffer = getattr(file_object, "getbuffer", None)
+    if getbuffer is not None:
+        return getbuffer()
+    return memoryview(file_object.read())
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+    """Read `size` bytes, or fewer only at end of stream."""
+    parts = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        parts.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(parts)
+
+
+async def _iter_slices(data: memoryview) -> AsyncIterator[memoryview]:
+    for offset in range(0, data.nbytes, _STREAM_CHUNK_SIZE):
+        yield data[offset:offset + _STREAM_CHUNK_SIZE]
+
+
+def _find_text(xml: bytes, tag: str) -> Optional[str]:
+    root = ElementTree.fromstring(xml)
+    return root.findtext(f"{_S3_NS}{tag}") or root.findtext(tag)
+
+
+def _object_path(bucket: str, object_name: Optional[str]) -> str:
+    path = "/" + quote(bucket, safe="")
+    if object_name:
+        path += "/" + "/".join(quote(p, safe="") for p in object_name.split("/"))
+    return path
+
+
+def _canonical_query(query: Dict[str, str]) -> str:
+    return "&".join(f"{quote(k, safe='~')}={quote(v, safe='~')}" for k, v in sorted(query.items()))
+
+
+def _timestamps() -> Tuple[str, str]:
+    now = datetime.now(timezone.utc)
+    return now.strftime("%Y%m%dT%H%M%SZ"), now.strftime("%Y%m%d")
@@ -1,5 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import IO, Optional
+from io import BytesIO
+from typing import Any, Callable, Dict, IO, Iterable, Optional, Union
+import asyncio
+import time
+
+from app.core.metrics import EXECUTOR_IN_FLIGHT, EXECUTOR_WAIT_SECONDS, STORAGE_ERRORS, STORAGE_SECONDS
+
+
+class ObjectNotFoundError(Exception):
+    """Raised when a requested object does not exist in the bucket."""
 
 
 class BaseStorageProvider(ABC):
@@ -17,6 +26,17 @@ class BaseStorageProvider(ABC):
         presigned URL) for the uploaded object.
         """
 
+    def upload_stream(
+        self, stream: IO[bytes], bucket: str, object_name: str, *, content_type: Optional[str] = None
+    ) -> str:
+        """
+        Upload from a non-seekable stream of unknown length (e.g. a
+        BoundedPipe fed by an encoder) and return the object's URL. This
+        default buffers the whole stream; providers override it to send
+        data while the producer is still writing.
+        """
+        return self.upload(BytesIO(stream.read()), bucket, object_name, content_type=content_type)
+
     @abstractmethod
     def get_public_url(self, bucket: str, object_name: str, *, expires_seconds: Optional[int] = None) -> str:
         """
@@ -24,6 +44,15 @@ class BaseStorageProvider(ABC):
         private, implementations should return a presigned URL.
         """
 
+    @abstractmethod
+    def download(self, bucket: str, object_name: str) -> bytes:
+        """
+        Return the contents of an object.
+
+        Raises:
+            ObjectNotFoundError: If the object does not exist.
+        """
+
     @abstractmethod
     def delete(self, bucket: str, object_name: str) -> None:
         """Delete an object from storage."""
@@ -31,3 +60,98 @@ class BaseStorageProvider(ABC):
     @abstractmethod
     def exists(self, bucket: str, object_name: str) -> bool:
         """Return True if the object exists, otherwise False."""
+
+    def get_public_urls(
+        self, bucket: str, object_names: Iterable[str], *, expires_seconds: Optional[int] = None
+    ) -> Dict[str, str]:
+        """Return URLs for several objects at once, e.g. for listing responses."""
+        return {name: self.get_public_url(bucket, name, expires_seconds=expires_seconds) for name in object_names}
+
+
+class AsyncBaseStorageProvider(ABC):
+    """
+    Abstract base class for storage providers with a native asyncio API.
+    Same contract as BaseStorageProvider, but I/O methods are awaited
+    directly on the event loop instead of being run in a thread.
+    """
+
+    @abstractmethod
+    async def upload(
+        self, file_object: IO[bytes], bucket: str, object_name: str, *, content_type: Optional[str] = None
+    ) -> str:
+        """
+        Upload a file-like object and return a publicly accessible URL (or a
+        presigned URL) for the uploaded object.
+        """
+
+    async def upload_stream(
+        self, stream: IO[bytes], bucket: str, object_name: str, *, content_type: Optional[str] = None
+    ) -> str:
+        """
+        Upload from a non-seekable, blocking stream of unknown length. This
+        default buffers the whole stream; providers override it to send
+        data while the producer is still writing.
+        """
+        data = await asyncio.to_thread(stream.read)
+        return await self.upload(BytesIO(data), bucket, object_name, content_type=content_type)
+
+    @abstractmethod
+    def get_public_url(self, bucket: str, object_name: str, *, expires_seconds: Optional[int] = None) -> str:
+        """
+        Return a public or presigned URL for the object. This only builds
+        (and possibly signs) a URL, so it is not a coroutine.
+        """
+
+    @abstractmethod
+    async def download(self, bucket: str, object_name: str) -> bytes:
+        """
+        Return the contents of an object.
+
+        Raises:
+            ObjectNotFoundError: If the object does not exist.
+        """
+
+    @abstractmethod
+    async def delete(self, bucket: str, object_name: str) -> None:
+        """Delete an object from storage."""
+
+    @abstractmethod
+    async def exists(self, bucket: str, object_name: str) -> bool:
+        """Return True if the object exists, otherwise False."""
+
+    def get_public_urls(
+        self, bucket: str, object_names: Iterable[str], *, expires_seconds: Optional[int] = None
+    ) -> Dict[str, str]:
+        """Return URLs for several objects at once, e.g. for listing responses."""
+        return {name: self.get_public_url(bucket, name, expires_seconds=expires_seconds) for name in object_names}
+
+    async def aclose(self) -> None:
+        """Release pooled connections."""
+
+
+async def call_storage(
+    provider: Union[BaseStorageProvider, AsyncBaseStorageProvider], method: str, *args: Any, **kwargs: Any
+) -> Any:
+    """
+    Invoke a storage provider I/O method: awaited directly for async
+    providers, run in a worker thread for blocking ones. Latency, errors
+    and thread-pool queueing are recorded as metrics.
+    """
+    func = getattr(provider, method)
+    labels = {"provider": type(provider).__name__, "operation": method}
+    start = time.perf_counter()
+    try:
+        if isinstance(provider, AsyncBaseStorageProvider):
+            return await func(*args, **kwargs)
+        with EXECUTOR_IN_FLIGHT.track_inprogress(executor="storage"):
+            return await asyncio.to_thread(_measure_wait, "storage", start, func, *args, **kwargs)
+    except Exception:
+        STORAGE_ERRORS.inc(**labels)
+        raise
+    finally:
+        STORAGE_SECONDS.observe(time.perf_counter() - start, **labels)
+
+
+def _measure_wait(executor: str, submitted_at: float, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    EXECUTOR_WAIT_SECONDS.observe(time.perf_counter() - submitted_at, executor=executor)
+    return func(*args, **kwargs)
@@ -0,0 +1,76 @@
+from abc import ABC, abstractmethod
+from typing import List
+import hashlib
+
+from app.utils.id_generator import id_timestamp
+
+
+class BaseKeyLayout(ABC):
+    """
+    Abstract base class for object key layouts.
+
+    A layout places the renditions of one image, named after its base
+    name (a generation ID or a prompt cache address), under a key
+    prefix. Keys depend only on the base name, so the prompt cache finds
+    earlier renders again. The full key is what is stored as a
+    variant's `object_name`, so URLs, downloads and deletes resolve it
+    as is, and objects written under an earlier layout stay reachable.
+
+    `prefix` (e.g. a tenant or environment) is put in front of every
+    key, scoping listing, lifecycle rules and cleanup to one deployment.
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix.strip("/")
+
+    def key(self, base_name: str) -> str:
+        """Return the key, without extension, for the renditions of `base_name`."""
+        return "/".join([*filter(None, [self.prefix]), *self.directories(base_name), base_name])
+
+    @abstractmethod
+    def directories(self, base_name: str) -> List[str]:
+        """Path segments between the prefix and the base name."""
+
+
+class FlatKeyLayout(BaseKeyLayout):
+    """Every object at the root of the bucket (or of `prefix`)."""
+
+    def directories(self, base_name: str) -> List[str]:
+        return []
+
+
+class HashPrefixKeyLayout(BaseKeyLayout):
+    """
+    Objects spread over `levels` levels of 256 shards each, keyed by a
+    hash of the base name (`3f/a9/gen_...`), so writes hit many key
+    ranges of an S3-compatible store instead of one.
+    """
+
+    def __init__(self, prefix: str = "", *, levels: int = 2):
+        super().__init__(prefix)
+        self.levels = levels
+
+    def directories(self, base_name: str) -> List[str]:
+        digest = hashlib.sha1(base_name.encode("utf-8")).hexdigest()
+        return [digest[2 * i:2 * i + 2] for i in range(self.levels)]
+
+
+class DatePrefixKeyLayout(BaseKeyLayout):
+    """
+    Per-generation objects grouped by creation day (`2026/10/18/gen_...`),
+    read from the time-ordered generation ID, so a day's images can be
+    listed or expired by prefix. Base names without a timestamp, such as
+    prompt cache addresses shared across days, are sharded by hash under
+    `shared/` instead.
+    """
+
+    def __init__(self, prefix: str = "", *, levels: int = 2):
+        super().__init__(prefix)
+        self._fallback = HashPrefixKeyLayout(levels=levels)
+
+    def directories(self, base_name: str) -> List[str]:
+        try:
+            created_at = id_timestamp(base_name)
+        except ValueError:
+            return ["shared", *self._fallback.directories(base_name)]
+        return [f"{created_at.year:04d}", f"{created_at.month:02d}", f"{created_at.day:02d}"]
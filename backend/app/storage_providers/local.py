@@ -0,0 +1,119 @@
+from typing import Optional, IO
+from urllib.parse import quote
+import hashlib
+import logging
+import os
+import tempfile
+
+from .base import BaseStorageProvider, ObjectNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class LocalFilesystemStorageProvider(BaseStorageProvider):
+    """
+    Storage provider that keeps objects on the local filesystem, for
+    single-node deployments, tests and benchmarks.
+
+    Objects live under `<root>/<bucket>/<h[0:2]>/<h[2:4]>/<object_name>`,
+    where `h` is the SHA-1 of the object name, so no single directory
+    grows unbounded. Writes go to a temporary file that is atomically
+    renamed into place. Objects are served by the /files route, which
+    `get_public_url` points at.
+    """
+
+    def __init__(self, root: str, public_base_url: str, *, fsync: bool = False):
+        self.root = os.path.abspath(root)
+        self.public_base_url = public_base_url.rstrip("/")
+        self._fsync = fsync
+        os.makedirs(self.root, exist_ok=True)
+
+    def resolve_path(self, bucket: str, object_name: str) -> str:
+        """
+        Return the absolute path for an object.
+
+        Raises:
+            ValueError: If the bucket or object name would escape the root.
+        """
+        parts = [bucket, *object_name.split("/")]
+        if any(p in ("", ".", "..") or "\\" in p for p in parts):
+            raise ValueError(f"Invalid object path: {bucket}/{object_name}")
+        digest = hashlib.sha1(object_name.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, bucket, digest[:2], digest[2:4], *object_name.split("/"))
+
+    def upload(
+        self, file_object: IO[bytes], bucket: str, object_name: str, *, content_type: Optional[str] = None
+    ) -> str:
+        """Atomically write a file-like object and return its URL."""
+        file_object.seek(0)
+        return self._write(file_object, bucket, object_name)
+
+    def upload_stream(
+        self, stream: IO[bytes], bucket: str, object_name: str, *, content_type: Optional[str] = None
+    ) -> str:
+        """Copy a stream chunk by chunk into place and return its URL."""
+        return self._write(stream, bucket, object_name)
+
+    def _write(self, file_object: IO[bytes], bucket: str, object_name: str) -> str:
+        path = self.resolve_path(bucket, object_name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                getbuffer = getattr(file_object, "getbuffer", None)
+                if getbuffer is not None:
+                    out.write(getbuffer())
+                else:
+                    while chunk := file_object.read(1024 * 1024):
+                        out.write(chunk)
+                if self._fsync:
+                    out.flush()
+                    os.fsync(out.fileno())
+            os.replace(tmp_path, path)
+        except BaseException as e:
+            # A failed producer (e.g. an encoder feeding a stream) is its caller's to log
+            if isinstance(e, OSError):
+                logger.exception(
+                    "local.upload_failed",
+                    extra={"bucket": bucket, "object_name": object_name},
+                )
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return self.get_public_url(bucket, object_name)
+
+    def get_public_url(self, bucket: str, object_name: str, *, expires_seconds: Optional[int] = None) -> str:
+        """
+        Return the URL of the /files route for the object. Objects are
+        always public, so `expires_seconds` is ignored.
+        """
+        safe_object = "/".join(quote(p, safe="") for p in object_name.split("/"))
+        return f"{self.public_base_url}/api/v1/files/{quote(bucket, safe='')}/{safe_object}"
+
+    def download(self, bucket: str, object_name: str) -> bytes:
+        try:
+            with open(self.resolve_path(bucket, object_name), "rb") as f:
+                return f.read()
+        except (ValueError, FileNotFoundError, NotADirectoryError) as e:
+            raise ObjectNotFoundError(f"{bucket}/{object_name}") from e
+
+    def delete(self, bucket: str, object_name: str) -> None:
+        try:
+            os.remove(self.resolve_path(bucket, object_name))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.exception(
+                "local.delete_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+
+    def exists(self, bucket: str, object_name: str) -> bool:
+        try:
+            return os.path.isfile(self.resolve_path(bucket, object_name))
+        except ValueError:
+            return False
@@ -8,17 +8,22 @@ from minio import Minio
 from minio.error import S3Error
 
 from app.core.config import settings
-from .base import BaseStorageProvider
+from .base import BaseStorageProvider, ObjectNotFoundError
+from .url_cache import PresignedUrlCache
 
 logger = logging.getLogger(__name__)
 
+# Part size for uploads of unknown length (the S3 minimum for multipart parts)
+STREAM_PART_SIZE = 5 * 1024 * 1024
+
 
 class MinioStorageProvider(BaseStorageProvider):
     """
     Storage provider for a MinIO S3-compatible service.
     """
 
-    def __init__(self):
+    def __init__(self, url_cache: Optional[PresignedUrlCache] = None):
+        self.url_cache = url_cache or PresignedUrlCache()
         self.client = Minio(
             settings.OBJECT_STORAGE_ENDPOINT,
             access_key=settings.OBJECT_STORAGE_ACCESS_KEY,
@@ -78,6 +83,31 @@ class MinioStorageProvider(BaseStorageProvider):
             )
             raise
 
+    def upload_stream(
+        self, stream: IO[bytes], bucket: str, object_name: str, *, content_type: Optional[str] = None
+    ) -> str:
+        """
+        Upload a stream of unknown length: a single PUT if it ends within
+        one part, a multipart upload otherwise. At most one part is
+        buffered at a time.
+        """
+        try:
+            self.client.put_object(
+                bucket_name=bucket,
+                object_name=object_name,
+                data=stream,
+                length=-1,
+                part_size=STREAM_PART_SIZE,
+                content_type=content_type or "image/png",
+            )
+            return self.get_public_url(bucket, object_name)
+        except S3Error:
+            logger.exception(
+                "minio.upload_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+
     def get_public_url(self, bucket: str, object_name: str, *, expires_seconds: Optional[int] = None) -> str:
         """
         Construct a URL for the object.
@@ -86,8 +116,11 @@ class MinioStorageProvider(BaseStorageProvider):
         """
         if expires_seconds:
             try:
-                return self.client.presigned_get_object(
-                    bucket, object_name, expires=timedelta(seconds=expires_seconds)
+                return self.url_cache.get_or_sign(
+                    bucket, object_name, expires_seconds,
+                    lambda: self.client.presigned_get_object(
+                        bucket, object_name, expires=timedelta(seconds=expires_seconds)
+                    ),
                 )
             except S3Error as e:
                 logger.exception(
@@ -102,7 +135,26 @@ class MinioStorageProvider(BaseStorageProvider):
         safe_object = "/".join(quote(p, safe="") for p in object_name.split("/"))
         return f"{protocol}://{endpoint}/{bucket}/{safe_object}"
 
+    def download(self, bucket: str, object_name: str) -> bytes:
+        response = None
+        try:
+            response = self.client.get_object(bucket, object_name)
+            return response.read()
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchBucket"):
+                raise ObjectNotFoundError(f"{bucket}/{object_name}") from e
+            logger.exception(
+                "minio.download_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
+
     def delete(self, bucket: str, object_name: str) -> None:
+        self.url_cache.invalidate(bucket, object_name)
         try:
             self.client.remove_object(bucket, object_name)
         except S3Error as e:
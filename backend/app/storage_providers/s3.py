@@ -0,0 +1,217 @@
+from typing import Optional, IO
+from urllib.parse import quote
+import logging
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+from .base import BaseStorageProvider, ObjectNotFoundError
+from .url_cache import PresignedUrlCache
+
+logger = logging.getLogger(__name__)
+
+
+class S3StorageProvider(BaseStorageProvider):
+    """
+    Storage provider for AWS S3 or any S3-compatible service, backed by boto3.
+
+    One client (and its connection pool) is shared by all calls. Small
+    objects are sent with a single PutObject streamed straight from the
+    caller's buffer; larger ones go through the managed transfer engine
+    with parallel multipart uploads. Failed calls are retried with
+    botocore's adaptive backoff.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        access_key: str,
+        secret_key: str,
+        *,
+        secure: bool = True,
+        region: str = "us-east-1",
+        bucket: Optional[str] = None,
+        max_pool_connections: int = 100,
+        max_attempts: int = 5,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunksize: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        url_cache: Optional[PresignedUrlCache] = None,
+    ):
+        self.endpoint = endpoint.rstrip("/")
+        self.secure = secure
+        self.url_cache = url_cache or PresignedUrlCache()
+        self.client = boto3.session.Session().client(
+            "s3",
+            endpoint_url=f"{'https' if secure else 'http'}://{self.endpoint}",
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                retries={"mode": "adaptive", "max_attempts": max_attempts},
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                s3={"addressing_style": "path"},
+                tcp_keepalive=True,
+            ),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_concurrency,
+            use_threads=max_concurrency > 1,
+        )
+        try:
+            if bucket:
+                self._ensure_bucket_exists(bucket)
+        except (BotoCoreError, ClientError):
+            logger.exception("s3.ensure_bucket_failed", extra={"bucket": bucket})
+            raise
+
+    def _ensure_bucket_exists(self, bucket_name: str) -> None:
+        """Create the bucket if it doesn't already exist."""
+        if not self.exists_bucket(bucket_name):
+            self.client.create_bucket(Bucket=bucket_name)
+
+    def exists_bucket(self, bucket_name: str) -> bool:
+        try:
+            self.client.head_bucket(Bucket=bucket_name)
+            return True
+        except ClientError as e:
+            if _status_code(e) == 404:
+                return False
+            raise
+
+    def upload(
+        self, file_object: IO[bytes], bucket: str, object_name: str, *, content_type: Optional[str] = None
+    ) -> str:
+        """Upload a file-like object to S3 and return an access URL."""
+        content_type = content_type or "image/png"
+        try:
+            file_object.seek(0)
+            buffer = getattr(file_object, "getbuffer", None)
+            size = buffer().nbytes if buffer is not None else None
+            if size is not None and size < self.transfer_config.multipart_threshold:
+                # Stream the in-memory buffer directly; no intermediate copy
+                self.client.put_object(
+                    Bucket=bucket,
+                    Key=object_name,
+                    Body=file_object,
+                    ContentLength=size,
+                    ContentType=content_type,
+                )
+            else:
+                self.client.upload_fileobj(
+                    file_object,
+                    bucket,
+                    object_name,
+                    ExtraArgs={"ContentType": content_type},
+                    Config=self.transfer_config,
+                )
+            return self.get_public_url(bucket, object_name)
+        except (BotoCoreError, ClientError):
+            logger.exception(
+                "s3.upload_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+
+    def upload_stream(
+        self, stream: IO[bytes], bucket: str, object_name: str, *, content_type: Optional[str] = None
+    ) -> str:
+        """
+        Upload a stream of unknown length through the transfer engine,
+        which reads it part by part and switches to multipart once it
+        exceeds the multipart threshold.
+        """
+        try:
+            self.client.upload_fileobj(
+                stream,
+                bucket,
+                object_name,
+                ExtraArgs={"ContentType": content_type or "image/png"},
+                Config=self.transfer_config,
+            )
+            return self.get_public_url(bucket, object_name)
+        except (BotoCoreError, ClientError):
+            logger.exception(
+                "s3.upload_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+
+    def get_public_url(self, bucket: str, object_name: str, *, expires_seconds: Optional[int] = None) -> str:
+        """
+        Construct a URL for the object.
+        - If expires_seconds is provided, return a presigned URL.
+        - Otherwise, construct a direct URL (assumes public bucket).
+        """
+        if expires_seconds:
+            try:
+                return self.url_cache.get_or_sign(
+                    bucket, object_name, expires_seconds,
+                    lambda: self.client.generate_presigned_url(
+                        "get_object",
+                        Params={"Bucket": bucket, "Key": object_name},
+                        ExpiresIn=expires_seconds,
+                    ),
+                )
+            except (BotoCoreError, ClientError):
+                logger.exception(
+                    "s3.presign_failed",
+                    extra={"bucket": bucket, "object_name": object_name},
+                )
+                raise
+
+        protocol = "https" if self.secure else "http"
+        safe_object = "/".join(quote(p, safe="") for p in object_name.split("/"))
+        return f"{protocol}://{self.endpoint}/{bucket}/{safe_object}"
+
+    def download(self, bucket: str, object_name: str) -> bytes:
+        try:
+            response = self.client.get_object(Bucket=bucket, Key=object_name)
+            with response["Body"] as body:
+                return body.read()
+        except ClientError as e:
+            if _status_code(e) == 404:
+                raise ObjectNotFoundError(f"{bucket}/{object_name}") from e
+            logger.exception(
+                "s3.download_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+        except BotoCoreError:
+            logger.exception(
+                "s3.download_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+
+    def delete(self, bucket: str, object_name: str) -> None:
+        self.url_cache.invalidate(bucket, object_name)
+        try:
+            self.client.delete_object(Bucket=bucket, Key=object_name)
+        except (BotoCoreError, ClientError):
+            logger.exception(
+                "s3.delete_failed",
+                extra={"bucket": bucket, "object_name": object_name},
+            )
+            raise
+
+    def exists(self, bucket: str, object_name: str) -> bool:
+        try:
+            self.client.head_object(Bucket=bucket, Key=object_name)
+            return True
+        except ClientError as e:
+            if _status_code(e) == 404:
+                return False
+            raise
+
+
+def _status_code(error: ClientError) -> Optional[int]:
+    return error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
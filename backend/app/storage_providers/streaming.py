@@ -0,0 +1,132 @@
+"""
+Bounded in-memory pipe between a producer thread (an image encoder) and
+a consumer (a storage upload).
+
+The producer writes through the file-like API (`write`, as used by
+PIL's `Image.save`); bytes are cut into `chunk_size` chunks and handed
+over through a queue of at most `max_chunks` chunks, so a slow upload
+blocks the encoder instead of letting buffered data grow. The consumer
+reads with `read` / `readinto` (blocking, for SDKs that take a stream)
+or `read_chunk` (one whole chunk, for hand-rolled multipart uploads).
+"""
+import io
+import queue
+import threading
+from typing import Optional, Union
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_MAX_CHUNKS = 4
+
+_EOF = object()
+# How often a blocked producer checks whether the consumer went away
+_PUT_POLL_SECONDS = 0.1
+
+
+class BoundedPipe(io.RawIOBase):
+    """
+    Single-producer, single-consumer byte pipe holding at most about
+    `chunk_size * (max_chunks + 2)` bytes at any time.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, max_chunks: int = DEFAULT_MAX_CHUNKS):
+        super().__init__()
+        self.chunk_size = chunk_size
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max(1, max_chunks))
+        self._pending = bytearray()
+        self._current = memoryview(b"")
+        self._cancelled = threading.Event()
+        self._finished = False
+        self.bytes_written = 0
+
+    # -- producer side ----------------------------------------------------
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        if self._finished:
+            raise ValueError("write to a finished pipe")
+        self._pending += data
+        self.bytes_written += len(data)
+        while len(self._pending) >= self.chunk_size:
+            self._put(bytes(self._pending[:self.chunk_size]))
+            del self._pending[:self.chunk_size]
+        return len(data)
+
+    def finish(self) -> None:
+        """Flush buffered bytes and signal end of stream to the consumer."""
+        if self._finished:
+            return
+        if self._pending:
+            self._put(bytes(self._pending))
+            self._pending.clear()
+        self._finished = True
+        self._put(_EOF)
+
+    def fail(self, error: BaseException) -> None:
+        """Make the consumer's next read raise `error` (the producer failed)."""
+        self._finished = True
+        self._pending.clear()
+        try:
+            self._put(error)
+        except BrokenPipeError:
+            pass
+
+    def _put(self, item: object) -> None:
+        while True:
+            if self._cancelled.is_set():
+                raise BrokenPipeError("pipe consumer went away")
+            try:
+                self._queue.put(item, timeout=_PUT_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    # -- consumer side ----------------------------------------------------
+
+    def readable(self) -> bool:
+        return True
+
+    def read_chunk(self) -> Optional[bytes]:
+        """Return the next whole chunk, or None at end of stream. Blocking."""
+        if self._cancelled.is_set():
+            raise BrokenPipeError("pipe was cancelled")
+        if self._current:
+            chunk, self._current = bytes(self._current), memoryview(b"")
+            return chunk
+        item = self._queue.get()
+        if item is _EOF:
+            self._queue.put(_EOF)  # Keep reporting EOF to later reads
+            return None
+        if isinstance(item, BaseException):
+            self._queue.put(item)
+            raise item
+        return item
+
+    def readinto(self, buffer) -> int:
+        if not self._current:
+            chunk = self.read_chunk()
+            if chunk is None:
+                return 0
+            self._current = memoryview(chunk)
+        n = min(len(buffer), len(self._current))
+        buffer[:n] = self._current[:n]
+        self._current = self._current[n:]
+        return n
+
+    def cancel(self) -> None:
+        """
+        Abandon the transfer: a blocked producer's write and a blocked
+        consumer's read (e.g. an upload thread that timed out) both raise
+        BrokenPipeError.
+        """
+        self._cancelled.set()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(BrokenPipeError("pipe was cancelled"))
+        except queue.Full:
+            pass
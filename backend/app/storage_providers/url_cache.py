@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Set, Tuple
+import threading
+import time
+
+_Key = Tuple[str, str, int]
+
+
+class PresignedUrlCache:
+    """
+    Cache of presigned URLs keyed by (bucket, object_name, expiry).
+
+    A cached URL is handed out until `refresh_fraction` of its lifetime
+    has elapsed, after which it is re-signed, so callers always receive
+    a URL with at least (1 - refresh_fraction) of its lifetime left.
+    """
+
+    def __init__(self, *, refresh_fraction: float = 0.5, max_entries: int = 100_000):
+        if not 0 < refresh_fraction <= 1:
+            raise ValueError("refresh_fraction must be in (0, 1]")
+        self._refresh_fraction = refresh_fraction
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[_Key, Tuple[str, float]]" = OrderedDict()
+        self._by_object: Dict[Tuple[str, str], Set[_Key]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_sign(self, bucket: str, object_name: str, expires_seconds: int, sign: Callable[[], str]) -> str:
+        """Return a still-fresh cached URL, or call `sign()` and cache its result."""
+        key = (bucket, object_name, expires_seconds)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        url = sign()
+        with self._lock:
+            self._entries[key] = (url, now + expires_seconds * self._refresh_fraction)
+            self._entries.move_to_end(key)
+            self._by_object.setdefault((bucket, object_name), set()).add(key)
+            while len(self._entries) > self._max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._unindex(oldest)
+        return url
+
+    def invalidate(self, bucket: str, object_name: str) -> None:
+        """Drop every cached URL for an object, e.g. after it was deleted."""
+        with self._lock:
+            for key in self._by_object.pop((bucket, object_name), ()):
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _unindex(self, key: _Key) -> None:
+        keys = self._by_object.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_object[key[:2]]
@@ -1,10 +1,79 @@
-import uuid
+from datetime import datetime, timezone
+from typing import List
+import os
+import threading
+import time
+
+# Crockford base32, lowercase: ascending in ASCII, so IDs sort like their values
+_ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"
+_DECODE = {c: i for i, c in enumerate(_ALPHABET)}
+# Two characters per 10-bit chunk halves the encoding loop
+_PAIRS = [a + b for a in _ALPHABET for b in _ALPHABET]
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+_ENCODED_LENGTH = 26  # 48-bit timestamp + 80 random bits, 5 bits per character
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+def _allocate(count: int) -> List[int]:
+    """
+    Reserve `count` consecutive 128-bit values: a millisecond timestamp
+    followed by a random part that is incremented, not redrawn, within
+    the same millisecond, so values are strictly increasing per process.
+    """
+    global _last_ms, _last_random
+    now_ms = time.time_ns() // 1_000_000
+    with _lock:
+        if now_ms > _last_ms:
+            # Leave headroom so the increments below rarely overflow
+            ms, random_part = now_ms, int.from_bytes(os.urandom(10), "big") >> 1
+        else:
+            # Same millisecond, or the clock stepped back: keep counting up
+            ms, random_part = _last_ms, _last_random + 1
+        if random_part + count - 1 > _RANDOM_MAX:
+            ms, random_part = ms + 1, int.from_bytes(os.urandom(10), "big") >> 1
+        _last_ms, _last_random = ms, random_part + count - 1
+    base = (ms << _RANDOM_BITS) | random_part
+    return [base + i for i in range(count)]
+
+
+def _encode(value: int) -> str:
+    chunks = []
+    for _ in range(_ENCODED_LENGTH // 2):
+        chunks.append(_PAIRS[value & 1023])
+        value >>= 10
+    return "".join(reversed(chunks))
 
 
 def generate_unique_id(prefix: str = "img") -> str:
     """
-    Generate a short, URL-friendly ID.
-    Example: 'img_a8b1c9d2'
+    Generate a URL-friendly, time-ordered ID (ULID layout, lowercase).
+    IDs with the same prefix sort by creation time, and never repeat
+    within a process.
+    Example: 'img_01j9z3k4qv8m5x2c7b6n0d1e2f'
+    """
+    return f"{prefix}_{_encode(_allocate(1)[0])}"
+
+
+def generate_unique_ids(count: int, prefix: str = "img") -> List[str]:
+    """Allocate `count` consecutive IDs at once, in increasing order."""
+    return [f"{prefix}_{_encode(value)}" for value in _allocate(count)]
+
+
+def id_timestamp(unique_id: str) -> datetime:
+    """
+    Return the creation time encoded in an ID from `generate_unique_id`.
+
+    Raises:
+        ValueError: If the ID was not produced by this scheme.
     """
-    unique_part = uuid.uuid4().hex[:8]  # lowercase, no hyphens
-    return f"{prefix}_{unique_part}"
+    encoded = unique_id.rsplit("_", 1)[-1]
+    if len(encoded) != _ENCODED_LENGTH or any(c not in _DECODE for c in encoded):
+        raise ValueError(f"Not a time-ordered ID: {unique_id!r}")
+    value = 0
+    for c in encoded:
+        value = (value << 5) | _DECODE[c]
+    return datetime.fromtimestamp((value >> _RANDOM_BITS) / 1000, timezone.utc)
@@ -0,0 +1,84 @@
+"""
+Standalone generation worker.
+
+Leases generation jobs from the shared job queue and runs them with its
+own rendering pool, so image work scales separately from the API tier:
+
+    WORKER_MODE=external JOB_QUEUE_BACKEND=sqlite GENERATION_STORE_BACKEND=sqlite \\
+        python -m app.worker --concurrency 8 --render-processes 4
+
+Settings come from the environment and `.env` like the API's; the flags
+override them for this process. SIGTERM or SIGINT drains the jobs in
+flight (up to WORKER_DRAIN_TIMEOUT_SECONDS) before exiting; queued jobs
+stay in the queue for the remaining workers.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+from typing import List, Optional
+
+from app.core.config import Settings, settings
+from app.core.container import ServiceContainer
+from app.core.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description="Run background generation jobs.")
+    parser.add_argument("--concurrency", type=int, help="Jobs run at once (GENERATION_WORKER_CONCURRENCY)")
+    parser.add_argument("--render-processes", type=int, help="PNG encoding processes (RENDER_PROCESS_WORKERS)")
+    parser.add_argument("--render-threads", type=int, help="Dedicated render threads (RENDER_THREAD_WORKERS)")
+    parser.add_argument("--heartbeat", type=float, help="Seconds between heartbeats (WORKER_HEARTBEAT_SECONDS)")
+    parser.add_argument("--drain-timeout", type=float, help="Seconds to finish jobs on shutdown (WORKER_DRAIN_TIMEOUT_SECONDS)")
+    return parser.parse_args(argv)
+
+
+def worker_settings(args: argparse.Namespace, base: Settings = settings) -> Settings:
+    """Apply command-line overrides on top of the configured settings."""
+    overrides = {
+        "GENERATION_WORKER_CONCURRENCY": args.concurrency,
+        "RENDER_PROCESS_WORKERS": args.render_processes,
+        "RENDER_THREAD_WORKERS": args.render_threads,
+        "WORKER_HEARTBEAT_SECONDS": args.heartbeat,
+        "WORKER_DRAIN_TIMEOUT_SECONDS": args.drain_timeout,
+    }
+    return base.model_copy(update={k: v for k, v in overrides.items() if v is not None})
+
+
+async def run(config: Settings) -> None:
+    """Run a worker until SIGTERM or SIGINT, then drain and shut down."""
+    container = ServiceContainer(config, role="worker")
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await container.start()
+    logger.info(
+        "worker.started",
+        extra={
+            "worker_id": container.worker_pool.worker_id,
+            "concurrency": config.GENERATION_WORKER_CONCURRENCY,
+            "render_capacity": container.renderer.capacity,
+            "job_queue": config.JOB_QUEUE_BACKEND,
+        },
+    )
+    try:
+        await stopping.wait()
+    finally:
+        logger.info("worker.stopping", extra={"drain_timeout": config.WORKER_DRAIN_TIMEOUT_SECONDS})
+        await container.stop(drain_timeout=config.WORKER_DRAIN_TIMEOUT_SECONDS)
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.remove_signal_handler(sig)
+        logger.info("worker.stopped")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    setup_logging()
+    asyncio.run(run(worker_settings(parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
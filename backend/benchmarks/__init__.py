@@ -0,0 +1,9 @@
+"""
+Benchmarks for the image generation backend.
+
+Run modules from the backend directory, e.g.
+    python -m benchmarks.scenarios --help         # API load scenarios, fake model
+    python -m benchmarks.micro generate --help    # single-call micro-benchmarks
+    python -m benchmarks.storage_providers --help
+    python -m benchmarks.compare old.json new.json
+"""
@@ -0,0 +1,144 @@
+"""
+Shared helpers for benchmark scripts: latency summaries, memory
+sampling, the in-process S3 stand-in and JSON reports.
+"""
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+BUCKET = "bench-images"
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Summarize per-operation latencies (seconds) measured over `elapsed` seconds."""
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "ops_per_second": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+    }
+
+
+def configure_s3_env(port: int) -> None:
+    """Point the app's object storage settings at the local S3 stand-in."""
+    os.environ.update(
+        OBJECT_STORAGE_ENDPOINT=f"127.0.0.1:{port}",
+        OBJECT_STORAGE_BUCKET=BUCKET,
+        OBJECT_STORAGE_ACCESS_KEY="bench",
+        OBJECT_STORAGE_SECRET_KEY="bench",
+        USE_HTTPS="false",
+    )
+    os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+
+def start_s3_stand_in(port: int):
+    """
+    Start moto's S3-compatible server on a thread of this process and
+    configure the app to use it. Returns the server; call `stop()` on it.
+    """
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        raise SystemExit("❌ moto[server] is required: pip install 'moto[server]'")
+    configure_s3_env(port)
+    server = ThreadedMotoServer(port=port, verbose=False)
+    server.start()
+    return server
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (Linux; falls back to the peak elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """
+    Samples RSS on a background thread while active, to report the peak
+    memory of one scenario (the process-wide peak only ever grows).
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.baseline = 0
+        self.peak = 0
+
+    def __enter__(self) -> "RssSampler":
+        self.baseline = self.peak = current_rss_bytes()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.peak = max(self.peak, current_rss_bytes())
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "rss_baseline_mb": self.baseline / 2**20,
+            "rss_peak_mb": self.peak / 2**20,
+            "rss_growth_mb": (self.peak - self.baseline) / 2**20,
+        }
+
+
+def label_keys(row: Dict[str, Any]) -> List[str]:
+    """Keys identifying a result row (its parameters) rather than measuring it."""
+    return [k for k, v in row.items() if k not in ("count", "failures") and not isinstance(v, (float, dict))]
+
+
+def write_report(name: str, results: List[Dict[str, Any]], path: Optional[str]) -> Dict[str, Any]:
+    """Print a report and optionally write it as JSON for cross-run comparison."""
+    report = {
+        "benchmark": name,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    for row in results:
+        labels = " ".join(f"{k}={v}" for k, v in row.items() if k in label_keys(row))
+        line = (
+            f"  {labels:<60} {row.get('ops_per_second', 0):>9.1f} ops/s"
+            f"  p50 {row.get('p50_ms', 0):7.2f} ms  p95 {row.get('p95_ms', 0):7.2f} ms"
+            f"  p99 {row.get('p99_ms', 0):7.2f} ms"
+        )
+        if "rss_peak_mb" in row:
+            line += f"  rss {row['rss_peak_mb']:7.1f} MB"
+        if "statuses" in row:
+            line += "  " + " ".join(f"{k}:{v}" for k, v in sorted(row["statuses"].items()))
+        print(line)
+    if path:
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Wrote {path}")
+    return report
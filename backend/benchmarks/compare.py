@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare two JSON benchmark reports and flag regressions.
+
+Rows are matched on their parameters (scenario, concurrency, size, ...).
+A row regresses when a latency percentile grows, or throughput drops, by
+more than --threshold percent. Exits with status 1 if any row regressed,
+so it can gate a CI job.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+from .common import label_keys
+
+# Metric -> True if higher is better
+METRICS = {
+    "ops_per_second": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "rss_peak_mb": False,
+}
+
+
+def _index(report: Dict[str, Any]) -> Dict[Tuple, Dict[str, Any]]:
+    return {tuple((k, row[k]) for k in label_keys(row)): row for row in report["results"]}
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Per matched row and metric, the relative change and whether it regressed."""
+    rows = []
+    old_rows = _index(baseline)
+    for key, new in _index(candidate).items():
+        old = old_rows.get(key)
+        if old is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in old or metric not in new or not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric] * 100
+            worse = -change if higher_is_better else change
+            rows.append({
+                "row": " ".join(f"{k}={v}" for k, v in key),
+                "metric": metric,
+                "baseline": old[metric],
+                "candidate": new[metric],
+                "change_pct": change,
+                "regressed": worse > threshold,
+            })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline.get("benchmark") != candidate.get("benchmark"):
+        raise SystemExit(f"❌ Reports are from different benchmarks: {baseline.get('benchmark')} vs {candidate.get('benchmark')}")
+
+    rows = compare(baseline, candidate, args.threshold)
+    if not rows:
+        raise SystemExit("❌ No matching rows between the two reports")
+    for row in rows:
+        marker = "❌" if row["regressed"] else "  "
+        print(
+            f"{marker} {row['row']:<50} {row['metric']:<15}"
+            f" {row['baseline']:>10.2f} -> {row['candidate']:>10.2f}  {row['change_pct']:+7.1f}%"
+        )
+    regressions = sum(row["regressed"] for row in rows)
+    if regressions:
+        print(f"❌ {regressions} regression(s) beyond {args.threshold:g}%")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.threshold:g}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the two hot calls of the generation pipeline:
+
+    generate   GeneratorService._generate_image_from_prompt with the
+               placeholder backend (render cost) and the fake backend behind
+               the router (routing overhead plus the configured latency)
+    upload     MinioStorageProvider.upload (buffered) against upload_stream
+               (bounded pipe fed by a producer thread) on the moto S3 stand-in;
+               RSS figures include the stand-in, which keeps objects in memory
+
+    python -m benchmarks.micro generate --concurrency 1,8 --requests 100
+    python -m benchmarks.micro upload --sizes 1048576,16777216 --json upload.json
+"""
+import argparse
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, List
+
+from .common import BUCKET, RssSampler, start_s3_stand_in, summarize, write_report
+
+
+async def _bench_generate(service, requests: int, concurrency: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one(i: int) -> float:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            if await service._generate_image_from_prompt(f"micro benchmark prompt {i}") is None:
+                failures += 1
+            return time.perf_counter() - start
+
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+    return {**summarize(list(latencies), elapsed), **rss.stats(), "failures": failures}
+
+
+def _run_generate(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    os.environ.setdefault("GEMINI_API_KEY", "unused")
+    for name in ("OBJECT_STORAGE_ENDPOINT", "OBJECT_STORAGE_BUCKET", "OBJECT_STORAGE_ACCESS_KEY", "OBJECT_STORAGE_SECRET_KEY"):
+        os.environ.setdefault(name, "unused")
+
+    from app.model_backends.fake import FakeModelBackend
+    from app.model_backends.placeholder import PlaceholderModelBackend
+    from app.model_backends.router import ModelBackendRouter
+    from app.services.generator import GeneratorService
+    from app.services.renderer import PlaceholderRenderer
+
+    async def run() -> List[Dict[str, Any]]:
+        renderer = PlaceholderRenderer()
+        backends = {
+            "placeholder": PlaceholderModelBackend(renderer, model_name="bench"),
+            "fake_router": ModelBackendRouter([
+                FakeModelBackend(
+                    renderer, name=f"fake:key{i}", latency_ms=args.latency_ms, latency_sigma=args.latency_sigma
+                )
+                for i in range(2)
+            ]),
+        }
+        results = []
+        try:
+            for name, backend in backends.items():
+                service = GeneratorService(storage_provider=None, renderer=renderer, model_backend=backend)
+                for concurrency in (int(c) for c in args.concurrency.split(",")):
+                    stats = await _bench_generate(service, args.requests, concurrency)
+                    results.append({"call": "generate", "backend": name, "concurrency": concurrency, **stats})
+        finally:
+            renderer.shutdown()
+        return results
+
+    return asyncio.run(run())
+
+
+def _upload_buffered(provider, payload: bytes, object_name: str) -> None:
+    provider.upload(BytesIO(payload), BUCKET, object_name, content_type="application/octet-stream")
+
+
+def _upload_streamed(provider, payload: bytes, object_name: str) -> None:
+    from app.storage_providers.streaming import BoundedPipe
+
+    pipe = BoundedPipe()
+
+    def produce() -> None:
+        view = memoryview(payload)
+        try:
+            for offset in range(0, len(view), pipe.chunk_size):
+                pipe.write(view[offset:offset + pipe.chunk_size])
+            pipe.finish()
+        except BrokenPipeError:
+            pass
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        provider.upload_stream(pipe, BUCKET, object_name, content_type="application/octet-stream")
+    finally:
+        pipe.cancel()
+        producer.join()
+
+
+def _run_upload(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    server = start_s3_stand_in(args.port)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    from app.storage_providers.minio import MinioStorageProvider
+
+    results = []
+    try:
+        provider = MinioStorageProvider()
+        for size in (int(s) for s in args.sizes.split(",")):
+            payload = os.urandom(size)
+            for method, upload in (("upload", _upload_buffered), ("upload_stream", _upload_streamed)):
+                for concurrency in (int(c) for c in args.concurrency.split(",")):
+                    def one(i: int) -> float:
+                        start = time.perf_counter()
+                        upload(provider, payload, f"micro/{method}/{size}/{i}")
+                        return time.perf_counter() - start
+
+                    with RssSampler() as rss:
+                        start = time.perf_counter()
+                        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                            latencies = list(pool.map(one, range(args.requests)))
+                        elapsed = time.perf_counter() - start
+                    results.append({
+                        "call": method,
+                        "size": size,
+                        "concurrency": concurrency,
+                        **summarize(latencies, elapsed),
+                        **rss.stats(),
+                    })
+    finally:
+        server.stop()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("target", choices=("generate", "upload"))
+    parser.add_argument("--concurrency", default="1,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Calls per measurement")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Median fake model latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="Log-normal spread of the latency")
+    parser.add_argument("--sizes", default="1048576,16777216", help="Comma-separated upload sizes in bytes")
+    parser.add_argument("--port", type=int, default=5077, help="Port of the S3 stand-in")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = _run_generate(args) if args.target == "generate" else _run_upload(args)
+    print(f"📊 Micro-benchmark: {args.target}")
+    write_report(f"micro_{args.target}", results, args.json_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Load-test the API in-process, with the fake model backend and a local
+object store (a temp directory, or the moto S3 stand-in with --storage s3).
+
+Each scenario drives the ASGI app directly through httpx, so no server,
+model key or object store needs to be running:
+
+    generate_unique   POST /generate, a new prompt per request (full pipeline)
+    generate_cached   POST /generate, one repeated prompt (prompt cache hits)
+    batch             POST /generate/batch, --batch-size new prompts per request
+    lookup            GET /generation/{id} for previously generated images
+
+    python -m benchmarks.scenarios --scenarios generate_unique,lookup --concurrency 1,16,64
+    python -m benchmarks.scenarios --latency-ms 800 --latency-sigma 0.8 --slow-rate 0.02 --json run.json
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List
+
+from .common import RssSampler, start_s3_stand_in, summarize, write_report
+
+SCENARIOS = ("generate_unique", "generate_cached", "batch", "lookup")
+
+
+def _configure_app_env(args: argparse.Namespace, storage_root: str) -> None:
+    """Must run before anything under `app` is imported: settings are read once."""
+    os.environ.update(
+        MODEL_BACKENDS="fake",
+        FAKE_MODEL_LATENCY_MS=str(args.latency_ms),
+        FAKE_MODEL_LATENCY_SIGMA=str(args.latency_sigma),
+        FAKE_MODEL_SLOW_RATE=str(args.slow_rate),
+        FAKE_MODEL_SLOW_FACTOR=str(args.slow_factor),
+        FAKE_MODEL_ERROR_RATE=str(args.error_rate),
+        STREAMING_UPLOAD_ENABLED=str(args.streaming).lower(),
+        CONCURRENCY_LIMITER_ENABLED=str(not args.no_limiter).lower(),
+        PUBLIC_BASE_URL="http://bench",
+    )
+    os.environ.setdefault("GEMINI_API_KEY", "unused")
+    if args.storage == "local":
+        os.environ.update(STORAGE_PROVIDER="local", LOCAL_STORAGE_ROOT=storage_root)
+        for name in ("OBJECT_STORAGE_ENDPOINT", "OBJECT_STORAGE_ACCESS_KEY", "OBJECT_STORAGE_SECRET_KEY"):
+            os.environ.setdefault(name, "unused")
+        os.environ.setdefault("OBJECT_STORAGE_BUCKET", "bench-images")
+
+
+async def _drive(
+    request: Callable[[int], Awaitable[int]], requests: int, concurrency: int
+) -> Dict[str, Any]:
+    """Run `request(i)` for i in range(requests), `concurrency` at a time."""
+    statuses: Counter = Counter()
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                status = await request(i)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[str(status)] += 1
+
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {**summarize(latencies, elapsed), **rss.stats(), "statuses": dict(statuses)}
+
+
+async def _run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    import httpx
+
+    from app.main import app
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results: List[Dict[str, Any]] = []
+    async with app.router.lifespan_context(app):
+        await app.state.container.wait_ready(60)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1", timeout=300) as client:
+            run_id = f"{time.time_ns():x}"
+
+            async def generate(prompt: str) -> httpx.Response:
+                return await client.post("/generate", json={"prompt": prompt})
+
+            # Seed the cached prompt and the generations looked up later
+            await generate(f"benchmark cached prompt {run_id}")
+            lookup_ids = []
+            for i in range(args.lookup_pool):
+                response = await generate(f"benchmark lookup prompt {run_id} {i}")
+                if response.status_code == 200:
+                    lookup_ids.append(response.json()["generation_id"])
+
+            for scenario in args.scenarios.split(","):
+                for concurrency in (int(c) for c in args.concurrency.split(",")):
+                    tag = f"{run_id}-{scenario}-{concurrency}"
+                    if scenario == "generate_unique":
+                        async def request(i: int) -> int:
+                            return (await generate(f"benchmark unique prompt {tag} {i}")).status_code
+                    elif scenario == "generate_cached":
+                        async def request(i: int) -> int:
+                            return (await generate(f"benchmark cached prompt {run_id}")).status_code
+                    elif scenario == "batch":
+                        async def request(i: int) -> int:
+                            items = [
+                                {"prompt": f"benchmark batch prompt {tag} {i} {j}"}
+                                for j in range(args.batch_size)
+                            ]
+                            return (await client.post("/generate/batch", json={"items": items})).status_code
+                    elif scenario == "lookup":
+                        if not lookup_ids:
+                            raise SystemExit("❌ No generations to look up: seeding failed")
+
+                        async def request(i: int) -> int:
+                            generation_id = lookup_ids[i % len(lookup_ids)]
+                            return (await client.get(f"/generation/{generation_id}")).status_code
+                    else:
+                        raise SystemExit(f"❌ Unknown scenario: {scenario} (choose from {', '.join(SCENARIOS)})")
+
+                    stats = await _drive(request, args.requests, concurrency)
+                    results.append({"scenario": scenario, "concurrency": concurrency, **stats})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--batch-size", type=int, default=10, help="Prompts per batch request")
+    parser.add_argument("--lookup-pool", type=int, default=20, help="Generations created for the lookup scenario")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Median fake model latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of the latency")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of calls in the slow mode")
+    parser.add_argument("--slow-factor", type=float, default=10.0, help="Latency multiplier of the slow mode")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake model calls that fail")
+    parser.add_argument("--storage", choices=("local", "s3"), default="local")
+    parser.add_argument("--streaming", action="store_true", help="Enable the streaming upload pipeline")
+    parser.add_argument("--no-limiter", action="store_true", help="Disable load shedding (measure saturation)")
+    parser.add_argument("--port", type=int, default=5077, help="Port of the S3 stand-in")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    server = start_s3_stand_in(args.port) if args.storage == "s3" else None
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-objects-") as storage_root:
+            _configure_app_env(args, storage_root)
+            results = asyncio.run(_run(args))
+    finally:
+        if server is not None:
+            server.stop()
+
+    print("📊 API scenarios")
+    write_report("scenarios", results, args.json_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark storage provider uploads against a local S3 stand-in (moto).
+
+Compares MinioStorageProvider, S3StorageProvider and AsyncS3StorageProvider
+at several concurrency levels and object sizes. Requires `moto[server]`.
+
+    python -m benchmarks.storage_providers --sizes 65536,1048576 --concurrency 1,8,32
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, List
+
+from .common import BUCKET, start_s3_stand_in, summarize, write_report
+
+
+def _bench_sync(provider, payload: bytes, requests: int, concurrency: int) -> Dict[str, float]:
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        provider.upload(BytesIO(payload), BUCKET, f"sync/{i}.png", content_type="image/png")
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def _bench_async(provider, payload: bytes, requests: int, concurrency: int) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            await provider.upload(BytesIO(payload), BUCKET, f"async/{i}.png", content_type="image/png")
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize(list(latencies), time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="65536,1048576", help="Comma-separated object sizes in bytes")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Uploads per scenario")
+    parser.add_argument("--providers", default="minio,s3,async_s3")
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    server = start_s3_stand_in(args.port)
+
+    from app.core.config import settings
+    from app.storage_providers.async_s3 import AsyncS3StorageProvider
+    from app.storage_providers.minio import MinioStorageProvider
+    from app.storage_providers.s3 import S3StorageProvider
+
+    results: List[Dict[str, Any]] = []
+    try:
+        providers = args.providers.split(",")
+        for size in (int(s) for s in args.sizes.split(",")):
+            payload = os.urandom(size)
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                for name in providers:
+                    if name == "minio":
+                        stats = _bench_sync(MinioStorageProvider(), payload, args.requests, concurrency)
+                    elif name == "s3":
+                        provider = S3StorageProvider(
+                            settings.OBJECT_STORAGE_ENDPOINT,
+                            settings.OBJECT_STORAGE_ACCESS_KEY,
+                            settings.OBJECT_STORAGE_SECRET_KEY,
+                            secure=False,
+                            bucket=BUCKET,
+                            max_pool_connections=max(10, concurrency),
+                        )
+                        stats = _bench_sync(provider, payload, args.requests, concurrency)
+                    elif name == "async_s3":
+                        async def run() -> Dict[str, float]:
+                            provider = AsyncS3StorageProvider(
+                                settings.OBJECT_STORAGE_ENDPOINT,
+                                settings.OBJECT_STORAGE_ACCESS_KEY,
+                                settings.OBJECT_STORAGE_SECRET_KEY,
+                                secure=False,
+                                max_connections=max(10, concurrency),
+                            )
+                            try:
+                                await provider.ensure_bucket(BUCKET)
+                                return await _bench_async(provider, payload, args.requests, concurrency)
+                            finally:
+                                await provider.aclose()
+                        stats = asyncio.run(run())
+                    else:
+                        raise SystemExit(f"❌ Unknown provider: {name}")
+                    results.append({"provider": name, "size": size, "concurrency": concurrency, **stats})
+    finally:
+        server.stop()
+
+    print("📊 Storage upload benchmark")
+    write_report("storage_providers", results, args.json_path)
+
+
+if __name__ == "__main__":
+    main()
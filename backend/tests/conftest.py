@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+import httpx
+import pytest_asyncio
+
+# Settings are read when `app.core.config` is first imported, so the
+# required ones get local, offline values before any test module loads.
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ.setdefault("OBJECT_STORAGE_ENDPOINT", "localhost:9000")
+os.environ.setdefault("OBJECT_STORAGE_BUCKET", "test-bucket")
+os.environ.setdefault("OBJECT_STORAGE_ACCESS_KEY", "test-access-key")
+os.environ.setdefault("OBJECT_STORAGE_SECRET_KEY", "test-secret-key")
+os.environ.setdefault("USE_HTTPS", "false")
+os.environ.setdefault("STORAGE_PROVIDER", "local")
+os.environ.setdefault("LOCAL_STORAGE_ROOT", tempfile.mkdtemp(prefix="storage-"))
+os.environ.setdefault("PUBLIC_BASE_URL", "http://testserver")
+os.environ.setdefault("MODEL_BACKENDS", "fake")
+os.environ.setdefault("FAKE_MODEL_LATENCY_MS", "10")
+os.environ.setdefault("FAKE_MODEL_LATENCY_SIGMA", "0")
+
+
+from app.job_queues.sqlite import SqliteJobQueue  # noqa: E402
+from app.model_backends.fake import FakeModelBackend  # noqa: E402
+from app.repositories.sqlite import SqliteGenerationRepository  # noqa: E402
+from app.services.generator import GeneratorService  # noqa: E402
+from app.services.renderer import PlaceholderRenderer  # noqa: E402
+from app.services.worker_pool import GenerationWorkerPool  # noqa: E402
+from app.storage_providers.local import LocalFilesystemStorageProvider  # noqa: E402
+
+
+class Process:
+    """
+    One API or worker process sharing the job queue and generation store
+    files with the others, as with WORKER_MODE=external.
+    """
+
+    def __init__(self, tmp_path, *, consume: bool, latency_ms: float = 5, **pool_options):
+        self.queue = SqliteJobQueue(str(tmp_path / "jobs.db"))
+        self.repository = SqliteGenerationRepository(str(tmp_path / "generations.db"), flush_interval=0.01)
+        renderer = PlaceholderRenderer()
+        self.backend = FakeModelBackend(renderer, latency_ms=latency_ms, latency_sigma=0)
+        self.service = GeneratorService(
+            LocalFilesystemStorageProvider(str(tmp_path / "objects"), "http://testserver/files"),
+            repository=self.repository,
+            renderer=renderer,
+            model_backend=self.backend,
+        )
+        pool_options.setdefault("concurrency", 2)
+        pool_options.setdefault("poll_interval", 0.02)
+        self.pool = GenerationWorkerPool(
+            lambda: self.service,
+            max_queue_size=100,
+            job_queue=self.queue,
+            consume=consume,
+            **pool_options,
+        )
+
+    async def close(self) -> None:
+        await self.pool.stop(timeout=1)
+        self.repository.close()
+        self.queue.close()
+
+
+@pytest_asyncio.fixture
+async def processes(tmp_path):
+    started = []
+
+    async def start(**options) -> Process:
+        process = Process(tmp_path, **options)
+        await process.pool.start()
+        started.append(process)
+        return process
+
+    yield start
+    for process in reversed(started):
+        await process.close()
+
+
+@pytest_asyncio.fixture
+async def client():
+    """An HTTP client for the app, started with the settings above."""
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        assert await app.state.container.wait_ready(10)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as http_client:
+            yield http_client
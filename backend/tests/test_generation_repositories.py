@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from app.models.generation import GenerationStatus, ImageGeneration
+from app.repositories.sqlite import SqliteGenerationRepository
+
+
+def _generation() -> ImageGeneration:
+    return ImageGeneration(generation_id="gen_test", prompt="a quiet mountain lake")
+
+
+def test_buffered_writes_are_readable_before_they_are_flushed(tmp_path):
+    repository = SqliteGenerationRepository(str(tmp_path / "generations.db"), flush_interval=60)
+    repository.save(_generation())
+
+    assert repository.get("gen_test").prompt == "a quiet mountain lake"
+    repository.close()
+
+
+def test_stale_buffered_write_does_not_replace_a_newer_record(tmp_path):
+    path = str(tmp_path / "generations.db")
+    api = SqliteGenerationRepository(path, flush_interval=60)
+    worker = SqliteGenerationRepository(path, flush_interval=60)
+    pending = _generation()
+    completed = pending.model_copy(update={
+        "status": GenerationStatus.COMPLETED,
+        "image_url": "http://testserver/files/gen_test.png",
+        "updated_at": pending.updated_at + timedelta(seconds=1),
+    })
+
+    api.save(pending)
+    worker.save(completed)
+    worker.flush()
+    api.flush()
+
+    for repository in (api, worker):
+        assert repository.get("gen_test").status == GenerationStatus.COMPLETED
+    api.close()
+    worker.close()
@@ -0,0 +1,62 @@
+import pytest
+
+PROMPT = "a greenhouse full of ferns"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("created_before", ["2030-01-01T00:00:00", "2030-01-01T02:00:00+02:00"])
+async def test_list_accepts_naive_and_offset_created_before(client, created_before):
+    created = (await client.post("/api/v1/generate", json={"prompt": PROMPT})).json()
+
+    response = await client.get("/api/v1/generations", params={"created_before": created_before})
+
+    assert response.status_code == 200
+    assert created["generation_id"] in [item["generation_id"] for item in response.json()["items"]]
+
+
+@pytest.mark.asyncio
+async def test_list_excludes_generations_created_after_the_cursor(client):
+    await client.post("/api/v1/generate", json={"prompt": PROMPT})
+
+    response = await client.get("/api/v1/generations", params={"created_before": "2000-01-01T00:00:00"})
+
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_event_stream_releases_its_subscription(client):
+    from app.main import app
+
+    created = (await client.post("/api/v1/generate", json={"prompt": PROMPT})).json()
+
+    response = await client.get(f"/api/v1/generation/{created['generation_id']}/events")
+
+    assert response.status_code == 200
+    assert "event: completed" in response.text
+    assert app.state.container.event_bus._subscriptions == {}
+
+
+@pytest.mark.asyncio
+async def test_image_urls_are_reissued_on_read(client, monkeypatch):
+    from app.core.config import settings
+    from app.main import app
+
+    container = app.state.container
+    created = (await client.post("/api/v1/generate", json={"prompt": PROMPT})).json()
+    monkeypatch.setattr(settings, "IMAGE_URL_EXPIRES_SECONDS", 600)
+    monkeypatch.setattr(
+        container.storage_provider,
+        "get_public_url",
+        lambda bucket, object_name, *, expires_seconds=None: f"signed://{object_name}?expires={expires_seconds}",
+    )
+
+    listed = (await client.get("/api/v1/generations")).json()["items"]
+    detail = (await client.get(f"/api/v1/generation/{created['generation_id']}")).json()
+
+    [item] = [item for item in listed if item["generation_id"] == created["generation_id"]]
+    for response in (item, detail):
+        assert response["image_url"] == response["variants"][0]["url"]
+        assert all(variant["url"].startswith("signed://") for variant in response["variants"])
+        assert response["image_url"].endswith("?expires=600")
+    assert container.repository.get(created["generation_id"]).image_url == created["image_url"]
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import time
+
+import pytest
+
+from app.utils import id_generator
+from app.utils.id_generator import generate_unique_id, generate_unique_ids, id_timestamp
+
+
+def test_ids_are_lowercase_ulids_with_prefix():
+    unique_id = generate_unique_id(prefix="gen")
+
+    prefix, encoded = unique_id.split("_")
+    assert prefix == "gen"
+    assert len(encoded) == 26
+    assert encoded == encoded.lower()
+
+
+def test_ids_increase_strictly_within_a_process():
+    ids = [generate_unique_id() for _ in range(10_000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_batches_are_consecutive_and_ordered_with_single_ids():
+    before = generate_unique_id()
+    batch = generate_unique_ids(500)
+    after = generate_unique_id()
+
+    assert len(set(batch)) == 500
+    assert [before, *batch, after] == sorted([before, *batch, after])
+
+
+def test_ids_stay_ordered_when_the_clock_steps_back(monkeypatch):
+    first = generate_unique_id()
+    past_ns = time.time_ns() - 60 * 1_000_000_000
+    monkeypatch.setattr(id_generator, "time", SimpleNamespace(time_ns=lambda: past_ns))
+
+    assert generate_unique_id() > first
+
+
+def test_ids_are_unique_across_threads():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        batches = list(pool.map(lambda _: [generate_unique_id() for _ in range(2_000)], range(8)))
+
+    ids = [unique_id for batch in batches for unique_id in batch]
+    assert len(set(ids)) == len(ids)
+    assert all(batch == sorted(batch) for batch in batches)
+
+
+def test_id_timestamp_round_trips_creation_time():
+    created_at = id_timestamp(generate_unique_id(prefix="gen"))
+
+    assert abs(created_at - datetime.now(timezone.utc)) < timedelta(seconds=5)
+
+
+@pytest.mark.parametrize("unique_id", ["gen_abc", "img_" + "u" * 26, "0123456789abcdef0123456789abcdef"])
+def test_id_timestamp_rejects_other_ids(unique_id):
+    with pytest.raises(ValueError):
+        id_timestamp(unique_id)
@@ -0,0 +1,177 @@
+import asyncio
+
+import pytest
+
+from app.job_queues.base import JobState
+from app.models.generation import GenerationStatus
+from app.services.idempotency import (
+    IdempotencyKeyReusedError,
+    IdempotencyStore,
+    StoredResponse,
+    request_fingerprint,
+)
+
+
+def _counting(status_code: int = 200, *, final: bool = True, delay: float = 0.0):
+    calls = []
+
+    async def fn() -> StoredResponse:
+        calls.append(None)
+        await asyncio.sleep(delay)
+        return StoredResponse(status_code=status_code, content={"call": len(calls)}, final=final)
+
+    return fn, calls
+
+
+@pytest.mark.asyncio
+async def test_completed_response_is_replayed():
+    store = IdempotencyStore()
+    fn, calls = _counting()
+
+    first, first_replayed = await store.run("key", "fp", fn)
+    second, second_replayed = await store.run("key", "fp", fn)
+
+    assert len(calls) == 1
+    assert (first_replayed, second_replayed) == (False, True)
+    assert second.content == first.content
+    assert store.stats()["replays"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_join_the_request_in_flight():
+    store = IdempotencyStore()
+    fn, calls = _counting(delay=0.02)
+
+    results = await asyncio.gather(*(store.run("key", "fp", fn) for _ in range(3)))
+
+    assert len(calls) == 1
+    assert sorted(replayed for _, replayed in results) == [False, True, True]
+    assert store.stats()["joins"] == 2
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_another_request_is_rejected():
+    store = IdempotencyStore()
+    fn, _ = _counting()
+    await store.run("key", "fp", fn)
+
+    with pytest.raises(IdempotencyKeyReusedError):
+        await store.run("key", "other-fp", fn)
+
+
+@pytest.mark.asyncio
+async def test_failed_requests_are_not_recorded():
+    store = IdempotencyStore()
+
+    async def failing() -> StoredResponse:
+        raise RuntimeError("shed")
+
+    with pytest.raises(RuntimeError):
+        await store.run("key", "fp", failing)
+    fn, calls = _counting()
+    _, replayed = await store.run("key", "fp", fn)
+
+    assert len(calls) == 1 and not replayed
+
+
+@pytest.mark.asyncio
+async def test_non_final_responses_are_not_recorded():
+    store = IdempotencyStore()
+    fn, calls = _counting(202, final=False)
+
+    await store.run("key", "fp", fn)
+    _, replayed = await store.run("key", "fp", fn)
+
+    assert len(calls) == 2 and not replayed
+
+
+@pytest.mark.asyncio
+async def test_request_outlives_a_disconnected_caller():
+    store = IdempotencyStore()
+    fn, calls = _counting(delay=0.05)
+
+    caller = asyncio.create_task(store.run("key", "fp", fn))
+    await asyncio.sleep(0.01)
+    caller.cancel()
+    await asyncio.sleep(0.1)
+    response, replayed = await store.run("key", "fp", fn)
+
+    assert len(calls) == 1
+    assert replayed and response.content == {"call": 1}
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_are_evicted_least_recently_used_first():
+    store = IdempotencyStore(ttl_seconds=0.05, max_entries=2)
+    fn, calls = _counting()
+    for key in ("a", "b", "c"):
+        await store.run(key, "fp", fn)
+    assert store.stats()["evictions"] == 1
+
+    _, replayed = await store.run("a", "fp", fn)
+    assert not replayed
+
+    await asyncio.sleep(0.1)
+    _, replayed = await store.run("c", "fp", fn)
+    assert not replayed
+    assert len(calls) == 5
+
+
+def test_fingerprint_ignores_key_order():
+    assert request_fingerprint({"a": 1, "b": [1, 2]}) == request_fingerprint({"b": [1, 2], "a": 1})
+    assert request_fingerprint({"a": 1}) != request_fingerprint({"a": 2})
+
+
+@pytest.mark.asyncio
+async def test_generate_replays_and_rejects_reused_keys(client):
+    body = {"prompt": "a lighthouse at dusk, oil painting"}
+    headers = {"Idempotency-Key": "test-generate-key"}
+
+    first = await client.post("/api/v1/generate", json=body, headers=headers)
+    retry = await client.post("/api/v1/generate", json=body, headers=headers)
+    reused = await client.post(
+        "/api/v1/generate", json={"prompt": "a different prompt entirely"}, headers=headers
+    )
+
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["generation_id"] == first.json()["generation_id"]
+    assert reused.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_queue_key_reused_for_another_request_is_rejected_in_any_process(processes):
+    first, second = await processes(consume=False), await processes(consume=False)
+
+    original = await first.pool.submit("a quiet harbour", idempotency_key="key", fingerprint="fp")
+    retried = await second.pool.submit("a quiet harbour", idempotency_key="key", fingerprint="fp")
+    with pytest.raises(IdempotencyKeyReusedError):
+        await second.pool.submit("a busy harbour", idempotency_key="key", fingerprint="other-fp")
+
+    assert retried.generation_id == original.generation_id
+
+
+@pytest.mark.asyncio
+async def test_retrying_a_dead_lettered_request_runs_it_again(processes):
+    api = await processes(consume=False, max_attempts=1)
+    worker = await processes(consume=True)
+    worker.backend.error_rate = 1.0
+
+    async def dead_lettered() -> None:
+        while api.queue.counts()[JobState.DEAD] == 0:
+            await asyncio.sleep(0.01)
+
+    original = await api.pool.submit("a quiet harbour", idempotency_key="key", fingerprint="fp")
+    await asyncio.wait_for(dead_lettered(), 5)
+    failed = await api.pool.wait_for(original.generation_id, 1)
+    assert failed.status == GenerationStatus.FAILED
+
+    worker.backend.error_rate = 0.0
+    retried = await api.pool.submit("a quiet harbour", idempotency_key="key", fingerprint="fp")
+    finished = await api.pool.wait_for(original.generation_id, 5)
+
+    assert retried.generation_id == original.generation_id
+    assert retried.status == GenerationStatus.PENDING
+    assert finished.status == GenerationStatus.COMPLETED
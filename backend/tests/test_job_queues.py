@@ -0,0 +1,144 @@
+import time
+
+import fakeredis
+import pytest
+
+from app.job_queues.base import JobState
+from app.job_queues.memory import InMemoryJobQueue
+from app.job_queues.redis import RedisJobQueue
+from app.job_queues.sqlite import SqliteJobQueue
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def queue(request, tmp_path):
+    if request.param == "memory":
+        job_queue = InMemoryJobQueue()
+    elif request.param == "sqlite":
+        job_queue = SqliteJobQueue(str(tmp_path / "jobs.db"))
+    else:
+        job_queue = RedisJobQueue(fakeredis.FakeRedis(decode_responses=True), namespace="test-jobs")
+    yield job_queue
+    job_queue.close()
+
+
+def test_enqueue_is_idempotent_per_key(queue):
+    job, created = queue.enqueue({"prompt": "a"}, idempotency_key="key-1")
+    again, created_again = queue.enqueue({"prompt": "b"}, idempotency_key="key-1")
+    other, created_other = queue.enqueue({"prompt": "a"}, idempotency_key="key-2")
+
+    assert created and not created_again and created_other
+    assert again.job_id == job.job_id
+    assert again.payload == {"prompt": "a"}
+    assert other.job_id != job.job_id
+    assert queue.depth() == 2
+
+
+def test_lease_hands_each_job_to_one_worker_oldest_first(queue):
+    ids = [queue.enqueue({"n": n})[0].job_id for n in range(3)]
+
+    first = queue.lease("worker-a", lease_seconds=30, limit=2)
+    second = queue.lease("worker-b", lease_seconds=30, limit=2)
+
+    assert [job.job_id for job in first] == ids[:2]
+    assert [job.job_id for job in second] == ids[2:]
+    assert queue.lease("worker-c", lease_seconds=30) == []
+    assert all(job.state == JobState.LEASED and job.attempts == 1 for job in first + second)
+    assert queue.counts()[JobState.LEASED] == 3
+
+
+def test_expired_lease_is_taken_over_and_old_holder_cannot_settle(queue):
+    queue.enqueue({"prompt": "a"})
+    (stale,) = queue.lease("worker-a", lease_seconds=0.05)
+    time.sleep(0.1)
+
+    (current,) = queue.lease("worker-b", lease_seconds=30)
+
+    assert current.job_id == stale.job_id
+    assert current.attempts == 2
+    assert current.leased_by == "worker-b"
+    assert not queue.extend(stale, 30)
+    assert not queue.ack(stale)
+    assert not queue.retry(stale, "late")
+    assert not queue.dead_letter(stale, "late")
+    assert queue.ack(current)
+    assert queue.get(current.job_id).state == JobState.DONE
+
+
+def test_extended_lease_is_not_taken_over(queue):
+    queue.enqueue({"prompt": "a"})
+    (job,) = queue.lease("worker-a", lease_seconds=0.05)
+
+    assert queue.extend(job, 30)
+    time.sleep(0.1)
+    assert queue.lease("worker-b", lease_seconds=30) == []
+
+
+def test_retry_delays_the_next_lease(queue):
+    queue.enqueue({"prompt": "a"})
+    (job,) = queue.lease("worker-a", lease_seconds=30)
+
+    assert queue.retry(job, "boom", delay_seconds=0.1)
+    assert queue.lease("worker-a", lease_seconds=30) == []
+    time.sleep(0.15)
+    (again,) = queue.lease("worker-a", lease_seconds=30)
+
+    assert again.job_id == job.job_id
+    assert again.attempts == 2
+    assert again.last_error == "boom"
+
+
+def test_leases_count_towards_exhaustion(queue):
+    queue.enqueue({"prompt": "a"}, max_attempts=1)
+    (job,) = queue.lease("worker-a", lease_seconds=30)
+    assert not job.exhausted
+
+    queue.retry(job, "boom")
+    (job,) = queue.lease("worker-a", lease_seconds=30)
+    assert job.exhausted
+
+
+def test_dead_letters_are_kept_and_can_be_requeued(queue):
+    job, _ = queue.enqueue({"prompt": "a"})
+    (leased,) = queue.lease("worker-a", lease_seconds=30)
+
+    assert queue.dead_letter(leased, "gave up")
+    assert queue.lease("worker-a", lease_seconds=30) == []
+    (dead,) = queue.dead_letters()
+    assert dead.job_id == job.job_id
+    assert dead.state == JobState.DEAD
+    assert dead.last_error == "gave up"
+
+    assert queue.requeue(job.job_id)
+    assert not queue.requeue(job.job_id)
+    assert queue.dead_letters() == []
+    (again,) = queue.lease("worker-a", lease_seconds=30)
+    assert again.attempts == 1
+
+
+def test_requeue_ignores_unknown_and_live_jobs(queue):
+    job, _ = queue.enqueue({"prompt": "a"})
+
+    assert not queue.requeue("job_unknown")
+    assert not queue.requeue(job.job_id)
+
+
+def test_purge_deletes_finished_jobs_and_frees_their_keys(queue):
+    job, _ = queue.enqueue({"prompt": "a"}, idempotency_key="key-1")
+    queue.enqueue({"prompt": "b"})
+    (leased,) = queue.lease("worker-a", lease_seconds=30)
+    queue.ack(leased)
+
+    assert queue.purge(time.time() + 1) == 1
+    assert queue.get(job.job_id) is None
+    again, created = queue.enqueue({"prompt": "a"}, idempotency_key="key-1")
+    assert created and again.job_id != job.job_id
+
+
+def test_heartbeats_expire_and_can_be_withdrawn(queue):
+    queue.record_heartbeat("worker-a", {"worker_id": "worker-a"}, ttl_seconds=30)
+    queue.record_heartbeat("worker-b", {"worker_id": "worker-b"}, ttl_seconds=0.05)
+    time.sleep(0.1)
+
+    assert queue.heartbeats() == [{"worker_id": "worker-a"}]
+    queue.remove_heartbeat("worker-a")
+    assert queue.heartbeats() == []
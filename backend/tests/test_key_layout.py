@@ -0,0 +1,48 @@
+import pytest
+
+from app.storage_providers.key_layout import DatePrefixKeyLayout, FlatKeyLayout, HashPrefixKeyLayout
+from app.utils.id_generator import generate_unique_id, id_timestamp
+
+# Prompt cache address (sha256 hex) and a generation ID from before time-ordered IDs
+CACHE_ADDRESS = "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+LEGACY_ID = "gen_1a2b3c4d"
+
+
+def test_flat_layout_keeps_the_base_name():
+    assert FlatKeyLayout().key("gen_abc") == "gen_abc"
+    assert FlatKeyLayout("tenant-a/").key("gen_abc") == "tenant-a/gen_abc"
+
+
+@pytest.mark.parametrize("levels", [1, 2, 3])
+def test_hash_layout_adds_one_two_hex_shard_per_level(levels):
+    layout = HashPrefixKeyLayout("prod", levels=levels)
+    segments = layout.key("gen_abc").split("/")
+
+    assert segments[0] == "prod" and segments[-1] == "gen_abc"
+    shards = segments[1:-1]
+    assert len(shards) == levels
+    assert all(len(shard) == 2 and int(shard, 16) >= 0 for shard in shards)
+
+
+def test_hash_layout_is_stable_and_spreads_keys():
+    layout = HashPrefixKeyLayout()
+    keys = [layout.key(f"gen_{n}") for n in range(200)]
+
+    assert keys == [layout.key(f"gen_{n}") for n in range(200)]
+    assert len({key.split("/")[0] for key in keys}) > 100
+
+
+def test_date_layout_groups_generations_by_creation_day():
+    generation_id = generate_unique_id(prefix="gen")
+    created_at = id_timestamp(generation_id)
+
+    key = DatePrefixKeyLayout("prod").key(generation_id)
+
+    assert key == f"prod/{created_at:%Y/%m/%d}/{generation_id}"
+
+
+@pytest.mark.parametrize("base_name", [CACHE_ADDRESS, LEGACY_ID])
+def test_date_layout_shards_names_without_a_timestamp_under_shared(base_name):
+    key = DatePrefixKeyLayout(levels=1).key(base_name)
+
+    assert key == f"shared/{HashPrefixKeyLayout(levels=1).directories(base_name)[0]}/{base_name}"
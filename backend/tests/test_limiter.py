@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from app.services.limiter import AdaptiveConcurrencyLimiter, LimitExceededError, admission_wait
+
+
+async def _hold(limiter: AdaptiveConcurrencyLimiter, release: asyncio.Event) -> None:
+    async with limiter.acquire():
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_calls_beyond_the_limit_are_shed():
+    limiter = AdaptiveConcurrencyLimiter("test-shed", initial_limit=2, max_limit=2)
+    release = asyncio.Event()
+    holders = [asyncio.create_task(_hold(limiter, release)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(LimitExceededError) as excinfo:
+        async with limiter.acquire():
+            pass
+
+    assert excinfo.value.name == "test-shed"
+    assert excinfo.value.retry_after >= 1
+    release.set()
+    await asyncio.gather(*holders)
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_wait_queues_until_a_slot_frees():
+    limiter = AdaptiveConcurrencyLimiter("test-wait", initial_limit=1, max_limit=1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(limiter, release))
+    await asyncio.sleep(0)
+    asyncio.get_running_loop().call_later(0.05, release.set)
+
+    with admission_wait(2):
+        async with limiter.acquire():
+            assert limiter.in_flight == 1
+
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_admission_wait_gives_up_after_its_deadline():
+    limiter = AdaptiveConcurrencyLimiter("test-wait-timeout", initial_limit=1, max_limit=1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(limiter, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(LimitExceededError), admission_wait(0.05):
+        async with limiter.acquire():
+            pass
+
+    release.set()
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_queued_callers_all_run_as_slots_free():
+    limiter = AdaptiveConcurrencyLimiter("test-queue", initial_limit=2, max_limit=2)
+    peak = 0
+
+    async def call() -> None:
+        nonlocal peak
+        with admission_wait(5):
+            async with limiter.acquire():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(10)))
+
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_shrink_the_limit_multiplicatively():
+    limiter = AdaptiveConcurrencyLimiter("test-failure", initial_limit=10, backoff_ratio=0.5)
+
+    with pytest.raises(RuntimeError):
+        async with limiter.acquire():
+            raise RuntimeError("upstream failed")
+
+    assert limiter.limit == 5
+
+
+@pytest.mark.asyncio
+async def test_latency_above_the_baseline_shrinks_the_limit():
+    limiter = AdaptiveConcurrencyLimiter("test-latency", initial_limit=10, backoff_ratio=0.5, latency_slack=0.001)
+    for _ in range(5):
+        async with limiter.acquire():
+            pass
+    assert limiter.limit == 10
+
+    async with limiter.acquire():
+        await asyncio.sleep(0.05)
+
+    assert limiter.limit == 5
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_additively_while_in_use_up_to_the_maximum():
+    limiter = AdaptiveConcurrencyLimiter("test-growth", initial_limit=1, max_limit=3)
+
+    for _ in range(50):
+        async with limiter.acquire():
+            pass
+    assert limiter.limit == 2
+
+    release = asyncio.Event()
+    for _ in range(50):
+        holder = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+        async with limiter.acquire():
+            pass
+        release.set()
+        await holder
+        release.clear()
+    assert limiter.limit == 3
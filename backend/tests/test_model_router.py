@@ -0,0 +1,183 @@
+import asyncio
+import time
+
+import pytest
+
+from app.model_backends.base import ModelBackendError, ModelRateLimitedError
+from app.model_backends.fake import FakeModelBackend
+from app.model_backends.router import MIN_HEDGE_SAMPLES, ModelBackendRouter
+from app.models.generation import GenerationStatus, OutputOptions
+from app.services.cache import PromptResultCache, prompt_cache_key
+from app.services.generator import GeneratorService, render_params
+from app.services.rate_limiter import KeyGrant
+from app.services.renderer import PlaceholderRenderer
+from app.storage_providers.local import LocalFilesystemStorageProvider
+
+PROMPT = "a red fox in fresh snow"
+
+
+@pytest.fixture
+def renderer():
+    return PlaceholderRenderer()
+
+
+def _fake(renderer, name, **kwargs):
+    kwargs.setdefault("latency_ms", 5)
+    return FakeModelBackend(renderer, name=name, latency_sigma=0, seed=1, **kwargs)
+
+
+async def _calls(router, count, **kwargs):
+    for _ in range(count):
+        await router.generate_image(PROMPT, **kwargs)
+
+
+def test_router_needs_a_backend():
+    with pytest.raises(ValueError):
+        ModelBackendRouter([])
+
+
+def test_model_name_covers_every_routed_model(renderer):
+    same = ModelBackendRouter([_fake(renderer, "a"), _fake(renderer, "b")])
+    mixed = ModelBackendRouter([_fake(renderer, "a", model_name="m1"), _fake(renderer, "b", model_name="m2")])
+
+    assert same.model_name == "fake-model"
+    assert mixed.model_name == "m1+m2"
+    assert mixed.model_names == ["m1", "m2"]
+
+
+@pytest.mark.asyncio
+async def test_image_reports_the_model_that_drew_it(renderer):
+    on_a = _fake(renderer, "on-a", key_id="a", model_name="m1")
+    on_b = _fake(renderer, "on-b", key_id="b", model_name="m2")
+    router = ModelBackendRouter([on_a, on_b], seed=1)
+
+    image = await router.generate(PROMPT, grant=KeyGrant(key_id="b", api_key="secret", tokens=1))
+
+    assert image.data
+    assert image.model_name == "m2"
+
+
+@pytest.mark.asyncio
+async def test_renders_are_cached_under_the_model_that_drew_them(renderer, tmp_path):
+    m1, m2 = _fake(renderer, "a", model_name="m1"), _fake(renderer, "b", model_name="m2")
+    cache = PromptResultCache()
+    service = GeneratorService(
+        LocalFilesystemStorageProvider(str(tmp_path), "http://testserver/files"),
+        result_cache=cache,
+        renderer=renderer,
+        model_backend=ModelBackendRouter([m1, m2], seed=1),
+    )
+
+    first = await service.generate_and_store_image(PROMPT)
+    second = await service.generate_and_store_image(PROMPT)
+
+    drew, other = (m1, m2) if m1.calls else (m2, m1)
+    params = render_params(OutputOptions())
+    assert (drew.calls, other.calls) == (1, 0)
+    assert cache.get(prompt_cache_key(PROMPT, model=drew.model_name, params=params)) is not None
+    assert cache.get(prompt_cache_key(PROMPT, model=other.model_name, params=params)) is None
+    assert second.status == GenerationStatus.COMPLETED
+    assert second.image_url == first.image_url
+
+
+@pytest.mark.asyncio
+async def test_calls_prefer_the_faster_backend(renderer):
+    fast, slow = _fake(renderer, "fast", latency_ms=5), _fake(renderer, "slow", latency_ms=50)
+    router = ModelBackendRouter([fast, slow], seed=1)
+
+    await _calls(router, 30)
+
+    assert fast.calls > 3 * slow.calls
+    assert slow.calls >= 1
+
+
+@pytest.mark.asyncio
+async def test_calls_avoid_a_failing_backend(renderer):
+    healthy, failing = _fake(renderer, "healthy"), _fake(renderer, "failing", error_rate=1.0)
+    router = ModelBackendRouter([healthy, failing], seed=1)
+
+    failures = 0
+    for _ in range(30):
+        try:
+            await router.generate_image(PROMPT)
+        except ModelBackendError:
+            failures += 1
+
+    assert failures == failing.calls
+    assert failing.calls <= 5
+    assert router.stats()["failing"]["error_rate"] > router.stats()["healthy"]["error_rate"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_backend_is_benched(renderer):
+    healthy, limited = _fake(renderer, "healthy"), _fake(renderer, "limited", rate_limit_rate=1.0)
+    router = ModelBackendRouter([healthy, limited], seed=1)
+
+    for _ in range(10):
+        try:
+            await router.generate_image(PROMPT)
+        except ModelRateLimitedError:
+            pass
+
+    assert limited.calls == 1
+    assert router.stats()["limited"]["benched_for"] > 0
+
+
+@pytest.mark.asyncio
+async def test_every_backend_benched_raises_rate_limited(renderer):
+    router = ModelBackendRouter([_fake(renderer, "limited", rate_limit_rate=1.0)])
+    with pytest.raises(ModelRateLimitedError):
+        await router.generate_image(PROMPT)
+
+    with pytest.raises(ModelRateLimitedError) as excinfo:
+        await router.generate_image(PROMPT)
+    assert excinfo.value.retry_after > 0
+
+
+@pytest.mark.asyncio
+async def test_granted_key_selects_its_backends(renderer):
+    on_a, on_b = _fake(renderer, "on-a", key_id="a"), _fake(renderer, "on-b", key_id="b")
+    router = ModelBackendRouter([on_a, on_b], seed=1)
+
+    await _calls(router, 10, grant=KeyGrant(key_id="b", api_key="secret", tokens=1))
+
+    assert (on_a.calls, on_b.calls) == (0, 10)
+
+
+async def _train_hedging_router(renderer, **kwargs):
+    """A router whose primary is `fast` (with a trusted p95) and whose hedge target is `backup`."""
+    fast, backup = _fake(renderer, "fast", latency_ms=5), _fake(renderer, "backup", latency_ms=60)
+    router = ModelBackendRouter([fast, backup], hedge_min_delay=0.01, seed=1, **kwargs)
+    await _calls(router, 3 * MIN_HEDGE_SAMPLES)
+    router.hedging = True
+    assert fast.calls >= MIN_HEDGE_SAMPLES
+    return router, fast, backup
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_to_another_backend(renderer):
+    router, fast, backup = await _train_hedging_router(renderer)
+    fast.latency_ms = 2000
+    backup_calls = backup.calls
+
+    start = time.monotonic()
+    image = await router.generate_image(PROMPT)
+
+    assert image
+    assert time.monotonic() - start < 1.0
+    assert backup.calls == backup_calls + 1
+    await asyncio.sleep(0)
+    assert router.stats()["fast"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedges_are_capped_by_the_budget(renderer):
+    router, fast, backup = await _train_hedging_router(renderer, hedge_budget_ratio=0.0)
+    fast.latency_ms = 150
+    backup_calls, fast_calls = backup.calls, fast.calls
+
+    await _calls(router, 11)
+
+    # Only the hedges saved up while idle (MAX_HEDGE_TOKENS) are spent
+    assert fast.calls - fast_calls == 11
+    assert backup.calls - backup_calls == 10
@@ -0,0 +1,170 @@
+import asyncio
+import time
+from io import BytesIO
+from typing import List, Optional
+
+import pytest
+
+from app.services.limiter import LimitExceededError
+from app.services.generator import GeneratorService
+from app.services.resilience import CircuitBreaker, CircuitOpenError, CircuitState, ResiliencePolicy
+from app.storage_providers.local import LocalFilesystemStorageProvider
+
+
+class Flaky:
+    """An async call that fails `failures` times, then returns "ok"."""
+
+    def __init__(self, failures: int = 0, *, error: Optional[Exception] = None, delay: float = 0.0):
+        self.failures = failures
+        self.error = error or ConnectionError("dependency failed")
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test-open", failure_threshold=3, recovery_seconds=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert isinstance(excinfo.value, LimitExceededError)
+    assert 1 <= excinfo.value.retry_after <= 60
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker("test-probe", failure_threshold=1, recovery_seconds=0)
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker("test-reopen", failure_threshold=5, recovery_seconds=0.05)
+    for _ in range(5):
+        breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_idempotent_calls_are_retried():
+    policy = ResiliencePolicy("test-retry", max_attempts=3, backoff_base=0.001, seed=1)
+    flaky = Flaky(failures=2)
+
+    assert await policy.call(flaky) == "ok"
+    assert flaky.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_last_error_is_raised_once_attempts_are_spent():
+    policy = ResiliencePolicy("test-exhausted", max_attempts=2, backoff_base=0.001)
+    flaky = Flaky(failures=5)
+
+    with pytest.raises(ConnectionError):
+        await policy.call(flaky)
+    assert flaky.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_calls_are_attempted_once():
+    policy = ResiliencePolicy("test-once", max_attempts=3, backoff_base=0.001)
+    flaky = Flaky(failures=1)
+
+    with pytest.raises(ConnectionError):
+        await policy.call(flaky, idempotent=False)
+    assert flaky.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_each_attempt_gets_a_deadline():
+    policy = ResiliencePolicy("test-deadline", timeout_seconds=0.02, max_attempts=2, backoff_base=0.001)
+    slow = Flaky(delay=1.0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await policy.call(slow)
+    assert slow.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_are_answers_not_failures():
+    breaker = CircuitBreaker("test-answers", failure_threshold=1)
+    policy = ResiliencePolicy("test-answers", max_attempts=3, breaker=breaker, non_retryable=(KeyError,))
+    missing = Flaky(failures=1, error=KeyError("object"))
+
+    with pytest.raises(KeyError):
+        await policy.call(missing)
+    assert missing.calls == 1
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_calls_fast():
+    breaker = CircuitBreaker("test-fail-fast", failure_threshold=2, recovery_seconds=60)
+    policy = ResiliencePolicy("test-fail-fast", max_attempts=5, backoff_base=0.001, breaker=breaker)
+    failing = Flaky(failures=100)
+
+    with pytest.raises(CircuitOpenError):
+        await policy.call(failing)
+    assert failing.calls == 2
+
+    with pytest.raises(CircuitOpenError):
+        await policy.call(failing)
+    assert failing.calls == 2
+
+
+class SlowFirstUpload(LocalFilesystemStorageProvider):
+    """Local storage whose first upload stalls before reading its buffer."""
+
+    def __init__(self, root: str):
+        super().__init__(root, "http://testserver/files")
+        self.read_sizes: List[int] = []
+
+    def upload(self, file_object, bucket, object_name, *, content_type=None):
+        if not self.read_sizes:
+            self.read_sizes.append(-1)
+            time.sleep(0.1)
+            self.read_sizes[0] = len(file_object.read())
+        else:
+            self.read_sizes.append(len(file_object.read()))
+        return f"http://testserver/files/{bucket}/{object_name}"
+
+
+@pytest.mark.asyncio
+async def test_timed_out_upload_attempts_do_not_share_a_buffer(tmp_path):
+    storage = SlowFirstUpload(str(tmp_path))
+    service = GeneratorService(
+        storage,
+        storage_policy=ResiliencePolicy("test-upload", timeout_seconds=0.02, max_attempts=2, backoff_base=0.001),
+    )
+
+    _, size = await service._upload(BytesIO(b"x" * 1000), "bucket", "object.png", "image/png")
+    await asyncio.sleep(0.2)
+
+    assert size == 1000
+    assert storage.read_sizes == [1000, 1000]
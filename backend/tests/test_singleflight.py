@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_task():
+    flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+
+    async def fn() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*(flight.do("key", fn) for _ in range(5)))
+
+    assert results == [42] * 5
+    assert calls == 1
+    assert flight.coalesced == 4
+    assert flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_finished_calls_are_not_reused():
+    flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+
+    async def fn() -> int:
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flight.do("key", fn) == 1
+    assert await flight.do("key", fn) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight: SingleFlight[int] = SingleFlight()
+
+    async def fn() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(flight.do("key", fn) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_leaves_the_others_running():
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def fn() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leaving = asyncio.create_task(flight.do("key", fn))
+    staying = asyncio.create_task(flight.do("key", fn))
+    await asyncio.sleep(0.01)
+    leaving.cancel()
+
+    assert await staying == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await leaving
+
+
+@pytest.mark.asyncio
+async def test_task_is_cancelled_when_its_last_waiter_leaves():
+    flight: SingleFlight[str] = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def fn() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "done"
+
+    waiters = [asyncio.create_task(flight.do("key", fn)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0)
+    assert flight.in_flight == 0
@@ -0,0 +1,45 @@
+import asyncio
+import os
+import signal
+
+import pytest
+
+from app.core.config import settings
+from app.models.generation import GenerationStatus
+from app.worker import parse_args, run, worker_settings
+
+
+def test_flags_override_the_configured_settings():
+    config = worker_settings(parse_args(["--concurrency", "8", "--drain-timeout", "2.5"]), base=settings)
+
+    assert config.GENERATION_WORKER_CONCURRENCY == 8
+    assert config.WORKER_DRAIN_TIMEOUT_SECONDS == 2.5
+    assert config.RENDER_PROCESS_WORKERS == settings.RENDER_PROCESS_WORKERS
+    assert config.WORKER_HEARTBEAT_SECONDS == settings.WORKER_HEARTBEAT_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_queued_jobs_and_drains_on_sigterm(tmp_path, processes):
+    config = settings.model_copy(update={
+        "JOB_QUEUE_BACKEND": "sqlite",
+        "JOB_QUEUE_SQLITE_PATH": str(tmp_path / "jobs.db"),
+        "GENERATION_STORE_BACKEND": "sqlite",
+        "GENERATION_STORE_SQLITE_PATH": str(tmp_path / "generations.db"),
+        "GENERATION_STORE_FLUSH_INTERVAL": 0.01,
+        "LOCAL_STORAGE_ROOT": str(tmp_path / "objects"),
+        "JOB_POLL_INTERVAL_SECONDS": 0.02,
+        "WORKER_HEARTBEAT_SECONDS": 0.05,
+        "WORKER_DRAIN_TIMEOUT_SECONDS": 5.0,
+    })
+    api = await processes(consume=False)
+    worker = asyncio.create_task(run(config))
+
+    generation = await api.pool.submit("a lantern-lit harbour at night")
+    finished = await api.pool.wait_for(generation.generation_id, 10)
+    assert finished.status == GenerationStatus.COMPLETED
+    assert len(await api.pool.heartbeats()) == 1
+
+    os.kill(os.getpid(), signal.SIGTERM)
+    await asyncio.wait_for(worker, 10)
+
+    assert await api.pool.heartbeats() == []
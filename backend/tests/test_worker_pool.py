@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+
+from app.job_queues.base import JobState
+from app.models.generation import GenerationStatus
+from app.services.resilience import CircuitOpenError
+
+PROMPT = "a paper boat on a rainy street"
+
+
+async def _until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def _circuit_open_for(process, calls: int) -> None:
+    """Make the process's model fail fast as if its circuit were open, for its first `calls` calls."""
+    generate_image = process.backend.generate_image
+    remaining = [calls]
+
+    async def failing(prompt, **kwargs):
+        if remaining[0] > 0:
+            remaining[0] -= 1
+            raise CircuitOpenError("model", 0)
+        return await generate_image(prompt, **kwargs)
+
+    process.backend.generate_image = failing
+
+
+@pytest.mark.asyncio
+async def test_jobs_submitted_by_the_api_run_in_a_worker(processes):
+    api = await processes(consume=False)
+    await processes(consume=True)
+
+    generation = await api.pool.submit(PROMPT)
+    finished = await api.pool.wait_for(generation.generation_id, 5)
+
+    assert generation.status == GenerationStatus.PENDING
+    assert finished.status == GenerationStatus.COMPLETED
+    assert finished.image_url
+    assert api.backend.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_for_returns_the_current_state_on_timeout(processes):
+    api = await processes(consume=False)
+
+    generation = await api.pool.submit(PROMPT)
+    start = time.monotonic()
+    current = await api.pool.wait_for(generation.generation_id, 0.2)
+
+    assert time.monotonic() - start >= 0.2
+    assert current.status == GenerationStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_run_batch_enqueues_identical_items_once(processes):
+    api = await processes(consume=False)
+    worker = await processes(consume=True)
+
+    results = await api.pool.run_batch([PROMPT, PROMPT, "a kite over the dunes"], [None] * 3, timeout=5)
+
+    assert [r.status for r in results] == [GenerationStatus.COMPLETED] * 3
+    assert results[0].generation_id == results[1].generation_id != results[2].generation_id
+    assert worker.queue.counts()[JobState.DONE] == 2
+
+
+@pytest.mark.asyncio
+async def test_consuming_pools_publish_heartbeats_until_stopped(processes):
+    api = await processes(consume=False)
+    worker = await processes(consume=True, heartbeat_interval=0.05)
+
+    await _until(lambda: worker.queue.heartbeats())
+    (heartbeat,) = await api.pool.heartbeats()
+    assert heartbeat["worker_id"] == worker.pool.worker_id
+    assert heartbeat["concurrency"] == 2
+
+    await worker.pool.stop()
+    assert await api.pool.heartbeats() == []
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_running_jobs(processes):
+    api = await processes(consume=False)
+    worker = await processes(consume=True, latency_ms=300)
+
+    generation = await api.pool.submit(PROMPT)
+    await _until(lambda: worker.pool.stats()["in_flight"] == 1)
+    await worker.pool.stop(timeout=5)
+
+    finished = await api.pool.wait_for(generation.generation_id, 1)
+    assert finished.status == GenerationStatus.COMPLETED
+    assert worker.queue.counts()[JobState.DONE] == 1
+
+
+@pytest.mark.asyncio
+async def test_jobs_cut_off_by_the_drain_timeout_go_to_another_worker(processes):
+    api = await processes(consume=False)
+    stopping = await processes(consume=True, latency_ms=5000, lease_seconds=0.3)
+
+    generation = await api.pool.submit(PROMPT)
+    await _until(lambda: stopping.pool.stats()["in_flight"] == 1)
+    start = time.monotonic()
+    await stopping.pool.stop(timeout=0.05)
+
+    assert time.monotonic() - start < 1
+    assert api.queue.counts()[JobState.LEASED] == 1
+
+    await processes(consume=True)
+    finished = await api.pool.wait_for(generation.generation_id, 5)
+    assert finished.status == GenerationStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_jobs_failed_fast_by_an_open_circuit_are_retried(processes):
+    api = await processes(consume=False)
+    worker = await processes(consume=True)
+    _circuit_open_for(worker, 2)
+
+    generation = await api.pool.submit(PROMPT)
+    await _until(lambda: worker.queue.counts()[JobState.DONE] == 1)
+
+    finished = await api.pool.wait_for(generation.generation_id, 1)
+    assert finished.status == GenerationStatus.COMPLETED
+    assert worker.pool.stats()["jobs"] == {"completed": 1, "retried": 2}
+
+
+@pytest.mark.asyncio
+async def test_jobs_shed_on_every_attempt_are_dead_lettered(processes):
+    api = await processes(consume=False, max_attempts=2)
+    worker = await processes(consume=True)
+    _circuit_open_for(worker, 100)
+
+    generation = await api.pool.submit(PROMPT)
+    await _until(lambda: worker.queue.counts()[JobState.DEAD] == 1)
+
+    finished = await api.pool.wait_for(generation.generation_id, 1)
+    assert finished.status == GenerationStatus.FAILED
+    assert "unavailable" in finished.failure_reason
+    assert worker.queue.counts()[JobState.DONE] == 0